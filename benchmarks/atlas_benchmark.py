@@ -0,0 +1,78 @@
+"""Compare terrain_png loaded as per-file surfaces against the packed texture atlas.
+
+Reports surface count, pixel memory, load time and blit throughput for both
+layouts. Runs headless by default:
+
+    python -m benchmarks.atlas_benchmark
+"""
+import os
+import random
+import time
+
+import pygame
+
+from game.sprites import SingleSprite
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+TERRAIN_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets', 'terrain_png')
+BLITS = 200000
+
+def surface_bytes(surface):
+    """Pixel bytes owned by a standalone surface"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def blit_throughput(screen, sprites, names):
+    """Blit sprites in a random order and return blits per second"""
+    width, height = screen.get_size()
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        screen.blit(sprites[name], ((i * 37) % width, (i * 53) % height))
+    return len(names) / (time.perf_counter() - start)
+
+def area_blit_throughput(screen, atlas, names):
+    """Blit atlas regions by (page, source rect) and return blits per second"""
+    width, height = screen.get_size()
+    regions = [atlas.get_region(name) for name in names]
+    start = time.perf_counter()
+    for i, (page, rect) in enumerate(regions):
+        screen.blit(page, ((i * 37) % width, (i * 53) % height), rect)
+    return len(names) / (time.perf_counter() - start)
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((600, 600))
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    per_file = SingleSprite(TERRAIN_DIR, lazy=False)
+    per_file_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    atlased = SingleSprite(TERRAIN_DIR, use_atlas=True)
+    atlas_load = time.perf_counter() - start
+
+    names = list(per_file.sprites)
+    order = [rng.choice(names) for _ in range(BLITS)]
+
+    per_file_bytes = sum(surface_bytes(s) for s in per_file.sprites.values())
+    atlas_bytes = atlased.atlas.memory_bytes()
+
+    # Warm up, then measure each layout on the same blit sequence
+    blit_throughput(screen, per_file.sprites, order[:1000])
+    per_file_rate = blit_throughput(screen, per_file.sprites, order)
+    blit_throughput(screen, atlased.sprites, order[:1000])
+    atlas_rate = blit_throughput(screen, atlased.sprites, order)
+    area_rate = area_blit_throughput(screen, atlased.atlas, order)
+
+    print(f"Sprites:            {len(names)}")
+    print(f"{'':24}{'per-file':>14}{'atlas':>14}")
+    print(f"{'Pixel surfaces':24}{len(per_file.sprites):>14}{len(atlased.atlas.pages):>14}")
+    print(f"{'Pixel memory (KiB)':24}{per_file_bytes / 1024:>14.1f}{atlas_bytes / 1024:>14.1f}")
+    print(f"{'Load time (ms)':24}{per_file_load * 1000:>14.1f}{atlas_load * 1000:>14.1f}")
+    print(f"{'Blits/s (subsurface)':24}{per_file_rate:>14.0f}{atlas_rate:>14.0f}")
+    print(f"{'Blits/s (source rect)':24}{'-':>14}{area_rate:>14.0f}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
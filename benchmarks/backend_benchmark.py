@@ -0,0 +1,74 @@
+"""Time exploration frames on the Surface backend against the SDL2 texture backend.
+
+Both walk the camera one cell per frame across the same generated chunks
+and present every frame. "surface baked" and "surface scroll" draw the
+world like World.display_viewport() does in each render mode and flip the
+display. "sdl2 textures" is TextureRenderer: one texture copy per visible
+cell and layer from the uploaded tile atlas, plus the (empty) UI layer. The
+renderer is forced to SDL's software driver by default so the numbers are
+comparable on CI machines without a GPU; set SDL_RENDER_DRIVER to try
+another one.
+
+    python -m benchmarks.backend_benchmark
+"""
+import os
+
+import pygame
+
+from benchmarks.viewport_benchmark import (
+    CELL,
+    FRAMES,
+    WINDOW,
+    draw_baked,
+    draw_scrolled,
+    make_world,
+    run,
+)
+from game.chunk_surfaces import ChunkSurfaceCache
+from game.scroll_viewport import ScrollViewport
+from game.texture_renderer import TextureRenderer
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_RENDER_DRIVER', 'software')
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW, WINDOW))
+    tiles, chunks = make_world()
+    # Generate everything up front so only drawing is timed
+    chunks.get_region('terrain', -WINDOW // CELL, -WINDOW // CELL, FRAMES + 2 * WINDOW // CELL, FRAMES)
+
+    surfaces = ChunkSurfaceCache(tiles)
+    def baked(x, y):
+        draw_baked(screen, surfaces, chunks, x, y)
+        pygame.display.flip()
+    scroller = ScrollViewport(tiles)
+    def scrolled(x, y):
+        draw_scrolled(screen, scroller, chunks, x, y)
+        pygame.display.flip()
+    results = [('surface baked', run(baked)), ('surface scroll', run(scrolled))]
+
+    try:
+        renderer = TextureRenderer((WINDOW, WINDOW), "backend benchmark")
+    except RuntimeError as e:  # Also covers pygame.error
+        print(f"Error starting the SDL2 renderer: {e}")
+        renderer = None
+    if renderer:
+        ui_layer = pygame.Surface((WINDOW, WINDOW), pygame.SRCALPHA)
+        viewport = WINDOW // CELL
+        def textured(x, y):
+            renderer.set_view(tiles, chunks, x - viewport // 2, y - viewport // 2, CELL)
+            renderer.present(ui_layer)
+        results.append(('sdl2 textures', run(textured)))
+
+    print(f"video driver: {pygame.display.get_driver()}, render driver: {os.environ['SDL_RENDER_DRIVER']}")
+    print(f"{'frame ms':16}{'mean':>10}{'worst':>10}")
+    for name, (mean, worst) in results:
+        print(f"{name:16}{mean:>10.2f}{worst:>10.2f}")
+    if renderer:
+        print(f"sdl2: {renderer.get_stats()}")
+        renderer.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Time hover path previews while the mouse sweeps across the view.
+
+The mouse moves one cell per update in a zig-zag over every row of the
+view, the way MOUSEMOTION events arrive while the cursor is dragged
+around. "astar" plans each update from scratch with a PathFinder (a new
+goal every time, so its path cache never hits). "d* lite" is the
+IncrementalPlanner the game uses, which keeps its search tree between
+goals. "d* lite + edits" also changes a tile every 10 updates, which the
+planner repairs in place. The sweep runs for a 19x19-cell view (32 px
+cells) and a 75x75-cell view (8 px cells) on generated chunks with the
+game's TILE_PROPERTIES. The planner's worst updates are the first hover
+over a pocket walled off from the player, which settles the whole
+rectangle once, and edits that raise the cost of cells its tree runs
+through.
+
+    python -m benchmarks.dstar_benchmark
+"""
+import os
+import random
+import time
+
+import pygame
+
+from benchmarks.viewport_benchmark import make_world
+from game.dstar import IncrementalPlanner
+from game.pathfinding import PathFinder
+from utils.constants import PATH_SEARCH_MARGIN, TILE_PROPERTIES
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+VIEWS = (19, 75)
+EDIT_EVERY = 10
+
+def sweep(view):
+    """Cells under a mouse zig-zagging across a view centred on (0, 0)"""
+    half = view // 2
+    cells = []
+    for row, y in enumerate(range(-half, view - half)):
+        xs = range(-half, view - half)
+        cells.extend((x, y) for x in (xs if row % 2 == 0 else reversed(xs)))
+    return cells
+
+def run(plan, cells, edit=None):
+    """(mean ms, worst ms) per update"""
+    times = []
+    for i, cell in enumerate(cells):
+        if edit and i % EDIT_EVERY == EDIT_EVERY - 1:
+            edit()
+        start = time.perf_counter()
+        plan(cell)
+        times.append(time.perf_counter() - start)
+    return sum(times) / len(times) * 1000, max(times) * 1000
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    tiles, chunks = make_world()
+    # The game's passability and costs (make_world registers every tile as open ground)
+    for tile_id, name in enumerate(tiles.names):
+        if name:
+            tiles.register(name, tiles.images[tile_id], *TILE_PROPERTIES.get(name, (True, 1)))
+    start = (0, 0)
+    while not chunks.is_passable(*start):
+        start = (start[0] + 1, start[1])
+    overlay_ids = [tiles.get_id(name) for name in ("Rocks/boulder", "Trees/pine", "Bushes/flower")]
+    rng = random.Random(3)
+
+    print(f"{'update ms':24}{'view':>6}{'mean':>10}{'worst':>10}")
+    for view in VIEWS:
+        half = view // 2
+        region = (-half - PATH_SEARCH_MARGIN, -half - PATH_SEARCH_MARGIN,
+                  view + 2 * PATH_SEARCH_MARGIN, view + 2 * PATH_SEARCH_MARGIN)
+        chunks.get_region('terrain', *region)
+        cells = sweep(view)
+
+        finder = PathFinder(chunks)
+        planner = IncrementalPlanner(chunks)
+        edited = IncrementalPlanner(chunks)
+        def edit(half=half, view=view):
+            x, y = rng.randrange(-half, view - half), rng.randrange(-half, view - half)
+            if (x, y) != start:
+                chunks.set_overlay(x, y, rng.choice(overlay_ids))
+        results = (
+            ('astar', run(lambda cell, finder=finder: finder.find_path(start, cell), cells)),
+            ('d* lite', run(lambda cell, planner=planner, region=region: planner.plan(start, cell, region), cells)),
+            ('d* lite + edits', run(lambda cell, edited=edited, region=region: edited.plan(start, cell, region),
+                                    cells, edit)),
+        )
+        for name, (mean, worst) in results:
+            print(f"{name:24}{view:>6}{mean:>10.3f}{worst:>10.2f}")
+        print(f"d* lite: {planner.get_stats()}, with edits: {edited.get_stats()}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
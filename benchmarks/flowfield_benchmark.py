@@ -0,0 +1,93 @@
+"""Time steering many monsters at the player with A* each against one shared flow field.
+
+The player walks about STEPS cells east across generated chunks with the game's
+TILE_PROPERTIES. After each of its steps, every monster steps towards it.
+Monsters start at random passable cells within RANGE cells of the player,
+and one that reaches the player starts again somewhere else. "flow field"
+updates one FlowField for the player and asks it for each monster's next
+step. "astar" replays the same monster positions with one PathFinder
+search per monster. The cache never hits, since the player or the monster
+has moved every time. The times are per player step for all monsters
+together. The worst step for the flow field is the one after the player
+enters a new chunk, where the field starts over.
+
+    python -m benchmarks.flowfield_benchmark
+"""
+import os
+import random
+import time
+
+import pygame
+
+from benchmarks.viewport_benchmark import make_world
+from game.flowfield import FlowField
+from game.pathfinding import PathFinder
+from utils.constants import TILE_PROPERTIES
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+MONSTERS = (1, 10, 100, 1000)
+STEPS = 100
+RANGE = 24
+
+def spawn(chunks, rng, player):
+    """A random passable cell within RANGE of the player"""
+    while True:
+        cell = (player[0] + rng.randint(-RANGE, RANGE), player[1] + rng.randint(-RANGE, RANGE))
+        if cell != player and chunks.is_passable(*cell):
+            return cell
+
+def passable_near(chunks, x, y):
+    """The first passable cell at or to the east of (x, y)"""
+    while not chunks.is_passable(x, y):
+        x += 1
+    return x, y
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    tiles, chunks = make_world()
+    # The game's passability and costs (make_world registers every tile as open ground)
+    for tile_id, name in enumerate(tiles.names):
+        if name:
+            tiles.register(name, tiles.images[tile_id], *TILE_PROPERTIES.get(name, (True, 1)))
+    chunks.max_resident = 10 ** 6
+    start = passable_near(chunks, 0, 0)
+    route = [start, *PathFinder(chunks).find_path(start, passable_near(chunks, STEPS, 0))]
+    # Generate everything up front so only steering is timed
+    size = chunks.size * (2 * chunks.resident_radius + 2)
+    chunks.get_region('terrain', start[0] - size, start[1] - size, 2 * size + STEPS, 2 * size)
+
+    print(f"{'ms per step':14}{'monsters':>10}{'mean':>10}{'worst':>10}")
+    for count in MONSTERS:
+        rng = random.Random(5)
+        field = FlowField(chunks)
+        monsters = [spawn(chunks, rng, start) for _ in range(count)]
+        history = []
+        times = []
+        for player in route[1:]:
+            history.append((player, list(monsters)))
+            begin = time.perf_counter()
+            field.update(*player)
+            steps = [field.next_step(*monster) for monster in monsters]
+            times.append(time.perf_counter() - begin)
+            monsters = [spawn(chunks, rng, player) if step is None or step == player else step
+                        for monster, step in zip(monsters, steps, strict=True)]
+        field_result = (sum(times) / len(times) * 1000, max(times) * 1000)
+
+        finder = PathFinder(chunks)
+        times = []
+        for player, positions in history:
+            begin = time.perf_counter()
+            for monster in positions:
+                finder.find_path(monster, player)
+            times.append(time.perf_counter() - begin)
+        astar_result = (sum(times) / len(times) * 1000, max(times) * 1000)
+
+        for name, (mean, worst) in (('astar', astar_result), ('flow field', field_result)):
+            print(f"{name:14}{count:>10}{mean:>10.2f}{worst:>10.2f}")
+        print(f"flow field: {field.get_stats()}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Time long-distance paths with flat A* against the hierarchical chunk graph (HPA*).
+
+The world is generated chunks with the game's TILE_PROPERTIES, so water,
+boulders and crystals block and trees and sand cost more. For each
+distance, "flat" is one astar() over a CostGrid covering start, goal and
+PATH_SEARCH_MARGIN cells around them. "hpa cold" is the first
+HierarchicalPathFinder search, which finds the border entrances and the
+edges inside every chunk it touches. "hpa warm" repeats it from the cache.
+"hpa edited" repeats it after one tile edit in a chunk along the way, which
+rebuilds just that chunk. The HPA searches return only the first
+HPA_REFINE_SEGMENTS abstract edges as cells; the "length" column is the
+full walk (searching again from the end of each stretch) compared with the
+flat path.
+
+    python -m benchmarks.hpa_benchmark
+"""
+import os
+import time
+
+import pygame
+
+from benchmarks.viewport_benchmark import make_world
+from game.hpa import HierarchicalPathFinder
+from game.pathfinding import CostGrid, PathFinder, astar
+from utils.constants import PATH_SEARCH_MARGIN, TILE_PROPERTIES
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+DISTANCES = (128, 256, 512)
+
+def passable_near(chunks, x, y):
+    """The first passable cell at or to the east of (x, y)"""
+    while not chunks.is_passable(x, y):
+        x += 1
+    return x, y
+
+def walk(finder, start, goal):
+    """Cells walked following finder's stretches until goal (or a dead end)"""
+    position, steps = start, 0
+    while position != goal:
+        path = finder.find_path(position, goal)
+        if not path:
+            break
+        position = path[-1]
+        steps += len(path)
+    return steps
+
+def time_ms(action):
+    start = time.perf_counter()
+    result = action()
+    return (time.perf_counter() - start) * 1000, result
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    tiles, chunks = make_world()
+    # The game's passability and costs (make_world registers every tile as open ground)
+    for tile_id, name in enumerate(tiles.names):
+        if name:
+            tiles.register(name, tiles.images[tile_id], *TILE_PROPERTIES.get(name, (True, 1)))
+    chunks.max_resident = 10 ** 6
+    margin = PATH_SEARCH_MARGIN
+    reach = max(DISTANCES) + 2 * chunks.size
+    # Generate everything up front so only searching is timed
+    chunks.get_region('terrain', -reach, -reach, 2 * reach, 2 * reach)
+
+    print(f"{'distance':10}{'flat ms':>10}{'hpa cold':>10}{'hpa warm':>10}{'hpa edited':>12}"
+          f"{'flat len':>10}{'hpa len':>10}")
+    for distance in DISTANCES:
+        start = passable_near(chunks, 0, 0)
+        goal = passable_near(chunks, -distance // 2, distance)
+        x0, y0 = min(start[0], goal[0]) - margin, min(start[1], goal[1]) - margin
+        grid = CostGrid.from_chunks(chunks, x0, y0, abs(goal[0] - start[0]) + 2 * margin + 1,
+                                    abs(goal[1] - start[1]) + 2 * margin + 1)
+        flat_ms, (flat_path, _) = time_ms(lambda grid=grid, start=start, goal=goal: astar(grid, start, goal))
+
+        finder = HierarchicalPathFinder(chunks, PathFinder(chunks))
+        def find(finder=finder, start=start, goal=goal):
+            return finder.find_path(start, goal)
+        cold_ms, _ = time_ms(find)
+        warm_ms, _ = time_ms(find)
+        builds = finder.chunk_builds
+        middle = (start[0] + goal[0]) // 2, (start[1] + goal[1]) // 2
+        chunks.set_overlay(middle[0], middle[1], tiles.get_id("Bushes/small"))
+        edited_ms, _ = time_ms(find)
+        rebuilt = finder.chunk_builds - builds
+
+        print(f"{distance:<10}{flat_ms:>10.1f}{cold_ms:>10.1f}{warm_ms:>10.1f}"
+              f"{f'{edited_ms:.1f} ({rebuilt})':>12}{len(flat_path):>10}{walk(finder, start, goal):>10}")
+    print(f"hpa: {finder.get_stats()}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
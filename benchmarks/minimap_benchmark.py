@@ -0,0 +1,84 @@
+"""Time building and updating the minimap of a 1024x1024-cell (32x32 chunk) world.
+
+"draw.rect" is the naive map: one pygame.draw.rect per cell. "rebuild" is
+Minimap.rebuild(), one colour-table lookup and one surfarray write for the
+whole map. The update rows are Minimap.update() on a map that is already
+current: with nothing changed, after a batch of single-tile edits in
+different chunks, and after a chunk is regenerated (as when a chunk
+arrives from the workers), where only the pixels that differ are written.
+
+    python -m benchmarks.minimap_benchmark
+"""
+import os
+import random
+import time
+
+import pygame
+
+from benchmarks.viewport_benchmark import make_world
+from ui.minimap import Minimap
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+SPAN = 32  # Chunks per side
+REPEATS = 20
+EDITS = 100
+
+def time_ms(action, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        action()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def draw_per_cell(surface, chunks, lut, x0, y0, width):
+    """The map drawn one rect per cell"""
+    for y in range(width):
+        terrain = chunks.get_region('terrain', x0, y0 + y, width, 1)[0]
+        overlay = chunks.get_region('overlay', x0, y0 + y, width, 1)[0]
+        for x in range(width):
+            tile_id = overlay[x] or terrain[x]
+            pygame.draw.rect(surface, lut[tile_id], (x, y, 1, 1))
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    tiles, chunks = make_world()
+    chunks.max_resident = SPAN * SPAN
+    size = chunks.size
+    width = SPAN * size
+    x0 = y0 = -(SPAN // 2) * size
+    chunks.get_region('terrain', x0, y0, width, width)
+
+    minimap = Minimap(chunks, tiles, span=SPAN)
+    minimap.rebuild(0, 0)
+    lut = [tuple(int(c) for c in colour) for colour in minimap._lut]
+    surface = pygame.Surface((width, width))
+    per_cell = time_ms(lambda: draw_per_cell(surface, chunks, lut, x0, y0, width), repeats=1)
+    rebuild = time_ms(lambda: minimap.rebuild(0, 0))
+    idle = time_ms(lambda: minimap.update(0, 0))
+
+    rng = random.Random(1)
+    overlay_ids = [tile_id for tile_id, name in enumerate(tiles.names) if name and '/' in name]
+    edits = arrival = 0
+    for _ in range(REPEATS):
+        for _ in range(EDITS):
+            chunks.set_overlay(x0 + rng.randrange(width), y0 + rng.randrange(width), rng.choice(overlay_ids))
+        edits += time_ms(lambda: minimap.update(0, 0), repeats=1) / REPEATS
+
+        # A fresh Chunk object for the same cells, like one merged from the pipeline
+        key = (rng.randrange(SPAN) - SPAN // 2, rng.randrange(SPAN) - SPAN // 2)
+        chunks.resident[key] = chunks.generator(key[0], key[1], size)
+        arrival += time_ms(lambda: minimap.update(0, 0), repeats=1) / REPEATS
+
+    print(f"map {width}x{width} cells")
+    print(f"{'case':24}{'ms':>10}")
+    print(f"{'draw.rect per cell':24}{per_cell:>10.1f}")
+    print(f"{'surfarray rebuild':24}{rebuild:>10.2f}")
+    print(f"{'update, no change':24}{idle:>10.2f}")
+    print(f"{f'update, {EDITS} edits':24}{edits:>10.2f}")
+    print(f"{'update, 1 new chunk':24}{arrival:>10.2f}")
+    print(f"minimap: {minimap.get_stats()}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Time A* on open terrain and mazes at 100x100 and 1000x1000, and PathFinder on the world.
+
+"open" is generated terrain with costs 1-3 and about 15% of the cells
+blocked in scattered clumps; "maze" is a perfect maze (one route between
+any two cells, corridors one cell wide), which makes A* expand most of the
+map. Each search runs from one corner to the opposite one. The "world"
+rows are World.get_path_to()-sized searches (a click near the edge of the
+view) through a PathFinder over generated chunks: a cold search, a repeat
+served from the path cache, and a repeat after a tile edit in a chunk the
+search crossed, which has to search again.
+
+    python -m benchmarks.pathfinding_benchmark
+"""
+import os
+import random
+import time
+
+import numpy as np
+import pygame
+
+from benchmarks.viewport_benchmark import make_world
+from game.pathfinding import CostGrid, PathFinder, astar
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+SIZES = (100, 1000)
+CLICKS = 20
+
+def open_grid(size, seed=1):
+    """Scattered clumps of blocked cells over terrain costing 1-3"""
+    rng = np.random.default_rng(seed)
+    noise = rng.random((size // 4 + 1, size // 4 + 1))
+    blocked = np.kron(noise < 0.15, np.ones((4, 4), dtype=bool))[:size, :size]
+    blocked[:4, :4] = blocked[-4:, -4:] = False
+    cost = rng.integers(1, 4, (size, size)).astype(np.uint8)
+    return CostGrid(0, 0, (~blocked).astype(np.uint8), cost)
+
+def maze_grid(size, seed=1):
+    """A perfect maze carved with an iterative depth-first search"""
+    rng = random.Random(seed)
+    passable = np.zeros((size, size), dtype=np.uint8)
+    cells = (size - 1) // 2
+    passable[1, 1] = 1
+    stack = [(0, 0)]
+    visited = {(0, 0)}
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= x + dx < cells and 0 <= y + dy < cells and (x + dx, y + dy) not in visited]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = rng.choice(options)
+        passable[2 * ny + 1, 2 * nx + 1] = 1
+        passable[y + ny + 1, x + nx + 1] = 1
+        visited.add((nx, ny))
+        stack.append((nx, ny))
+    return CostGrid(0, 0, passable, np.ones((size, size), dtype=np.uint8)), (2 * cells - 1, 2 * cells - 1)
+
+def time_search(grid, start, goal):
+    begin = time.perf_counter()
+    path, expanded = astar(grid, start, goal)
+    return (time.perf_counter() - begin) * 1000, expanded, len(path)
+
+def main():
+    print(f"{'case':20}{'ms':>10}{'expanded':>10}{'path':>8}")
+    for size in SIZES:
+        ms, expanded, length = time_search(open_grid(size), (0, 0), (size - 1, size - 1))
+        print(f"{f'open {size}':20}{ms:>10.1f}{expanded:>10}{length:>8}")
+        grid, corner = maze_grid(size)
+        ms, expanded, length = time_search(grid, (1, 1), corner)
+        print(f"{f'maze {size}':20}{ms:>10.1f}{expanded:>10}{length:>8}")
+
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    tiles, chunks = make_world()
+    finder = PathFinder(chunks)
+    rng = random.Random(2)
+    clicks = [((0, 0), (rng.randrange(-9, 10), rng.choice((-9, 9)))) for _ in range(CLICKS)]
+    chunks.get_region('terrain', -40, -40, 80, 80)
+    overlay_id = tiles.get_id("Trees/pine")
+
+    cold = cached = edited = 0
+    for start, goal in clicks:
+        finder.invalidate()
+        begin = time.perf_counter()
+        finder.find_path(start, goal)
+        cold += time.perf_counter() - begin
+        begin = time.perf_counter()
+        finder.find_path(start, goal)
+        cached += time.perf_counter() - begin
+        chunks.set_overlay(goal[0] // 2, goal[1] // 2, overlay_id)
+        begin = time.perf_counter()
+        finder.find_path(start, goal)
+        edited += time.perf_counter() - begin
+    for name, total in (('world cold', cold), ('world cached', cached), ('world after edit', edited)):
+        print(f"{name:20}{total / CLICKS * 1000:>10.2f}")
+    print(f"pathfinder: {finder.get_stats()}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
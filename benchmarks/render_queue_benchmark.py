@@ -0,0 +1,87 @@
+"""Time a frame's draw commands blitted one call at a time against the batched RenderQueue.
+
+The HUD case is what the console and the three stat bars queue in one frame
+(panels, outlines, a dozen text surfaces). The tiles case is a per-cell
+20x20 viewport with overlays, about 800 small blits, which is where the
+per-call Python overhead adds up. "Direct" replays the same commands as
+individual Surface.blit() calls; "queued" submits them to a RenderQueue and
+flushes it, sorting by layer and issuing one Surface.blits() per layer.
+
+    python -m benchmarks.render_queue_benchmark
+"""
+import os
+import time
+from types import SimpleNamespace
+
+import pygame
+
+from ui.render_queue import RenderQueue, render_queue
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+WINDOW = 600
+CELL = 30
+FRAMES = 500
+
+def hud_commands(screen):
+    """Commands queued by the console and the stat bars for one frame"""
+    from ui.bar import Bar
+    from ui.console import MessageConsole
+    console = MessageConsole()
+    for i in range(6):
+        console.add_message(f"Message number {i}: the goblin hits you for {i + 3} damage")
+    # Just the stats the bars read (a real Character needs the sprite sheets)
+    player = SimpleNamespace(name="Hero", health=70, max_health=100, exp=40, exp_to_next_level=100,
+                             level=3, mp=20, max_mp=50)
+    bar = Bar()
+    render_queue.clear()
+    console.draw(screen, 390, 410, 200, 150)
+    bar.draw_health_bar(screen, player, 10, 10)
+    bar.draw_xp_bar(screen, player, 10, 35)
+    bar.draw_mp_bar(screen, player, 10, 60)
+    commands = [(layer, surface, dest, area)
+                for layer, batch in enumerate(render_queue.layers) for surface, dest, area in batch]
+    render_queue.clear()
+    return commands
+
+def tile_commands():
+    """A terrain and an overlay blit for every cell of the window"""
+    terrain = pygame.Surface((CELL, CELL)).convert()
+    terrain.fill((60, 160, 60))
+    overlay = pygame.Surface((CELL, CELL), pygame.SRCALPHA).convert_alpha()
+    pygame.draw.circle(overlay, (30, 90, 30, 255), (CELL // 2, CELL // 2), CELL // 3)
+    return [(layer, image, (x, y), None)
+            for layer, image in ((RenderQueue.WORLD, terrain), (RenderQueue.ENTITIES, overlay))
+            for y in range(0, WINDOW, CELL)
+            for x in range(0, WINDOW, CELL)]
+
+def draw_direct(screen, commands):
+    for _, surface, dest, area in commands:
+        screen.blit(surface, dest, area)
+
+def draw_queued(screen, queue, commands):
+    for layer, surface, dest, area in commands:
+        queue.submit(layer, surface, dest, area)
+    queue.flush(screen)
+
+def time_frames(draw):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        draw()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW, WINDOW))
+    queue = RenderQueue()
+
+    print(f"{'frame ms':12}{'commands':>10}{'direct':>10}{'queued':>10}")
+    for name, commands in (('hud', hud_commands(screen)), ('tiles', tile_commands())):
+        direct = time_frames(lambda commands=commands: draw_direct(screen, commands))
+        queued = time_frames(lambda commands=commands: draw_queued(screen, queue, commands))
+        print(f"{name:12}{len(commands):>10}{direct:>10.3f}{queued:>10.3f}")
+    print(f"queue: {queue.get_stats()['last_frame']}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Compare world storage as per-cell GameSprite copies against flyweight tile IDs.
+
+"Before" is the old layout: every cell holds its own GameSprite with a
+copied image (and overlays the same). "After" is the TileRegistry layout:
+the maps hold small integer IDs and each tile surface exists once. "Chunks"
+is the current layout: per-chunk uint8 arrays for terrain, overlay,
+passability and cost.
+
+Python object memory is measured with tracemalloc. Surface pixels are
+allocated by SDL, which tracemalloc cannot see, so they are added from each
+surface's size. The 1000x1000 "before" case would need several GiB, so it
+is extrapolated from the measured per-cell cost at 100x100.
+
+    python -m benchmarks.tile_memory_benchmark
+"""
+import os
+import random
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from game.chunks import Chunk
+from game.sprites import GameSprite
+from game.tiles import TileRegistry
+from utils.constants import CHUNK_SIZE
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+TERRAIN = ["grass", "dirt", "sand", "water"]
+OVERLAYS = ["Trees/pine", "Trees/oak", "Rocks/stone", "Bushes/small"]
+OVERLAY_CHANCE = 0.12  # Roughly what generate_world produces
+
+def pixel_bytes(surface):
+    """Pixel bytes owned by a surface"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def make_sprite(size):
+    """A base sprite like the ones SpriteManager hands out"""
+    sprite = GameSprite()
+    sprite.image = pygame.Surface(size, pygame.SRCALPHA)
+    sprite.rect = sprite.image.get_rect()
+    return sprite
+
+def cells(side, rng):
+    """Yield (x, y, terrain index, overlay index or None) for a side x side map"""
+    half = side // 2
+    for y in range(-half, side - half):
+        for x in range(-half, side - half):
+            overlay = rng.randrange(len(OVERLAYS)) if rng.random() < OVERLAY_CHANCE else None
+            yield x, y, rng.randrange(len(TERRAIN)), overlay
+
+def measure_before(side):
+    """Old layout: a GameSprite copy per cell. Returns (python bytes, pixel bytes)"""
+    rng = random.Random(side)
+    terrain_sprites = [make_sprite((32, 32)) for _ in TERRAIN]
+    overlay_sprites = [make_sprite((64, 64)) for _ in OVERLAYS]
+
+    tracemalloc.start()
+    world_map = {}
+    overlay_map = {}
+    for x, y, terrain, overlay in cells(side, rng):
+        sprite = terrain_sprites[terrain].copy()
+        sprite.rect.x = x * 32
+        sprite.rect.y = y * 32
+        world_map[(x, y)] = sprite
+        if overlay is not None:
+            sprite = overlay_sprites[overlay].copy()
+            overlay_map[(x, y)] = sprite
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    pixels = sum(pixel_bytes(s.image) for s in world_map.values())
+    pixels += sum(pixel_bytes(s.image) for s in overlay_map.values())
+    return python_bytes, pixels
+
+def measure_after(side):
+    """Flyweight layout: tile IDs per cell, one surface per tile"""
+    rng = random.Random(side)
+    tiles = TileRegistry()
+    terrain_ids = [tiles.register(name, pygame.Surface((32, 32), pygame.SRCALPHA)) for name in TERRAIN]
+    overlay_ids = [tiles.register(name, pygame.Surface((64, 64), pygame.SRCALPHA)) for name in OVERLAYS]
+
+    tracemalloc.start()
+    world_map = {}
+    overlay_map = {}
+    for x, y, terrain, overlay in cells(side, rng):
+        world_map[(x, y)] = terrain_ids[terrain]
+        if overlay is not None:
+            overlay_map[(x, y)] = overlay_ids[overlay]
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    pixels = sum(pixel_bytes(image) for image in tiles.images if image is not None)
+    return python_bytes, pixels
+
+def measure_chunks(side):
+    """Chunk layout: four uint8 layers per chunk, one surface per tile"""
+    rng = np.random.default_rng(side)
+    tiles = TileRegistry()
+    terrain_ids = [tiles.register(name, pygame.Surface((32, 32), pygame.SRCALPHA)) for name in TERRAIN]
+    overlay_ids = [tiles.register(name, pygame.Surface((64, 64), pygame.SRCALPHA)) for name in OVERLAYS]
+    terrain_choices = np.array(terrain_ids, dtype=np.uint8)
+    overlay_choices = np.array([0, *overlay_ids], dtype=np.uint8)
+    overlay_weights = [1 - OVERLAY_CHANCE] + [OVERLAY_CHANCE / len(overlay_ids)] * len(overlay_ids)
+    chunks_per_side = -(-side // CHUNK_SIZE)
+    shape = (CHUNK_SIZE, CHUNK_SIZE)
+
+    tracemalloc.start()
+    chunks = {}
+    for cy in range(chunks_per_side):
+        for cx in range(chunks_per_side):
+            terrain = rng.choice(terrain_choices, shape)
+            overlay = rng.choice(overlay_choices, shape, p=overlay_weights)
+            chunks[(cx, cy)] = Chunk(cx, cy, terrain, overlay, tiles)
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Chunks cover whole multiples of CHUNK_SIZE; report per requested cell
+    python_bytes = python_bytes * side * side // (chunks_per_side * CHUNK_SIZE) ** 2
+    pixels = sum(pixel_bytes(image) for image in tiles.images if image is not None)
+    return python_bytes, pixels
+
+def mib(value):
+    return f"{value / (1024 * 1024):.1f}"
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    before_small = measure_before(100)
+    after_small = measure_after(100)
+    after_large = measure_after(1000)
+    # Scale the measured 100x100 per-cell cost up to 1000x1000
+    before_large = tuple(value * 100 for value in before_small)
+    chunks_small = measure_chunks(100)
+    chunks_large = measure_chunks(1000)
+
+    print(f"{'MiB':26}{'python':>10}{'pixels':>10}{'total':>10}{'B/cell':>10}")
+    rows = [
+        ("100x100 before", 100, before_small),
+        ("100x100 after", 100, after_small),
+        ("100x100 chunks", 100, chunks_small),
+        ("1000x1000 before (est.)", 1000, before_large),
+        ("1000x1000 after", 1000, after_large),
+        ("1000x1000 chunks", 1000, chunks_large),
+    ]
+    for label, side, (python_bytes, pixels) in rows:
+        per_cell = python_bytes / (side * side)
+        print(f"{label:26}{mib(python_bytes):>10}{mib(pixels):>10}{mib(python_bytes + pixels):>10}{per_cell:>10.1f}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Time exploration frames drawn per cell, from baked chunk surfaces, and by scrolling.
+
+"Per-cell" is the old display_viewport body: a terrain pass and an overlay
+pass over every visible cell, each blitting a (cached) scaled tile with a
+clip rect. "Baked" blits the ChunkSurfaceCache surfaces of the chunks under
+the window. "Scroll" shifts the previous frame with ScrollViewport and
+paints only the exposed row and column. All walk the camera one cell per frame across real generated
+chunks, so the baked run includes the bakes for newly visible chunks. The
+worst frame skips the first one, which bakes every visible chunk at once.
+
+    python -m benchmarks.viewport_benchmark
+"""
+import os
+import time
+
+import pygame
+
+from game.chunk_surfaces import ChunkSurfaceCache
+from game.chunks import Chunk, ChunkManager
+from game.scale_cache import scale_cache
+from game.scroll_viewport import ScrollViewport
+from game.tiles import TileRegistry
+from game.worldgen import TERRAIN_TYPES, BiomeGenerator
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+WINDOW = 600
+CELL = 32
+FRAMES = 300
+OVERLAYS = {
+    "Trees": ["pine", "oak", "dead"],
+    "Rocks": ["boulder", "stone", "crystal"],
+    "Bushes": ["small", "berry", "flower"],
+}
+
+def make_world():
+    """A chunk manager over generated biomes, with placeholder tile surfaces"""
+    tiles = TileRegistry()
+    terrain_ids = {}
+    for index, name in enumerate(TERRAIN_TYPES):
+        image = pygame.Surface((32, 32))
+        image.fill((40 + index * 50, 160 - index * 30, 60 + index * 40))
+        terrain_ids[name] = tiles.register(name, image.convert())
+    overlay_ids = {}
+    for category, types in OVERLAYS.items():
+        overlay_ids[category] = {}
+        for name in types:
+            image = pygame.Surface((64, 64), pygame.SRCALPHA)
+            pygame.draw.circle(image, (30, 90, 30, 255), (32, 32), 24)
+            overlay_ids[category][name] = tiles.register(f"{category}/{name}", image.convert_alpha())
+
+    generator = BiomeGenerator(42, terrain_ids, overlay_ids)
+    def generate(cx, cy, size):
+        terrain, overlay = generator.generate(cx * size, cy * size, size, size)
+        return Chunk(cx, cy, terrain, overlay, tiles)
+    return tiles, ChunkManager(generate, tiles)
+
+def draw_per_cell(screen, tiles, chunks, player_x, player_y):
+    """The old two-pass per-cell viewport"""
+    viewport = WINDOW // CELL
+    start_x = player_x - viewport // 2
+    start_y = player_y - viewport // 2
+    screen.fill((255, 255, 255))
+    for layer in (chunks.get_terrain, chunks.get_overlay):
+        for y in range(start_y, start_y + viewport + 1):
+            for x in range(start_x, start_x + viewport + 1):
+                image = tiles.get_image(layer(x, y))
+                if image:
+                    screen_x = (x - start_x) * CELL
+                    screen_y = (y - start_y) * CELL
+                    scaled = scale_cache.get(image, (CELL, CELL))
+                    visible_width = min(CELL, WINDOW - screen_x)
+                    visible_height = min(CELL, WINDOW - screen_y)
+                    if visible_width > 0 and visible_height > 0:
+                        screen.blit(scaled, (screen_x, screen_y), pygame.Rect(0, 0, visible_width, visible_height))
+
+def draw_baked(screen, surfaces, chunks, player_x, player_y):
+    """Blit the baked chunks under the window"""
+    viewport = WINDOW // CELL
+    surfaces.draw(screen, chunks, (player_x - viewport // 2) * CELL, (player_y - viewport // 2) * CELL, CELL)
+
+def draw_scrolled(screen, viewport_buffer, chunks, player_x, player_y):
+    """Scroll the last frame and patch its edges"""
+    viewport = WINDOW // CELL
+    viewport_buffer.draw(screen, chunks, player_x - viewport // 2, player_y - viewport // 2, CELL)
+
+def run(draw):
+    """Walk diagonally one cell per frame; return (mean ms, worst ms after the first frame)"""
+    times = []
+    for step in range(FRAMES):
+        start = time.perf_counter()
+        draw(step, step // 2)
+        times.append(time.perf_counter() - start)
+    return sum(times) / len(times) * 1000, max(times[1:]) * 1000
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW, WINDOW))
+    tiles, chunks = make_world()
+    # Generate everything up front so only drawing is timed
+    chunks.get_region('terrain', -WINDOW // CELL, -WINDOW // CELL, FRAMES + 2 * WINDOW // CELL, FRAMES)
+
+    per_cell = run(lambda x, y: draw_per_cell(screen, tiles, chunks, x, y))
+    surfaces = ChunkSurfaceCache(tiles)
+    baked = run(lambda x, y: draw_baked(screen, surfaces, chunks, x, y))
+
+    scroller = ScrollViewport(tiles)
+    scrolled = run(lambda x, y: draw_scrolled(screen, scroller, chunks, x, y))
+
+    print(f"{'frame ms':12}{'mean':>10}{'worst':>10}")
+    print(f"{'per-cell':12}{per_cell[0]:>10.2f}{per_cell[1]:>10.2f}")
+    print(f"{'baked':12}{baked[0]:>10.2f}{baked[1]:>10.2f}")
+    print(f"{'scroll':12}{scrolled[0]:>10.2f}{scrolled[1]:>10.2f}")
+    print(f"baked: {surfaces.get_stats()}")
+    print(f"scroll: {scroller.get_stats()} ({scroller.patched_cells / FRAMES:.0f} cells painted per frame)")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
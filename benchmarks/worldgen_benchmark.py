@@ -0,0 +1,120 @@
+"""Compare per-cell Python terrain generation against the NumPy TerrainGenerator.
+
+"Loop" is the old generate_world body: a few random() calls, a square root
+and sometimes random.choices() per cell in nested Python loops. "NumPy" is
+TerrainGenerator.generate() over the whole region at once. The 4000x4000
+loop case would take minutes, so it is extrapolated from the 1000x1000 run.
+
+The script also checks that the generator is deterministic: the same seed
+gives the same layout, and generating chunk by chunk matches one big call.
+
+    python -m benchmarks.worldgen_benchmark
+"""
+import random
+import time
+
+import numpy as np
+
+from game.worldgen import TERRAIN_TYPES, TerrainGenerator
+
+TERRAIN_IDS = {name: index + 1 for index, name in enumerate(TERRAIN_TYPES)}
+OVERLAY_IDS = {
+    "Trees": {"pine": 5, "oak": 6, "dead": 7},
+    "Rocks": {"boulder": 8, "stone": 9, "crystal": 10},
+    "Bushes": {"small": 11, "berry": 12, "flower": 13},
+}
+
+def loop_generate(side, seed):
+    """The old nested-loop generator, writing tile IDs into dicts"""
+    rng = random.Random(seed)
+    world_map = {}
+    overlay_map = {}
+    half = side // 2
+
+    def add_overlay(x, y, category, types):
+        overlay_map[(x, y)] = OVERLAY_IDS[category][rng.choice(types)]
+
+    for y in range(-half, side - half):
+        for x in range(-half, side - half):
+            distance = ((x/2)**2 + (y/2)**2)**0.5
+            adjusted_distance = distance + rng.uniform(-2, 2)
+            if adjusted_distance < 5:
+                terrain = "grass"
+                if rng.random() < 0.2:
+                    add_overlay(x, y, "Trees", ["pine", "oak"])
+                elif rng.random() < 0.15:
+                    add_overlay(x, y, "Bushes", ["small", "berry", "flower"])
+            elif adjusted_distance < 10:
+                terrain = "dirt" if rng.random() < 0.7 else "grass"
+                if rng.random() < 0.15:
+                    add_overlay(x, y, "Rocks", ["boulder", "stone"])
+                elif rng.random() < 0.1:
+                    add_overlay(x, y, "Trees", ["dead"])
+            elif adjusted_distance < 15:
+                terrain = "sand" if rng.random() < 0.7 else "dirt"
+                if rng.random() < 0.1:
+                    add_overlay(x, y, "Rocks", ["stone"])
+            elif adjusted_distance < 20:
+                terrain = "water" if rng.random() < 0.7 else "sand"
+            else:
+                terrain = rng.choices(TERRAIN_TYPES, weights=[0.4, 0.3, 0.2, 0.1])[0]
+                if terrain == "grass" and rng.random() < 0.15:
+                    add_overlay(x, y, "Trees", ["pine", "oak"])
+                elif terrain == "dirt" and rng.random() < 0.1:
+                    add_overlay(x, y, "Rocks", ["boulder", "stone"])
+            world_map[(x, y)] = TERRAIN_IDS[terrain]
+    return world_map, overlay_map
+
+def numpy_generate(side, seed):
+    """The vectorised generator over the same region"""
+    half = side // 2
+    return TerrainGenerator(seed, TERRAIN_IDS, OVERLAY_IDS).generate(-half, -half, side, side)
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def check_determinism(seed):
+    """Same seed -> same layout, and chunked generation matches one region"""
+    first = numpy_generate(96, seed)
+    second = numpy_generate(96, seed)
+    same_seed = all(np.array_equal(a, b) for a, b in zip(first, second, strict=True))
+
+    generator = TerrainGenerator(seed, TERRAIN_IDS, OVERLAY_IDS)
+    terrain = np.zeros((96, 96), dtype=np.uint8)
+    overlay = np.zeros((96, 96), dtype=np.uint8)
+    for cy in range(3):
+        for cx in range(3):
+            chunk_terrain, chunk_overlay = generator.generate(-48 + cx * 32, -48 + cy * 32, 32, 32)
+            terrain[cy * 32:(cy + 1) * 32, cx * 32:(cx + 1) * 32] = chunk_terrain
+            overlay[cy * 32:(cy + 1) * 32, cx * 32:(cx + 1) * 32] = chunk_overlay
+    chunked = np.array_equal(terrain, first[0]) and np.array_equal(overlay, first[1])
+    return same_seed, chunked
+
+def main():
+    seed = 1234
+    loop_small, _ = timed(loop_generate, 100, seed)
+    loop_large, _ = timed(loop_generate, 1000, seed)
+    numpy_small, _ = timed(numpy_generate, 100, seed)
+    numpy_large, _ = timed(numpy_generate, 1000, seed)
+    numpy_huge, (terrain, overlay) = timed(numpy_generate, 4000, seed)
+
+    rows = [
+        ("100x100", loop_small, numpy_small, ""),
+        ("1000x1000", loop_large, numpy_large, ""),
+        ("4000x4000", loop_large * 16, numpy_huge, " (loop est.)"),
+    ]
+    print(f"{'cells':12}{'loop s':>10}{'numpy s':>10}{'speedup':>10}")
+    for label, loop_time, numpy_time, note in rows:
+        print(f"{label:12}{loop_time:>10.3f}{numpy_time:>10.3f}{loop_time / numpy_time:>9.1f}x{note}")
+
+    counts = np.bincount(terrain.ravel(), minlength=len(TERRAIN_TYPES) + 1)[1:]
+    shares = ", ".join(f"{name} {count / terrain.size:.0%}" for name, count in zip(TERRAIN_TYPES, counts, strict=True))
+    print(f"4000x4000 terrain: {shares}; overlays on {np.count_nonzero(overlay) / overlay.size:.1%} of cells")
+
+    same_seed, chunked = check_determinism(seed)
+    print(f"same seed -> same layout: {same_seed}; chunked == whole region: {chunked}")
+
+if __name__ == "__main__":
+    main()
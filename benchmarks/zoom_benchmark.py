@@ -0,0 +1,55 @@
+"""Time exploration frames at every zoom level, per frame and per visible cell.
+
+For each cell size in ZOOM_LEVELS the TileRegistry's zoom atlas is built
+first (timed on its own, it is what the game does once in generate_world()),
+then the camera walks one cell per frame like viewport_benchmark does, with
+the baked chunk surfaces and with the scroll buffer. No tile is rescaled
+per draw, so zooming out to many more visible cells should cost no more per
+frame (and less per cell) than the default zoom. At the largest zoom the
+baked run is dominated by baking the bigger chunk surfaces as they come
+into view.
+
+    python -m benchmarks.zoom_benchmark
+"""
+import os
+import time
+
+import pygame
+
+from benchmarks.viewport_benchmark import WINDOW, make_world, run
+from game.chunk_surfaces import ChunkSurfaceCache
+from game.scroll_viewport import ScrollViewport
+from utils.constants import ZOOM_LEVELS
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW, WINDOW))
+    tiles, chunks = make_world()
+    smallest = min(ZOOM_LEVELS)
+    # Generate everything up front so only drawing is timed
+    chunks.get_region('terrain', -WINDOW // smallest, -WINDOW // smallest, 400 + 2 * WINDOW // smallest, 400)
+
+    print(f"{'cell px':8}{'cells':>8}{'atlas ms':>10}{'baked ms':>10}{'us/cell':>9}{'scroll ms':>11}{'us/cell':>9}")
+    for cell in sorted(ZOOM_LEVELS):
+        start = time.perf_counter()
+        tiles.zoom_atlas(cell)
+        atlas_ms = (time.perf_counter() - start) * 1000
+        viewport = WINDOW // cell
+        cells = (-(-WINDOW // cell)) ** 2
+
+        surfaces = ChunkSurfaceCache(tiles)
+        def baked(x, y, surfaces=surfaces, viewport=viewport, cell=cell):
+            surfaces.draw(screen, chunks, (x - viewport // 2) * cell, (y - viewport // 2) * cell, cell)
+        scroller = ScrollViewport(tiles)
+        def scrolled(x, y, scroller=scroller, viewport=viewport, cell=cell):
+            scroller.draw(screen, chunks, x - viewport // 2, y - viewport // 2, cell)
+        baked_ms = run(baked)[0]
+        scroll_ms = run(scrolled)[0]
+        print(f"{cell:<8}{cells:>8}{atlas_ms:>10.2f}{baked_ms:>10.2f}{baked_ms * 1000 / cells:>9.3f}"
+              f"{scroll_ms:>11.2f}{scroll_ms * 1000 / cells:>9.3f}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import io
+import json
+import os
+import struct
+import zipfile
+import pygame
+
+MANIFEST_FILE = 'asset_manifest.json'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def png_size(data):
+    """Read the (width, height) of a PNG from its IHDR header without decoding it"""
+    if len(data) >= 24 and data[:8] == PNG_SIGNATURE and data[12:16] == b'IHDR':
+        return struct.unpack('>II', data[16:24])
+    # Fall back to a full decode for anything with an unusual header
+    return load_image_bytes(data).get_size()
+
+def load_image_bytes(data, name_hint='image.png'):
+    """Decode an image from an in-memory buffer"""
+    return pygame.image.load(io.BytesIO(data), name_hint)
+
+class AssetImporter:
+    """Import sprites from zipped asset packs into the assets directory.
+
+    PNGs are read from the archive into memory and written straight to their
+    destination, so no temporary extraction directory is needed. A manifest
+    keyed by zip path, size and mtime lets unchanged packs be skipped entirely.
+    """
+    def __init__(self, assets_dir, manifest_path=None):
+        self.assets_dir = assets_dir
+        self.manifest_path = manifest_path or os.path.join(assets_dir, MANIFEST_FILE)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        """Load the import manifest, starting fresh if it is missing or unreadable"""
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path) as f:
+                    return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading asset manifest: {e}")
+        return {}
+
+    def _save_manifest(self):
+        """Write the import manifest back to disk"""
+        try:
+            with open(self.manifest_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+        except OSError as e:
+            print(f"Error saving asset manifest: {e}")
+
+    def _manifest_key(self, zip_path):
+        """Key manifest entries by path relative to the assets directory"""
+        return os.path.relpath(zip_path, self.assets_dir).replace('\\', '/')
+
+    def is_current(self, zip_path):
+        """Check whether a pack was already imported and has not changed since"""
+        entry = self.manifest.get(self._manifest_key(zip_path))
+        if not entry:
+            return False
+        stat = os.stat(zip_path)
+        if entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime:
+            return False
+        # Re-import if any of the files we produced have been removed
+        return all(os.path.exists(os.path.join(self.assets_dir, output))
+                   for output in entry.get('outputs', []))
+
+    def _target_path(self, png_file, width, height):
+        """Decide where an image from a pack belongs, or None to skip it"""
+        name = png_file.lower()
+        # If the image is large and seems to be a grid, treat as sprite sheet
+        if width >= 256 and height >= 256 and ('sheet' in name or 'icon' in name):
+            if 'character' in name or 'icon' in name:
+                return 'character_icons.png'
+            elif 'item' in name:
+                return 'items.png'
+            return None
+
+        # Individual sprite - goes to the appropriate category directory
+        if 'character' in name:
+            category = 'characters_png'
+        elif 'item' in name:
+            category = 'items_png'
+        elif any(terrain in name for terrain in ['tree', 'rock', 'grass', 'water', 'terrain']):
+            category = 'terrain_png'
+        else:
+            return None
+        # Preserve subdirectory structure from zip
+        return f"{category}/{png_file}"
+
+    def import_pack(self, zip_path):
+        """Copy the sprites out of one pack, returning the files written"""
+        outputs = []
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            png_files = [f for f in zip_ref.namelist() if f.lower().endswith('.png')]
+            for png_file in png_files:
+                try:
+                    data = zip_ref.read(png_file)
+                    width, height = png_size(data)
+                    target = self._target_path(png_file, width, height)
+                    if not target:
+                        continue
+                    target_path = os.path.join(self.assets_dir, target)
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                    with open(target_path, 'wb') as f:
+                        f.write(data)
+                    if target not in outputs:
+                        outputs.append(target)
+                except (OSError, zipfile.BadZipFile, pygame.error) as e:
+                    print(f"Error loading {png_file}: {e}")
+        return outputs
+
+    def import_all(self):
+        """Import every changed zip pack under the assets directory"""
+        imported = 0
+        for root, _, files in os.walk(self.assets_dir):
+            for file in files:
+                if not file.endswith('.zip'):
+                    continue
+                zip_path = os.path.join(root, file)
+                try:
+                    if self.is_current(zip_path):
+                        continue
+                    outputs = self.import_pack(zip_path)
+                    stat = os.stat(zip_path)
+                    self.manifest[self._manifest_key(zip_path)] = {
+                        'size': stat.st_size,
+                        'mtime': stat.st_mtime,
+                        'outputs': outputs
+                    }
+                    imported += 1
+                except (OSError, zipfile.BadZipFile) as e:
+                    print(f"Error with zip file {zip_path}: {e}")
+        if imported:
+            self._save_manifest()
+        return imported
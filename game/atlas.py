@@ -0,0 +1,98 @@
+import pygame
+
+class TextureAtlas:
+    """Pack many small surfaces into a few large page surfaces.
+
+    Sprites are placed with a simple shelf packer (tallest first) and handed
+    back as subsurfaces of their page, so callers keep using them like any
+    other Surface while the pixels live in a handful of large allocations.
+    TileRegistry.zoom_atlas() packs the tiles for every zoom level with it,
+    and the texture renderer uploads the pages as textures.
+    SingleSprite(use_atlas=True) can pack a sprite directory too.
+    """
+    def __init__(self, page_size=512, padding=1):
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+        self.regions = {}  # name -> (page index, Rect)
+        self.sprites = {}  # name -> subsurface of its page
+        self._used = []  # Per page: (width, height) actually covered by sprites
+
+    def pack(self, surfaces):
+        """Pack a dict of name -> Surface and return a dict of name -> subsurface"""
+        # Tallest first keeps shelves tight
+        order = sorted(surfaces.items(), key=lambda item: (item[1].get_height(), item[1].get_width()), reverse=True)
+
+        shelves = []  # Per page: [shelf_y, shelf_height, cursor_x]
+        for name, surface in order:
+            width, height = surface.get_size()
+            padded_w = width + self.padding
+            padded_h = height + self.padding
+            if padded_w > self.page_size or padded_h > self.page_size:
+                # Too big to share a page - give it a page of its own
+                self._new_page((width, height))
+                shelves.append([self.page_size, 0, self.page_size])  # Never reused
+                self._place(name, surface, len(self.pages) - 1, 0, 0)
+                continue
+
+            placed = False
+            for page_index, shelf in enumerate(shelves):
+                shelf_y, shelf_h, cursor_x = shelf
+                if cursor_x + padded_w <= self.page_size and padded_h <= shelf_h:
+                    # Fits on the current shelf
+                    self._place(name, surface, page_index, cursor_x, shelf_y)
+                    shelf[2] = cursor_x + padded_w
+                    placed = True
+                    break
+                if shelf_y + shelf_h + padded_h <= self.page_size:
+                    # Open a new shelf below the current one
+                    shelf[0] = shelf_y + shelf_h
+                    shelf[1] = padded_h
+                    shelf[2] = padded_w
+                    self._place(name, surface, page_index, 0, shelf[0])
+                    placed = True
+                    break
+
+            if not placed:
+                self._new_page((self.page_size, self.page_size))
+                shelves.append([0, padded_h, padded_w])
+                self._place(name, surface, len(self.pages) - 1, 0, 0)
+
+        # Trim each page to the area actually used and convert it once,
+        # then cut the subsurfaces from the final pages
+        self.pages = [page.subsurface((0, 0, *used)).convert_alpha()
+                      for page, used in zip(self.pages, self._used, strict=True)]
+        for name, (page_index, rect) in self.regions.items():
+            self.sprites[name] = self.pages[page_index].subsurface(rect)
+        return self.sprites
+
+    def _new_page(self, size):
+        """Add an empty, fully transparent page"""
+        page = pygame.Surface(size, pygame.SRCALPHA)
+        page.fill((0, 0, 0, 0))
+        self.pages.append(page)
+        self._used.append((0, 0))
+
+    def _place(self, name, surface, page_index, x, y):
+        """Copy a surface into a page and remember where it went"""
+        rect = pygame.Rect(x, y, surface.get_width(), surface.get_height())
+        self.pages[page_index].blit(surface, rect)
+        self.regions[name] = (page_index, rect)
+        used_w, used_h = self._used[page_index]
+        self._used[page_index] = (max(used_w, rect.right), max(used_h, rect.bottom))
+
+    def get_sprite(self, name):
+        """Get the subsurface for a packed sprite"""
+        return self.sprites.get(name)
+
+    def get_region(self, name):
+        """Get (page surface, source rect) for a packed sprite, for area blits"""
+        region = self.regions.get(name)
+        if region is None:
+            return None
+        page_index, rect = region
+        return self.pages[page_index], rect
+
+    def memory_bytes(self):
+        """Total pixel bytes held by all pages"""
+        return sum(page.get_width() * page.get_height() * page.get_bytesize() for page in self.pages)
@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from game.worldgen import BiomeGenerator
+
+# Generator living in each worker process, built once by the initializer
+_worker_generator = None
+
+def _init_worker(seed, terrain_ids, overlay_ids):
+    """Build the worker's generator"""
+    global _worker_generator
+    _worker_generator = BiomeGenerator(seed, terrain_ids, overlay_ids)
+
+def _generate_in_worker(cx, cy, size):
+    """Generate one chunk and return its layers as bytes (cheap to send back)"""
+    terrain, overlay = _worker_generator.generate(cx * size, cy * size, size, size)
+    return terrain.tobytes(), overlay.tobytes()
+
+def default_workers():
+    """Leave one core for the game itself"""
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+class ChunkPipeline:
+    """Generate chunks in a process pool ahead of the player.
+
+    request() queues a chunk; collect() hands back finished chunks without
+    blocking so the main thread can merge a few per frame. If the pool can't
+    be started the pipeline stays disabled and chunks are generated inline.
+    """
+    def __init__(self, seed, terrain_ids, overlay_ids, workers=None):
+        self.pending = {}  # (cx, cy) -> Future
+        self.executor = None
+        try:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers or default_workers(),
+                initializer=_init_worker,
+                initargs=(seed, terrain_ids, overlay_ids))
+        except (OSError, NotImplementedError) as e:  # No process support on this platform
+            print(f"Error starting chunk workers, generating inline: {e}")
+
+    @property
+    def enabled(self):
+        return self.executor is not None
+
+    def request(self, cx, cy, size):
+        """Queue a chunk for generation (no-op if already queued)"""
+        key = (cx, cy)
+        if self.executor is None or key in self.pending:
+            return
+        try:
+            self.pending[key] = self.executor.submit(_generate_in_worker, cx, cy, size)
+        except RuntimeError as e:  # The pool broke (BrokenProcessPool) or was shut down
+            print(f"Error queueing chunk {key}: {e}")
+
+    def is_pending(self, key):
+        return key in self.pending
+
+    def take(self, key):
+        """Wait for a queued chunk and return (terrain bytes, overlay bytes), or None"""
+        future = self.pending.pop(key, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except (BrokenProcessPool, CancelledError) as e:
+            print(f"Error generating chunk {key}: {e}")
+            return None
+
+    def collect(self, limit):
+        """Return up to limit finished chunks as [(key, (terrain bytes, overlay bytes))]"""
+        finished = []
+        for key, future in list(self.pending.items()):
+            if len(finished) >= limit:
+                break
+            if not future.done():
+                continue
+            del self.pending[key]
+            try:
+                finished.append((key, future.result()))
+            except (BrokenProcessPool, CancelledError) as e:
+                print(f"Error generating chunk {key}: {e}")
+        return finished
+
+    def close(self):
+        """Stop the workers and drop anything still queued"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
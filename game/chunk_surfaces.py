@@ -0,0 +1,154 @@
+from collections import OrderedDict
+import pygame
+from utils.constants import CHUNK_SURFACE_BUDGET, CHUNK_BAKE_PIXELS, CHUNK_PREBAKE_MARGIN, WHITE
+
+class ChunkSurfaceCache:
+    """Pre-rendered chunk surfaces for the exploration viewport.
+
+    A chunk's terrain and overlays are baked into opaque surfaces the first
+    time it is drawn at a given cell size, so a frame is a handful of large
+    blits instead of two per-cell passes. A chunk is one surface while it is
+    at most max_bake_pixels wide; at larger cell sizes it is baked as square
+    tiles of cells that are, so a zoomed-in view keeps (and bakes) only the
+    part of a chunk it shows. A baked surface is rebuilt when its chunk's
+    version changes (an edit, or a chunk coming back from storage).
+    Surfaces are kept in an LRU capped at budget_bytes; the ones around the
+    camera are never dropped. draw() also bakes at most one not-yet-visible
+    tile near the camera per frame, so crossing into a new chunk rarely has
+    to bake it on the spot.
+    """
+    def __init__(self, tiles, budget_bytes=CHUNK_SURFACE_BUDGET, max_bake_pixels=CHUNK_BAKE_PIXELS):
+        self.tiles = tiles
+        self.budget_bytes = budget_bytes
+        self.max_bake_pixels = max_bake_pixels
+        self._surfaces = OrderedDict()  # (cx, cy, tx, ty) -> (version, cell size, surface)
+        self.cache_bytes = 0
+        self.bakes = 0
+        self.hits = 0
+
+    def draw(self, screen, chunks, camera_x, camera_y, cell_size, margin=CHUNK_PREBAKE_MARGIN):
+        """Blit the chunks under the screen, with (camera_x, camera_y) the world pixel at its top-left"""
+        screen.blits(self.layout(chunks, camera_x, camera_y, screen.get_size(), cell_size, margin), doreturn=False)
+
+    def layout(self, chunks, camera_x, camera_y, size, cell_size, margin=CHUNK_PREBAKE_MARGIN):
+        """Get [(surface, position)] covering a window of size pixels, baking what's missing"""
+        width, height = size
+        blits = []
+        for cx, cy, tx, ty, x, y in self._tiles_in(chunks.size, cell_size, camera_x, camera_y,
+                                                   camera_x + width, camera_y + height):
+            surface = self.get(chunks.get_chunk(cx, cy), cell_size, tx, ty)
+            blits.append((surface, (x - camera_x, y - camera_y)))
+
+        # Tiles within margin cells of the screen: keep them, and bake one ahead of time
+        pad = margin * cell_size
+        near = set()
+        baked_ahead = False
+        for cx, cy, tx, ty, _, _ in self._tiles_in(chunks.size, cell_size, camera_x - pad, camera_y - pad,
+                                                   camera_x + width + pad, camera_y + height + pad):
+            near.add((cx, cy, tx, ty))
+            chunk = chunks.resident.get((cx, cy))  # Only bake chunks that are already loaded
+            if not baked_ahead and chunk is not None and not self.is_current(chunk, cell_size, tx, ty):
+                self.get(chunk, cell_size, tx, ty)
+                baked_ahead = True
+        self.trim(keep=near)
+        return blits
+
+    def tile_cells(self, chunk_size, cell_size):
+        """Cells per side of the tiles a chunk is baked in at a cell size"""
+        return max(1, min(chunk_size, self.max_bake_pixels // cell_size))
+
+    def _tiles_in(self, chunk_size, cell_size, left, top, right, bottom):
+        """Yield (cx, cy, tx, ty, world x, world y) for the tiles over a world pixel rect"""
+        tile_cells = self.tile_cells(chunk_size, cell_size)
+        per_side = -(-chunk_size // tile_cells)
+        chunk_pixels = chunk_size * cell_size
+        tile_pixels = tile_cells * cell_size
+        for cy in range(top // chunk_pixels, (bottom - 1) // chunk_pixels + 1):
+            chunk_y = cy * chunk_pixels
+            for cx in range(left // chunk_pixels, (right - 1) // chunk_pixels + 1):
+                chunk_x = cx * chunk_pixels
+                for ty in range(max(0, (top - chunk_y) // tile_pixels),
+                                min(per_side, (bottom - 1 - chunk_y) // tile_pixels + 1)):
+                    for tx in range(max(0, (left - chunk_x) // tile_pixels),
+                                    min(per_side, (right - 1 - chunk_x) // tile_pixels + 1)):
+                        yield cx, cy, tx, ty, chunk_x + tx * tile_pixels, chunk_y + ty * tile_pixels
+
+    def is_current(self, chunk, cell_size, tx=0, ty=0):
+        """Whether a chunk tile has an up-to-date baked surface at this cell size"""
+        entry = self._surfaces.get((chunk.cx, chunk.cy, tx, ty))
+        return entry is not None and entry[0] == chunk.version and entry[1] == cell_size
+
+    def get(self, chunk, cell_size, tx=0, ty=0):
+        """Get the baked surface for a chunk tile at a cell size"""
+        key = (chunk.cx, chunk.cy, tx, ty)
+        entry = self._surfaces.get(key)
+        if entry is not None and entry[0] == chunk.version and entry[1] == cell_size:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return entry[2]
+
+        if entry is not None:
+            self._drop(key)
+        surface = self.bake(chunk, cell_size, tx, ty)
+        self._surfaces[key] = (chunk.version, cell_size, surface)
+        self.cache_bytes += self._surface_bytes(surface)
+        return surface
+
+    def bake(self, chunk, cell_size, tx=0, ty=0):
+        """Render a chunk tile's terrain, then its overlays, into a new surface"""
+        self.bakes += 1
+        tile_cells = self.tile_cells(chunk.size, cell_size)
+        x0, y0 = tx * tile_cells, ty * tile_cells
+        x1, y1 = min(chunk.size, x0 + tile_cells), min(chunk.size, y0 + tile_cells)
+        surface = pygame.Surface(((x1 - x0) * cell_size, (y1 - y0) * cell_size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(WHITE)
+
+        # Tiles from this cell size's atlas
+        scaled = self.tiles.scaled_images(cell_size)
+        for layer in (chunk.terrain[y0:y1, x0:x1].tolist(), chunk.overlay[y0:y1, x0:x1].tolist()):
+            blits = []
+            for ly, row in enumerate(layer):
+                y = ly * cell_size
+                for lx, tile_id in enumerate(row):
+                    image = scaled[tile_id] if tile_id < len(scaled) else None
+                    if image is not None:
+                        blits.append((image, (lx * cell_size, y)))
+            surface.blits(blits, doreturn=False)
+        return surface
+
+    def trim(self, keep=()):
+        """Drop least recently used surfaces over the budget, except the keys in keep"""
+        for key in list(self._surfaces):
+            if self.cache_bytes <= self.budget_bytes:
+                break
+            if key not in keep:
+                self._drop(key)
+
+    def invalidate(self, key=None):
+        """Drop one chunk's surfaces, or all of them"""
+        if key is None:
+            self._surfaces.clear()
+            self.cache_bytes = 0
+            return
+        for tile_key in [tile_key for tile_key in self._surfaces if tile_key[:2] == key]:
+            self._drop(tile_key)
+
+    def _drop(self, key):
+        _, _, surface = self._surfaces.pop(key)
+        self.cache_bytes -= self._surface_bytes(surface)
+
+    @staticmethod
+    def _surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get_stats(self):
+        """Get cache counters"""
+        return {
+            'surfaces': len(self._surfaces),
+            'cache_bytes': self.cache_bytes,
+            'budget_bytes': self.budget_bytes,
+            'bakes': self.bakes,
+            'hits': self.hits,
+        }
@@ -0,0 +1,310 @@
+import itertools
+import os
+import zlib
+from collections import OrderedDict
+import numpy as np
+from utils.constants import CHUNK_SIZE, CHUNK_RESIDENT_RADIUS, CHUNK_MAX_RESIDENT, CHUNK_MAX_STORED, CHUNK_MERGE_LIMIT
+
+class Chunk:
+    """A square block of world cells stored as dense uint8 layers.
+
+    terrain and overlay hold tile IDs; passable (0/1) and cost are derived from
+    them through the tile registry's lookup tables. Every layer is a
+    (size, size) array indexed [local_y, local_x], four bytes per cell in all.
+    Only the two ID layers are compressed on eviction - the others are rebuilt.
+
+    version changes whenever the chunk's contents might have (every new Chunk
+    object gets a fresh one, and touch() bumps it), so anything cached from a
+    chunk can check it is still current.
+    """
+    LAYERS = ('terrain', 'overlay', 'passable', 'cost')
+    _versions = itertools.count(1)
+
+    def __init__(self, cx, cy, terrain, overlay, tiles):
+        self.cx = cx
+        self.cy = cy
+        self.size = terrain.shape[0]
+        self.terrain = terrain
+        self.overlay = overlay
+        self.passable, self.cost = tiles.cell_layers(terrain, overlay)
+        self.version = next(self._versions)
+
+    def touch(self):
+        """Mark the chunk as modified"""
+        self.version = next(self._versions)
+
+    @classmethod
+    def from_bytes(cls, cx, cy, size, terrain, overlay, tiles):
+        """Build a chunk from raw row-major ID layers"""
+        terrain = np.frombuffer(terrain, dtype=np.uint8).reshape(size, size).copy()
+        overlay = np.frombuffer(overlay, dtype=np.uint8).reshape(size, size).copy()
+        return cls(cx, cy, terrain, overlay, tiles)
+
+    def refresh_cell(self, lx, ly, tiles):
+        """Recompute passability and cost for one cell after an edit"""
+        terrain_id = self.terrain[ly, lx]
+        overlay_id = self.overlay[ly, lx]
+        self.passable[ly, lx] = tiles.passable_lut[terrain_id] & tiles.passable_lut[overlay_id]
+        self.cost[ly, lx] = max(tiles.cost_lut[terrain_id], tiles.cost_lut[overlay_id], 1)
+
+    def pack(self):
+        """Compress both ID layers into a single blob"""
+        return zlib.compress(self.terrain.tobytes() + self.overlay.tobytes())
+
+    @classmethod
+    def unpack(cls, cx, cy, size, data, tiles):
+        """Rebuild a chunk from a blob made by pack()"""
+        raw = zlib.decompress(data)
+        cells = size * size
+        return cls.from_bytes(cx, cy, size, raw[:cells], raw[cells:], tiles)
+
+    def nbytes(self):
+        """Bytes held by all layers"""
+        return sum(getattr(self, layer).nbytes for layer in self.LAYERS)
+
+class ChunkManager:
+    """Generate world chunks on demand and keep only the ones near the player.
+
+    generator(cx, cy, size) returns a Chunk the first time a chunk is touched;
+    tiles is the TileRegistry used to derive the passability and cost layers.
+    Resident chunks form an LRU; once there are more than max_resident of them
+    the least recently used chunks outside resident_radius (in chunks, around
+    the player) are compressed and stored in memory, or written to spill_dir
+    when one is given. Touching an evicted chunk restores it from there.
+    The store is an LRU too: past max_stored chunks the oldest ones that were
+    never edited are dropped, since the generator gives them back unchanged.
+    Edited chunks are the only copy of their changes and are always kept.
+
+    With a pipeline (see game.chunk_pipeline) attached, chunks near the player
+    are queued for background generation instead of being built inline, and
+    poll() merges the finished ones a few at a time. Touching a chunk that is
+    still queued waits for it; the 'waited' counter should stay at zero.
+    """
+    def __init__(self, generator, tiles, size=CHUNK_SIZE, resident_radius=CHUNK_RESIDENT_RADIUS,
+                 max_resident=CHUNK_MAX_RESIDENT, max_stored=CHUNK_MAX_STORED, spill_dir=None, pipeline=None):
+        self.generator = generator
+        self.tiles = tiles
+        self.pipeline = pipeline
+        self.size = size
+        self.resident_radius = resident_radius
+        self.max_resident = max_resident
+        self.max_stored = max_stored
+        self.spill_dir = spill_dir
+        self.resident = OrderedDict()  # (cx, cy) -> Chunk, least recently used first
+        self.stored = OrderedDict()  # (cx, cy) -> compressed bytes, or file path when spilling
+        self.edited = set()  # Chunks changed since they were generated
+        self.generated = 0
+        self.evicted = 0
+        self.restored = 0
+        self.dropped = 0
+        self.prefetched = 0
+        self.waited = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def chunk_coords(self, x, y):
+        """Get the chunk holding world cell (x, y)"""
+        return x // self.size, y // self.size
+
+    def get_chunk(self, cx, cy):
+        """Get a chunk, generating or restoring it if it isn't resident"""
+        key = (cx, cy)
+        chunk = self.resident.get(key)
+        if chunk is not None:
+            self.resident.move_to_end(key)
+            return chunk
+
+        chunk = None
+        if key in self.stored:
+            chunk = self._restore(key)
+        elif self.pipeline and self.pipeline.is_pending(key):
+            layers = self.pipeline.take(key)
+            if layers:
+                chunk = self._from_layers(key, layers)
+                self.waited += 1
+        if chunk is None:
+            chunk = self.generator(cx, cy, self.size)
+            self.generated += 1
+        self.resident[key] = chunk
+        return chunk
+
+    def _from_layers(self, key, layers):
+        """Build a chunk from the (terrain bytes, overlay bytes) a worker sent back"""
+        terrain, overlay = layers
+        return Chunk.from_bytes(key[0], key[1], self.size, terrain, overlay, self.tiles)
+
+    def is_known(self, key):
+        """Whether a chunk exists already (resident or stored)"""
+        return key in self.resident or key in self.stored
+
+    def prefetch(self, x, y, radius):
+        """Queue background generation of the chunks within radius of world cell (x, y)"""
+        if not (self.pipeline and self.pipeline.enabled):
+            return
+        pcx, pcy = self.chunk_coords(x, y)
+        for cy in range(pcy - radius, pcy + radius + 1):
+            for cx in range(pcx - radius, pcx + radius + 1):
+                if not self.is_known((cx, cy)):
+                    self.pipeline.request(cx, cy, self.size)
+
+    def poll(self, limit=CHUNK_MERGE_LIMIT):
+        """Merge up to limit chunks the pipeline has finished, without blocking"""
+        if not self.pipeline:
+            return 0
+        merged = 0
+        for key, layers in self.pipeline.collect(limit):
+            if self.is_known(key):
+                continue
+            self.resident[key] = self._from_layers(key, layers)
+            self.prefetched += 1
+            merged += 1
+        return merged
+
+    def get_cell(self, layer, x, y):
+        """Get one layer's value at a world cell"""
+        cx, lx = divmod(x, self.size)
+        cy, ly = divmod(y, self.size)
+        return int(getattr(self.get_chunk(cx, cy), layer)[ly, lx])
+
+    def get_terrain(self, x, y):
+        """Get the terrain tile ID at a world cell"""
+        return self.get_cell('terrain', x, y)
+
+    def get_overlay(self, x, y):
+        """Get the overlay tile ID at a world cell (0 for none)"""
+        return self.get_cell('overlay', x, y)
+
+    def is_passable(self, x, y):
+        """Whether a world cell can be walked on"""
+        return self.get_cell('passable', x, y) == 1
+
+    def get_cost(self, x, y):
+        """Get the movement cost of a world cell"""
+        return self.get_cell('cost', x, y)
+
+    def set_terrain(self, x, y, tile_id):
+        """Set the terrain tile ID at a world cell"""
+        self._set_cell('terrain', x, y, tile_id)
+
+    def set_overlay(self, x, y, tile_id):
+        """Set the overlay tile ID at a world cell"""
+        self._set_cell('overlay', x, y, tile_id)
+
+    def _set_cell(self, layer, x, y, tile_id):
+        """Write a tile ID and keep the derived layers in step"""
+        cx, lx = divmod(x, self.size)
+        cy, ly = divmod(y, self.size)
+        chunk = self.get_chunk(cx, cy)
+        getattr(chunk, layer)[ly, lx] = tile_id
+        chunk.refresh_cell(lx, ly, self.tiles)
+        chunk.touch()
+        self.edited.add((cx, cy))
+
+    def versions_in(self, x0, y0, width, height):
+        """Versions of the chunks covering a world rectangle, to tell whether it changed"""
+        return tuple(self.get_chunk(cx, cy).version
+                     for cy in range(y0 // self.size, (y0 + height - 1) // self.size + 1)
+                     for cx in range(x0 // self.size, (x0 + width - 1) // self.size + 1))
+
+    def get_region(self, layer, x0, y0, width, height):
+        """Copy one layer over a world rectangle into a (height, width) uint8 array"""
+        region = np.empty((height, width), dtype=np.uint8)
+        size = self.size
+        for cy in range(y0 // size, (y0 + height - 1) // size + 1):
+            top = max(y0, cy * size)
+            bottom = min(y0 + height, (cy + 1) * size)
+            for cx in range(x0 // size, (x0 + width - 1) // size + 1):
+                left = max(x0, cx * size)
+                right = min(x0 + width, (cx + 1) * size)
+                source = getattr(self.get_chunk(cx, cy), layer)
+                region[top - y0:bottom - y0, left - x0:right - x0] = \
+                    source[top - cy * size:bottom - cy * size, left - cx * size:right - cx * size]
+        return region
+
+    def update(self, x, y):
+        """Load the chunks around world cell (x, y) and evict far ones over the limit"""
+        pcx, pcy = self.chunk_coords(x, y)
+        radius = self.resident_radius
+        if self.pipeline and self.pipeline.enabled:
+            # Let the workers build them; they're merged by poll()
+            self.poll()
+            self.prefetch(x, y, radius)
+        else:
+            for cy in range(pcy - radius, pcy + radius + 1):
+                for cx in range(pcx - radius, pcx + radius + 1):
+                    self.get_chunk(cx, cy)
+
+        if len(self.resident) <= self.max_resident:
+            return
+        # Oldest first; chunks around the player are never evicted
+        for key in list(self.resident):
+            if len(self.resident) <= self.max_resident:
+                break
+            if max(abs(key[0] - pcx), abs(key[1] - pcy)) > radius:
+                self._evict(key)
+
+    def _evict(self, key):
+        """Compress a resident chunk and move it to storage"""
+        data = self.resident.pop(key).pack()
+        if self.spill_dir:
+            path = os.path.join(self.spill_dir, f"chunk_{key[0]}_{key[1]}.bin")
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                data = path
+            except OSError as e:
+                print(f"Error spilling chunk {key} to disk: {e}")
+        self.stored[key] = data
+        self.evicted += 1
+        self._trim_store()
+
+    def _trim_store(self):
+        """Drop the least recently stored unedited chunks while the store is over max_stored"""
+        excess = len(self.stored) - self.max_stored
+        if excess <= 0:
+            return
+        for key in list(self.stored):
+            if excess <= 0:
+                break
+            if key in self.edited:
+                continue
+            data = self.stored.pop(key)
+            if isinstance(data, str) and os.path.exists(data):
+                os.remove(data)
+            self.dropped += 1
+            excess -= 1
+
+    def _restore(self, key):
+        """Bring a stored chunk back into memory"""
+        data = self.stored.pop(key)
+        if isinstance(data, str):
+            with open(data, 'rb') as f:
+                data = f.read()
+        self.restored += 1
+        return Chunk.unpack(key[0], key[1], self.size, data, self.tiles)
+
+    def clear(self):
+        """Forget every chunk (resident and stored)"""
+        for data in self.stored.values():
+            if isinstance(data, str) and os.path.exists(data):
+                os.remove(data)
+        self.resident.clear()
+        self.stored.clear()
+        self.edited.clear()
+
+    def get_stats(self):
+        """Get chunk counters"""
+        stored_bytes = sum(len(data) for data in self.stored.values() if isinstance(data, bytes))
+        return {
+            'resident': len(self.resident),
+            'resident_bytes': sum(chunk.nbytes() for chunk in self.resident.values()),
+            'stored': len(self.stored),
+            'stored_bytes': stored_bytes,
+            'generated': self.generated,
+            'evicted': self.evicted,
+            'restored': self.restored,
+            'dropped': self.dropped,
+            'prefetched': self.prefetched,
+            'waited': self.waited,
+            'pending': len(self.pipeline.pending) if self.pipeline else 0,
+        }
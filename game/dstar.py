@@ -0,0 +1,193 @@
+import heapq
+import math
+from game.pathfinding import CostGrid, SQRT2
+
+class IncrementalPlanner:
+    """D* Lite over a CostGrid for paths that are asked for again and again with small changes.
+
+    The search tree is rooted at the player (the start of every path) and
+    grows towards the query cell, the one the mouse is over. g and rhs hold
+    the cost from the root to each cell; a cell is settled once they agree.
+    Moving the query to another cell only shifts the heuristic, which D* Lite
+    absorbs in km instead of re-keying the open list, so the cells settled
+    for earlier queries are reused and a nearby query usually expands just a
+    handful more. When tiles change, the grid is diffed against the new one
+    and only the changed cells and their neighbours are re-evaluated.
+
+    A new root or a different rectangle starts over from scratch.
+    """
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.grid = None
+        self.root = None
+        self.region = None
+        self.versions = None
+        self.updates = 0
+        self.resets = 0
+        self.expanded = 0
+        self.repaired_cells = 0
+
+    def _reset(self, root, region):
+        """Start a new search tree at root over a rectangle of the world"""
+        self.grid = CostGrid.from_chunks(self.chunks, *region)
+        self.versions = self.chunks.versions_in(*region)
+        self.root = root
+        self.region = region
+        stride = self.grid.stride
+        self._straight = (1, -1, stride, -stride)
+        self._diagonal = ((stride + 1, 1, stride), (stride - 1, -1, stride),
+                          (1 - stride, 1, -stride), (-1 - stride, -1, -stride))
+        self._root = self.grid.index(*root)
+        self._g = {}
+        self._rhs = {self._root: 0}
+        self._open = []  # Heap of (key, cell); stale entries are skipped
+        self._keys = {}  # cell -> its current key in the open list
+        self._query = self._root
+        self._km = 0
+        self._push(self._root)
+        self.resets += 1
+
+    def _heuristic(self, a, b):
+        """Octile distance between two flat indices"""
+        a_row, a_col = divmod(a, self.grid.stride)
+        b_row, b_col = divmod(b, self.grid.stride)
+        dx = abs(a_col - b_col)
+        dy = abs(a_row - b_row)
+        return dx + dy + (SQRT2 - 2) * min(dx, dy)
+
+    def _key(self, cell):
+        best = min(self._g.get(cell, math.inf), self._rhs.get(cell, math.inf))
+        return (best + self._heuristic(cell, self._query) + self._km, best)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self._keys[cell] = key
+        heapq.heappush(self._open, (key, cell))
+
+    def _edges(self, cell):
+        """(neighbour, step multiplier) for every step between cell and a passable neighbour"""
+        costs = self.grid.costs
+        for step in self._straight:
+            if costs[cell + step]:
+                yield cell + step, 1
+        for step, side_a, side_b in self._diagonal:
+            if costs[cell + step] and costs[cell + side_a] and costs[cell + side_b]:
+                yield cell + step, SQRT2
+
+    def _update_cell(self, cell):
+        """Recompute rhs from the neighbours and put the cell on the open list if it is inconsistent"""
+        if cell != self._root:
+            cost = self.grid.costs[cell]
+            rhs = math.inf
+            if cost:
+                g = self._g
+                for neighbour, multiplier in self._edges(cell):
+                    rhs = min(rhs, g.get(neighbour, math.inf) + cost * multiplier)
+            self._rhs[cell] = rhs
+        self._keys.pop(cell, None)
+        if self._g.get(cell, math.inf) != self._rhs.get(cell, math.inf):
+            self._push(cell)
+
+    def _compute(self):
+        """Settle cells until the query's cost is known"""
+        g = self._g
+        rhs = self._rhs
+        keys = self._keys
+        costs = self.grid.costs
+        query = self._query
+        root = self._root
+        inf = math.inf
+        while self._open:
+            key, cell = self._open[0]
+            if keys.get(cell) != key:
+                heapq.heappop(self._open)
+                continue
+            if key >= self._key(query) and rhs.get(query, inf) == g.get(query, inf):
+                break
+            heapq.heappop(self._open)
+            new_key = self._key(cell)
+            if key < new_key:
+                self._push(cell)
+                continue
+            del keys[cell]
+            self.expanded += 1
+            best = rhs.get(cell, inf)
+            if g.get(cell, inf) > best:
+                # Settling a cell can only lower its neighbours' rhs: no need to look at all of theirs
+                g[cell] = best
+                for neighbour, multiplier in self._edges(cell):
+                    if neighbour == root:
+                        continue
+                    candidate = best + costs[neighbour] * multiplier
+                    if candidate < rhs.get(neighbour, inf):
+                        rhs[neighbour] = candidate
+                        if g.get(neighbour, inf) != candidate:
+                            self._push(neighbour)
+                        else:
+                            keys.pop(neighbour, None)
+            else:
+                g[cell] = inf
+                self._update_cell(cell)
+                for neighbour, _ in self._edges(cell):
+                    self._update_cell(neighbour)
+
+    def _repair(self):
+        """Pick up tile edits inside the rectangle, re-evaluating only around changed cells"""
+        versions = self.chunks.versions_in(*self.region)
+        if versions == self.versions:
+            return
+        self.versions = versions
+        fresh = CostGrid.from_chunks(self.chunks, *self.region)
+        old = self.grid.costs
+        changed = [index for index, (before, after) in enumerate(zip(old, fresh.costs, strict=True)) if before != after]
+        self.grid = fresh
+        stride = self.grid.stride
+        around = set()
+        for index in changed:
+            for offset in (0, 1, -1, stride, -stride, stride + 1, stride - 1, 1 - stride, -1 - stride):
+                around.add(index + offset)
+        for cell in around:
+            if 0 <= cell < len(fresh.costs):
+                self._update_cell(cell)
+        self.repaired_cells += len(changed)
+
+    def plan(self, start, goal, region):
+        """Get the cells after start up to and including goal, or [] if it can't be reached in region"""
+        self.updates += 1
+        if start != self.root or region != self.region:
+            self._reset(start, region)
+        else:
+            self._repair()
+        if start == goal or not self.grid.contains(*goal):
+            return []
+        query = self.grid.index(*goal)
+        if not self.grid.costs[query] or not self.grid.costs[self._root]:
+            return []  # Nothing leads into an impassable start
+        self._km += self._heuristic(self._query, query)
+        self._query = query
+        self._compute()
+
+        g = self._g
+        if g.get(query, math.inf) == math.inf:
+            return []
+        # Walk back to the root along the cheapest settled neighbours
+        costs = self.grid.costs
+        path = []
+        cell = query
+        while cell != self._root and len(path) < len(costs):
+            path.append(self.grid.cell(cell))
+            cost = costs[cell]
+            cell = min(self._edges(cell), key=lambda edge: g.get(edge[0], math.inf) + cost * edge[1])[0]
+        if cell != self._root:
+            return []  # The walk back went round in circles instead of reaching the start
+        path.reverse()
+        return path
+
+    def get_stats(self):
+        """Get planner counters"""
+        return {
+            'updates': self.updates,
+            'resets': self.resets,
+            'expanded': self.expanded,
+            'repaired_cells': self.repaired_cells,
+        }
@@ -0,0 +1,188 @@
+import heapq
+import math
+from game.pathfinding import CostGrid, SQRT2
+
+class FlowField:
+    """A Dijkstra map of the cost to walk from any cell to the player.
+
+    The field is one reverse Dijkstra search from the player's cell over the
+    always resident chunks (the player's chunk and radius chunks around it),
+    shared by every monster: each one finds its next step by looking at its 8
+    neighbours. The search is lazy. Cells are only settled out to the cost of
+    the farthest cell anyone has asked about, and the open list is kept for
+    the next question.
+
+    When the player takes one step, the old field plus the cost of that step
+    is still a real (if not always the cheapest) cost for every cell, since
+    walking to where the player was and then following them is a valid path.
+    That shift is one offset added to every stored value. Values and open
+    list keys are stored without it, so the open list stays in order. The new
+    cell goes on the open list and only lowers the cells that get cheaper,
+    and only as far out as monsters ask. The field is rebuilt when the player
+    jumps, moves into another chunk (the window moves with them) or a tile in
+    the window changes.
+    """
+    EPSILON = 1e-9  # Summing steps in another order can differ in the last bits
+
+    def __init__(self, chunks, radius=None):
+        self.chunks = chunks
+        self.radius = chunks.resident_radius if radius is None else radius
+        self.grid = None
+        self.window = None
+        self.versions = None
+        self.source = None  # Player cell the field leads to
+        self._field = []  # Stored cost per flat index; the real cost adds _offset
+        self._open = []  # Heap of (stored cost, index) still to be settled; stale entries are skipped
+        self._offset = 0
+        self._drained = False  # Whether the open list has run dry since the last rebuild
+        self.rebuilds = 0
+        self.shifts = 0
+        self.settled = 0
+
+    def _window(self, x, y):
+        """(x0, y0, width, height) of the resident chunks around a cell"""
+        cx, cy = self.chunks.chunk_coords(x, y)
+        size = self.chunks.size
+        side = (2 * self.radius + 1) * size
+        return (cx - self.radius) * size, (cy - self.radius) * size, side, side
+
+    def _step_cost(self, a, b):
+        """Cost of a single legal step from index a onto b, or None"""
+        costs = self.grid.costs
+        stride = self.grid.stride
+        if not costs[b]:
+            return None
+        delta = b - a
+        if delta in (1, -1, stride, -stride):
+            return costs[b]
+        if delta in (stride + 1, stride - 1, 1 - stride, -1 - stride):
+            row, col = divmod(delta + stride + 1, stride)
+            if costs[a + col - 1] and costs[a + (row - 1) * stride]:
+                return costs[b] * SQRT2
+        return None
+
+    def _settle(self, target):
+        """Run the search until the cost stored for index target is final"""
+        field = self._field
+        if field[target] == math.inf and self._drained:
+            return  # Walled off from the player
+        open_list = self._open
+        costs = self.grid.costs
+        stride = self.grid.stride
+        epsilon = self.EPSILON
+        straight = (1, -1, stride, -stride)
+        diagonal = ((stride + 1, 1, stride), (stride - 1, -1, stride),
+                    (1 - stride, 1, -stride), (-1 - stride, -1, -stride))
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        settled = 0
+
+        # Nothing left below the target's cost can lower it any more
+        while open_list and open_list[0][0] < field[target] - epsilon:
+            cost_so_far, node = heappop(open_list)
+            if cost_so_far > field[node] + epsilon:
+                continue
+            settled += 1
+            # A monster on the neighbour pays for stepping onto node
+            step = costs[node]
+            for move in straight:
+                neighbour = node + move
+                if costs[neighbour]:
+                    new_cost = cost_so_far + step
+                    if new_cost < field[neighbour] - epsilon:
+                        field[neighbour] = new_cost
+                        heappush(open_list, (new_cost, neighbour))
+            diagonal_step = step * SQRT2
+            for move, side_a, side_b in diagonal:
+                neighbour = node + move
+                if costs[neighbour] and costs[node + side_a] and costs[node + side_b]:
+                    new_cost = cost_so_far + diagonal_step
+                    if new_cost < field[neighbour] - epsilon:
+                        field[neighbour] = new_cost
+                        heappush(open_list, (new_cost, neighbour))
+        if not open_list:
+            self._drained = True
+        self.settled += settled
+
+    def rebuild(self, x, y):
+        """Start a new field for the player at (x, y)"""
+        self.window = self._window(x, y)
+        self.grid = CostGrid.from_chunks(self.chunks, *self.window)
+        self.versions = self.chunks.versions_in(*self.window)
+        self.source = (x, y)
+        self._offset = 0
+        self._field = [math.inf] * len(self.grid.costs)
+        origin = self.grid.index(x, y)
+        self._field[origin] = 0
+        self._open = [(0, origin)]
+        self._drained = False
+        self.rebuilds += 1
+
+    def update(self, x, y):
+        """Follow the player to (x, y)"""
+        if (self.window is None or self._window(x, y) != self.window
+                or self.chunks.versions_in(*self.window) != self.versions):
+            self.rebuild(x, y)
+            return
+        if (x, y) == self.source:
+            return
+        old = self.grid.index(*self.source)
+        new = self.grid.index(x, y)
+        # Monsters that were heading for the old cell can carry on to the new one
+        step = self._step_cost(old, new)
+        if step is None:
+            self.rebuild(x, y)
+            return
+        self._offset += step
+        self.source = (x, y)
+        self._field[new] = -self._offset
+        heapq.heappush(self._open, (-self._offset, new))
+        self.shifts += 1
+
+    def cost_at(self, x, y):
+        """Cost to walk from a cell to the player (inf when unreachable or outside the field)"""
+        if self.grid is None or not self.grid.contains(x, y):
+            return math.inf
+        node = self.grid.index(x, y)
+        self._settle(node)
+        return self._field[node] + self._offset
+
+    def next_step(self, x, y):
+        """The neighbouring cell to step onto from (x, y) towards the player, or None"""
+        if self.grid is None or not self.grid.contains(x, y) or (x, y) == self.source:
+            return None
+        node = self.grid.index(x, y)
+        # Once node is settled, so is its cheapest neighbour; the rest can only look worse
+        self._settle(node)
+        field = self._field
+        costs = self.grid.costs
+        stride = self.grid.stride
+        best, best_cost = None, math.inf
+        for move in (1, -1, stride, -stride):
+            neighbour = node + move
+            if costs[neighbour]:
+                cost = costs[neighbour] + field[neighbour]
+                if cost < best_cost:
+                    best, best_cost = neighbour, cost
+        for move, side_a, side_b in ((stride + 1, 1, stride), (stride - 1, -1, stride),
+                                     (1 - stride, 1, -stride), (-1 - stride, -1, -stride)):
+            neighbour = node + move
+            if costs[neighbour] and costs[node + side_a] and costs[node + side_b]:
+                cost = costs[neighbour] * SQRT2 + field[neighbour]
+                if cost < best_cost:
+                    best, best_cost = neighbour, cost
+        return None if best is None else self.grid.cell(best)
+
+    def invalidate(self):
+        """Forget the field (a new world was generated)"""
+        self.window = None
+        self.grid = None
+        self._open = []
+
+    def get_stats(self):
+        """Get field counters"""
+        return {
+            'rebuilds': self.rebuilds,
+            'shifts': self.shifts,
+            'settled': self.settled,
+        }
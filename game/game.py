@@ -2,18 +2,22 @@ import pygame
 import time
 import random
 from utils.constants import (
-    WINDOW_SIZE, WHITE, BLACK, GREEN, SOUND_ENEMY_DEFEAT,
-    SOUND_PLAYER_DEFEAT, SOUND_FLEE, WINDOW_TITLE
+    WINDOW_SIZE, WHITE, SOUND_ENEMY_DEFEAT, WINDOW_TITLE, FRAME_RATE, IDLE_WAIT_MS, RENDER_BACKEND,
+    SIMULATION_RATE, MAX_FRAME_TIME
 )
 from utils.helpers import play_sound, save_game, load_game, load_sprite_mappings
 from entities.character import Character
 from entities.items import Item, Inventory
 from ui.console import MessageConsole
+from ui.dirty_rects import dirty_rects
+from ui.render_queue import render_queue
 from game.world import World
+from game.movement import MovementController
+from game.states import StateStack, ExplorationState, GameOverState
 from game.sprites import sprite_manager
 
 class Game:
-    def __init__(self):
+    def __init__(self, backend=RENDER_BACKEND):
         # Initialize Pygame display first
         pygame.init()
         pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
@@ -25,40 +29,9 @@ class Game:
         # Load sprite mappings if they exist
         load_sprite_mappings()
         
-        # Debug view flags
-        self.show_debug = False
-        self.show_sprite_debug = False
-        
-        # Create player character
-        self.player = Character(
-            name="Hero",
-            health=100,
-            attack=10,
-            character_type='player'
-        )
-        
-        # Create world with player
-        self.world = World(self.player)
-        self.world.show_debug = self.show_debug
-        self.world.show_sprite_debug = self.show_sprite_debug
-        
-        # Create message console
-        self.console = MessageConsole()
-        
-        # Game state
-        self.running = True
-        self.in_combat = False
-        self.current_enemy = None
-        self.combat_options = [
-            "Attack",
-            "Strong Attack",
-            "Heal",
-            "Flee"
-        ]
-        self.selected_option = 0
-        
-        # Add message console
-        self.message_console = MessageConsole(max_messages=6)
+        # Exploration view toggles
+        self.show_minimap = True
+        self.show_kills = False
         
         # Try to load saved game
         save_data = load_game()
@@ -86,19 +59,37 @@ class Game:
                     if item_data:
                         self.player.equipment[slot] = Item.from_dict(item_data)
         else:
-            self.player = Character("Hero")
+            self.player = self.create_player()
+        
+        # Create world with player, on the saved seed if there is one
+        saved_world = save_data.get("world", {}) if save_data else {}
+        self.world = World(self.player, backend, saved_world.get("seed"))
+        
+        # Create message console
+        self.console = MessageConsole()
+        
+        # Game state
+        self.running = True
+        self.in_combat = False
+        self.current_enemy = None
+        self.combat_options = [
+            "Attack",
+            "Strong Attack",
+            "Heal",
+            "Flee"
+        ]
+        self.selected_option = 0
+        
+        # Add message console
+        self.message_console = MessageConsole(max_messages=6)
         
         self.enemies = ["Goblin", "Orc", "Troll", "Dragon"]
-        self.game_running = True
-        self.show_inventory = False
         
-        # Initialize world with player
-        self.world = World(self.player)
+        # Restore player position if save exists; either way start on a cell the player can stand on
+        self.world.place_player(saved_world.get("player_x", 0), saved_world.get("player_y", 0))
         
-        # Restore player position if save exists
-        if save_data and "world" in save_data:
-            self.world.player_x = save_data["world"].get("player_x", 0)
-            self.world.player_y = save_data["world"].get("player_y", 0)
+        # Walks the player along clicked paths a little every frame
+        self.movement = MovementController(self.world)
         
         # Initialize game state
         self.in_combat = False
@@ -109,10 +100,36 @@ class Game:
         self.message_time = 0
         self.message_duration = 3  # seconds
         
+        # Exploration, battles, the inventory and debug views; see run()
+        self.states = StateStack()
+        self.step_time = 1 / SIMULATION_RATE  # Seconds of game time per update
+        self.delayed_messages = []  # [seconds left, message] waiting to be shown
+        
         # Display initial viewport
         self.world.display_viewport()
         print("Game initialized")  # Debug print
 
+    def create_player(self):
+        """A new level 1 hero"""
+        return Character(
+            name="Hero",
+            health=100,
+            attack=10,
+            character_type='player'
+        )
+
+    def new_game(self):
+        """Start over with a new hero on a newly seeded world (the save is kept until the next save)"""
+        self.movement.stop()
+        self.player = self.create_player()
+        world = self.world
+        world.player = self.player
+        world.player_x, world.player_y = 0, 0
+        world.seed = random.randrange(2**32)
+        world.generate_world()
+        world.place_player(0, 0)
+        self.show_message("A new adventure begins!")
+
     def create_enemy(self):
         enemy_name = random.choice(self.enemies)
         if enemy_name == "Dragon":
@@ -127,9 +144,7 @@ class Game:
     def handle_inventory_input(self, event):
         """Handle input while inventory is open"""
         if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_i:  # Close inventory
-                self.show_inventory = False
-            elif event.key == pygame.K_u:  # Unequip menu
+            if event.key == pygame.K_u:  # Unequip menu
                 self.message = "Press 1 for weapon, 2 for armor"
                 self.message_console.add_message("Press 1 for weapon, 2 for armor")
                 self.message_time = time.time()
@@ -156,242 +171,58 @@ class Game:
                         self.message_console.add_message(f"Cannot equip {item.name}")
                     self.message_time = time.time()
 
-    def handle_movement(self, event):
-        self.message = "Click to move, Q to quit"
-        self.message_time = time.time()
-        show_kills = False
-        clock = pygame.time.Clock()
-        
-        while True:
-            # Process all events at the start of each frame
-            events = pygame.event.get()
-            
-            # Handle sprite debug view first
-            if self.show_sprite_debug:
-                self.world.draw_sprite_debug()
-            # Then handle regular viewport if not in sprite debug or inventory
-            elif not self.show_inventory:
-                self.world.display_viewport()
-                
-                # Draw message console only in game view
-                if not self.show_debug and not self.show_sprite_debug:
-                    console_width = self.world.window_width // 3
-                    console_height = self.world.window_height // 4
-                    console_x = self.world.window_width - console_width - 10
-                    console_y = self.world.window_height - console_height - 40
-                    self.message_console.draw(self.world.screen, console_x, console_y, 
-                                           console_width, console_height)
-            
-            # Draw inventory over the last frame if it's open
-            if self.show_inventory:
-                # Don't clear the screen, just draw overlay and inventory
-                self.draw_inventory_screen()
-                
-                # Draw message in white if within duration
-                if time.time() - self.message_time < self.message_duration:
-                    self.world.draw_text(self.message, (10, self.world.window_height - 30), WHITE)
-            else:
-                # Draw kill statistics if enabled (only when inventory is closed)
-                if show_kills:
-                    kills_y = self.world.window_height - 60
-                    kills_text = "Kills: "
-                    for enemy in ["Goblin", "Orc", "Troll", "Dragon"]:
-                        kills = self.player.kills.get(enemy, 0)
-                        kills_text += f"{enemy}: {kills} | "
-                    kills_text = kills_text[:-3]  # Remove last separator
-                    self.world.draw_text(kills_text, (20, kills_y), BLACK)
-                
-                # Draw message in black if within duration
-                if time.time() - self.message_time < self.message_duration:
-                    self.world.draw_text(self.message, (10, self.world.window_height - 30), BLACK)
-            
-            # Process events
-            for event in events:
-                if event.type == pygame.QUIT:
-                    return None
-                
-                # Handle window resize events
-                if event.type == pygame.VIDEORESIZE:
-                    self.world.handle_resize(event.size)
-                    continue
-                
-                # Pass all events to the sprite debug handler if sprite debug is active
-                if self.show_sprite_debug:
-                    if self.world.handle_sprite_debug_click(pygame.mouse.get_pos(), event):
-                        continue
-                        
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left click
-                        mouse_pos = event.pos
-                        # Handle sprite debug clicks (for compatibility with older code)
-                        if self.show_sprite_debug:
-                            if self.world.handle_sprite_debug_click(mouse_pos, event):
-                                continue
-                            
-                        # Check if console button was clicked
-                        console_width = self.world.window_width // 3
-                        console_height = self.world.window_height // 4
-                        console_x = self.world.window_width - console_width - 10
-                        console_y = self.world.window_height - console_height - 40
-                        console_rect = pygame.Rect(console_x, console_y, console_width, console_height)
-                        
-                        if self.message_console.toggle_collapse(mouse_pos, console_rect):
-                            continue  # Skip movement handling if console was clicked
-                            
-                        # Handle movement click only if not in debug views
-                        if not self.show_inventory and not self.show_debug and not self.show_sprite_debug:
-                            offset_x = (mouse_pos[0] - self.world.window_width//2) // self.world.CELL_SIZE
-                            offset_y = (mouse_pos[1] - self.world.window_height//2) // self.world.CELL_SIZE
-                            target_x = self.world.player_x + offset_x
-                            target_y = self.world.player_y + offset_y
-                            path = self.world.get_path_to(target_x, target_y)
-                            if path:
-                                for next_x, next_y in path:
-                                    has_encounter = self.world.move_player(next_x, next_y)
-                                    if has_encounter:
-                                        enemy = self.create_enemy()
-                                        self.battle(enemy)
-                                        break
-                                    time.sleep(0.2)
-                                return False
-                            else:
-                                self.message = "Cannot move there!"
-                                self.message_console.add_message("Cannot move there!")
-                                self.message_time = time.time()
-                elif event.type == pygame.KEYDOWN:
-                    # First handle any sprite debug keyboard events
-                    if self.show_sprite_debug and self.world.handle_sprite_debug_click(pygame.mouse.get_pos(), event):
-                        continue
-                        
-                    # Then handle global keyboard shortcuts
-                    if event.key == pygame.K_q:
-                        return None  # Quit
-                    elif event.key == pygame.K_s:
-                        # Toggle sprite debug view
-                        self.show_sprite_debug = not self.show_sprite_debug
-                        if self.show_sprite_debug:
-                            self.show_debug = False
-                    elif event.key == pygame.K_d:
-                        # Toggle debug view
-                        self.show_debug = not self.show_debug
-                        if self.show_debug:
-                            self.show_sprite_debug = False
-                    elif event.key == pygame.K_g:
-                        # Return to game view
-                        self.show_debug = False
-                        self.show_sprite_debug = False
-                    elif event.key == pygame.K_k:  # Toggle kill statistics
-                        show_kills = not show_kills
-                        continue
-                    elif event.key == pygame.K_i:  # Toggle inventory
-                        self.show_inventory = not self.show_inventory
-                        continue
-                    elif event.key == pygame.K_h and not self.show_inventory:
-                        heal_amount = self.player.heal()
-                        self.message = f"{self.player.name} heals for {heal_amount} HP"
-                        self.message_console.add_message(f"You heal for {heal_amount} HP")
-                        self.message_time = time.time()
-                    elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
-                        if save_game(self.player, self.world):
-                            self.message = "Game saved successfully!"
-                            self.message_console.add_message("Game saved successfully!")
-                        else:
-                            self.message = "Failed to save game!"
-                            self.message_console.add_message("Failed to save game!")
-                        self.message_time = time.time()
-                    # Handle inventory-specific input
-                    elif self.show_inventory:
-                        self.handle_inventory_input(event)
-            
-            pygame.display.flip()
-            clock.tick(60)  # Cap at 60 FPS
+    def scene_signature(self):
+        """Everything the screen depends on besides input and the game state's own"""
+        message_visible = time.time() - self.message_time < self.message_duration
+        return (self.message if message_visible else None,
+                tuple(self.message_console.messages), self.message_console.is_collapsed,
+                self.world.player_x, self.world.player_y, self.world.screen.get_size())
+
+    def idle_timeout(self):
+        """Milliseconds to wait for input before the scene next changes on its own"""
+        remaining = self.message_time + self.message_duration - time.time()
+        if remaining > 0:
+            return max(1, min(IDLE_WAIT_MS, int(remaining * 1000) + 1))
+        return IDLE_WAIT_MS
 
-    def battle(self, enemy):
-        self.current_enemy = enemy
-        self.in_combat = True
-        self.message = f"A {enemy.name} appears!"
-        self.message_console.add_message(f"A {enemy.name} appears!")
+    def get_frame_stats(self):
+        """Get frame counters per game state"""
+        return self.states.get_stats()
+
+    def show_message(self, text):
+        """Show a status message and add it to the console"""
+        self.message = text
+        self.message_console.add_message(text)
         self.message_time = time.time()
-        
-        while enemy.is_alive() and self.player.is_alive():
-            self.draw_combat_screen()
-            
-            # Handle input
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.game_running = False
-                    return
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left click
-                        # Check if console button was clicked
-                        padding = 10
-                        console_width = WINDOW_SIZE // 3
-                        console_height = WINDOW_SIZE // 4
-                        console_x = WINDOW_SIZE - console_width - padding
-                        console_y = WINDOW_SIZE - console_height - padding
-                        console_rect = pygame.Rect(console_x, console_y, console_width, console_height)
-                        
-                        if self.message_console.toggle_collapse(event.pos, console_rect):
-                            continue  # Skip combat handling if console was clicked
-                elif event.type == pygame.KEYDOWN:
-                    if event.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]:
-                        choice = event.key - pygame.K_1 + 1
-                        # Process combat choice
-                        if choice == 1:  # Regular attack
-                            damage = self.player.attack_target(enemy)
-                            self.last_player_damage = damage
-                            self.message = f"You deal {damage} damage to {enemy.name}"
-                            self.message_console.add_message(f"You deal {damage} damage to {enemy.name}")
-                            self.combat_animation_frame = 1
-                        elif choice == 2:  # Strong attack
-                            damage = self.player.strong_attack(enemy)
-                            self.last_player_damage = damage
-                            self.message = f"Strong attack! {damage} damage to {enemy.name}"
-                            self.message_console.add_message(f"Strong attack! {damage} damage to {enemy.name}")
-                            self.combat_animation_frame = 1
-                        elif choice == 3:  # Heal
-                            heal_amount = self.player.heal()
-                            self.message = f"You heal for {heal_amount} HP"
-                            self.message_console.add_message(f"You heal for {heal_amount} HP")
-                        else:  # Flee
-                            play_sound(SOUND_FLEE)
-                            if random.random() < 0.5:
-                                self.message = "You successfully fled!"
-                                self.message_console.add_message("You successfully fled!")
-                                self.in_combat = False
-                                return
-                            else:
-                                self.message = "Failed to flee!"
-                                self.message_console.add_message("Failed to flee!")
-                        
-                        self.message_time = time.time()
-                        
-                        if not enemy.is_alive():
-                            self.handle_enemy_defeat(enemy)
-                            break
-                        
-                        # Enemy's turn
-                        damage = enemy.attack_target(self.player)
-                        self.last_enemy_damage = damage
-                        self.message = f"{enemy.name} deals {damage} damage to you"
-                        self.message_console.add_message(f"{enemy.name} deals {damage} damage to you")
-                        self.combat_animation_frame = 11
-                        
-                        if not self.player.is_alive():
-                            self.message = "You have been defeated!"
-                            self.message_console.add_message("You have been defeated!")
-                            play_sound(SOUND_PLAYER_DEFEAT)
-                            self.game_running = False
-                            break
-            
-            # Draw message at the bottom
-            if time.time() - self.message_time < self.message_duration:
-                self.world.draw_text(self.message, (10, WINDOW_SIZE - 30), WHITE)
-            pygame.display.flip()
-            time.sleep(0.1)
-        
-        self.in_combat = False
-        self.world.display_viewport()
+
+    def show_message_later(self, text, delay):
+        """Show a status message after delay seconds of game time"""
+        self.delayed_messages.append([delay, text])
+
+    def update_messages(self, dt):
+        """Show the delayed messages that are due"""
+        for entry in list(self.delayed_messages):
+            entry[0] -= dt
+            if entry[0] <= 0:
+                self.delayed_messages.remove(entry)
+                self.show_message(entry[1])
+
+    def draw_message(self, color, track=True):
+        """Draw the status message at the bottom while it hasn't expired"""
+        if time.time() - self.message_time < self.message_duration:
+            message_rect = self.world.draw_text(self.message, (10, self.world.window_height - 30), color)
+            if track:
+                dirty_rects.track('message', message_rect, self.message)
+        elif track:
+            dirty_rects.forget('message')
+
+    def console_rect(self):
+        """(x, y, width, height) of the message console on the world map"""
+        console_width = self.world.window_width // 3
+        console_height = self.world.window_height // 4
+        console_x = self.world.window_width - console_width - 10
+        console_y = self.world.window_height - console_height - 40
+        return pygame.Rect(console_x, console_y, console_width, console_height)
 
     def handle_enemy_defeat(self, enemy):
         """Handle enemy defeat, including loot and experience"""
@@ -435,45 +266,100 @@ class Game:
         
         # Autosave after successful fight
         if save_game(self.player, self.world):
-            time.sleep(1)  # Wait a bit so player can read loot message
-            self.message = "Game autosaved!"
-            self.message_console.add_message("Game autosaved!")
-            self.message_time = time.time()
+            self.show_message_later("Game autosaved!", 1)  # Give the player a moment to read the loot
 
     def run(self):
+        """Run the game until the state stack empties.
+
+        One loop serves every state. Input goes to the top state, then the
+        top state is updated in fixed SIMULATION_RATE steps for the real time
+        that has passed. Time that isn't a whole step yet carries over, and
+        a frame catches up on MAX_FRAME_TIME at most. The stack is then drawn
+        once, with how far the frame is into the next step, so the drawing
+        rate can differ from the update rate. When nothing on screen can
+        change, the loop blocks on input for up to idle_timeout() instead of
+        drawing. Frame times are counted per state.
+        """
         self.message = "Welcome to Simple RPG! Click to move, Q to quit"
         self.message_time = time.time()
+        self.states.push(ExplorationState(self))
         
-        while self.game_running:
-            if not self.in_combat:
-                # Create a dummy event for the initial call
-                dummy_event = pygame.event.Event(pygame.KEYDOWN, {'key': 0})
-                result = self.handle_movement(dummy_event)
-                if result is None:
-                    break
-                if result:
-                    enemy = self.create_enemy()
-                    self.battle(enemy)
-                    if not self.player.is_alive():
-                        self.show_game_over()
-                        break
-            else:
-                self.draw_combat_screen()
-                time.sleep(0.1)
-        
-        self.show_game_over()
+        clock = pygame.time.Clock()
+        lag = 0.0  # Real time not yet simulated
+        previous = time.perf_counter()
+        last_top = None
+        last_scene = None
+        redraw = True
+        waited = []
+        while self.states:
+            state = self.states.top
+            events = waited + pygame.event.get()
+            waited = []
+            
+            # Nothing to show that isn't already on screen: sleep until input or a timeout
+            scene = state.signature()
+            if not (events or redraw or scene != last_scene or state.is_busy() or self.delayed_messages):
+                timeout = self.idle_timeout()
+                event = pygame.event.wait(timeout)
+                counters = self.states.counters(state)
+                counters['idle_waits'] += 1
+                if event.type == pygame.NOEVENT:
+                    counters['skipped'] += max(1, timeout * FRAME_RATE // 1000)
+                else:
+                    counters['skipped'] += 1
+                    waited = [event]
+                previous = time.perf_counter()  # Nothing was moving while we waited
+                continue
+            # Input handled below can change what's drawn, so draw once more next frame
+            redraw = bool(events)
+            last_scene = scene
+            
+            frame_start = time.perf_counter()
+            lag += min(frame_start - previous, MAX_FRAME_TIME)
+            previous = frame_start
+            
+            # Input
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                elif event.type == pygame.VIDEORESIZE:
+                    self.world.handle_resize(event.size)
+            if self.states:
+                self.states.top.handle_events(events)
+            
+            # Fixed-step updates
+            while lag >= self.step_time and self.states:
+                updated = self.states.top
+                updated.update(self.step_time)
+                self.update_messages(self.step_time)
+                self.states.counters(updated)['updates'] += 1
+                lag -= self.step_time
+            if not self.states:
+                break
+            
+            # Switching states replaces the whole screen
+            top = self.states.top
+            if top is not last_top:
+                dirty_rects.reset()
+                last_top = top
+            
+            # Draw the queued frame, then push only what changed
+            self.states.render(lag / self.step_time)
+            self.world.present()
+            self.states.record_frame(top, time.perf_counter() - frame_start)
+            clock.tick(FRAME_RATE)  # Cap the frame rate
+        
+        print(f"Frame stats: {self.get_frame_stats()}")  # Debug print
+        self.world.close()
         pygame.quit()
 
-    def show_game_over(self):
-        """Show the game over screen"""
-        self.world.screen.fill(BLACK)
-        self.world.draw_text("Game Over!", (WINDOW_SIZE//2 - 50, WINDOW_SIZE//2 - 50), WHITE)
-        self.world.draw_text(f"Final level: {self.player.level}", 
-                           (WINDOW_SIZE//2 - 50, WINDOW_SIZE//2), WHITE)
-        self.world.draw_text(f"Final location: ({self.world.player_x}, {self.world.player_y})", 
-                           (WINDOW_SIZE//2 - 100, WINDOW_SIZE//2 + 50), WHITE)
-        pygame.display.flip()
-        time.sleep(3)
+    def quit(self):
+        """End the game on the Game Over screen, which closes it after a few seconds"""
+        if isinstance(self.states.top, GameOverState):
+            self.states.clear()  # Asked again on the final screen: close now
+            return
+        self.states.clear()
+        self.states.push(GameOverState(self))
 
     def draw_inventory_screen(self):
         """Draw the inventory screen overlay"""
@@ -481,7 +367,7 @@ class Game:
         overlay = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE))
         overlay.fill((0, 0, 0))
         overlay.set_alpha(180)  # 70% opacity
-        self.world.screen.blit(overlay, (0, 0))
+        render_queue.submit(render_queue.UI, overlay, (0, 0))
         
         # Draw inventory title
         self.world.draw_text("Inventory", (20, 20), WHITE)
@@ -577,7 +463,7 @@ class Game:
         return loot
 
     def draw_combat_screen(self):
-        """Draw the combat screen with enemy and player stats"""
+        """Draw the combat screen with enemy and player stats and return the console's rect"""
         # Draw HP bars at the top
         hp_bar_width = 300
         hp_bar_height = 25
@@ -588,14 +474,12 @@ class Game:
         player_hp_color = (0, 255, 0) if player_hp_percent > 0.5 else (255, 255, 0) if player_hp_percent > 0.2 else (255, 0, 0)
         
         # Draw player HP bar background
-        pygame.draw.rect(self.world.screen, (200, 200, 200), 
-                        (padding, padding, hp_bar_width, hp_bar_height))
+        render_queue.fill(render_queue.UI, (200, 200, 200), (padding, padding, hp_bar_width, hp_bar_height))
         # Draw player HP bar fill
-        pygame.draw.rect(self.world.screen, player_hp_color,
-                        (padding, padding, hp_bar_width * player_hp_percent, hp_bar_height))
+        render_queue.fill(render_queue.UI, player_hp_color,
+                          (padding, padding, hp_bar_width * player_hp_percent, hp_bar_height))
         # Draw player HP bar border
-        pygame.draw.rect(self.world.screen, (255, 255, 255),
-                        (padding, padding, hp_bar_width, hp_bar_height), 1)
+        render_queue.frame(render_queue.UI, (255, 255, 255), (padding, padding, hp_bar_width, hp_bar_height))
         
         # Draw player name
         player_name = self.player.name
@@ -603,7 +487,7 @@ class Game:
         name_rect = name_surface.get_rect()
         name_rect.x = padding + 5
         name_rect.centery = padding + hp_bar_height // 2
-        self.world.screen.blit(name_surface, name_rect)
+        render_queue.submit(render_queue.TEXT, name_surface, name_rect.topleft)
         
         # Draw player HP text
         player_hp_text = f"{self.player.health}/{self.player.max_health}"
@@ -611,21 +495,19 @@ class Game:
         hp_rect = hp_surface.get_rect()
         hp_rect.right = padding + hp_bar_width - 5
         hp_rect.centery = padding + hp_bar_height // 2
-        self.world.screen.blit(hp_surface, hp_rect)
+        render_queue.submit(render_queue.TEXT, hp_surface, hp_rect.topleft)
         
         # Draw enemy HP bar second (below player)
         enemy_hp_percent = self.current_enemy.health / self.current_enemy.max_health
         enemy_hp_color = (0, 255, 0) if enemy_hp_percent > 0.5 else (255, 255, 0) if enemy_hp_percent > 0.2 else (255, 0, 0)
         
         # Draw enemy HP bar background
-        pygame.draw.rect(self.world.screen, (200, 200, 200), 
-                        (padding, padding + hp_bar_height + 5, hp_bar_width, hp_bar_height))
+        render_queue.fill(render_queue.UI, (200, 200, 200), (padding, padding + hp_bar_height + 5, hp_bar_width, hp_bar_height))
         # Draw enemy HP bar fill
-        pygame.draw.rect(self.world.screen, enemy_hp_color,
-                        (padding, padding + hp_bar_height + 5, hp_bar_width * enemy_hp_percent, hp_bar_height))
+        render_queue.fill(render_queue.UI, enemy_hp_color,
+                          (padding, padding + hp_bar_height + 5, hp_bar_width * enemy_hp_percent, hp_bar_height))
         # Draw enemy HP bar border
-        pygame.draw.rect(self.world.screen, (255, 255, 255),
-                        (padding, padding + hp_bar_height + 5, hp_bar_width, hp_bar_height), 1)
+        render_queue.frame(render_queue.UI, (255, 255, 255), (padding, padding + hp_bar_height + 5, hp_bar_width, hp_bar_height))
         
         # Draw enemy name
         enemy_name = self.current_enemy.name
@@ -633,7 +515,7 @@ class Game:
         name_rect = name_surface.get_rect()
         name_rect.x = padding + 5
         name_rect.centery = padding + hp_bar_height + 5 + hp_bar_height // 2
-        self.world.screen.blit(name_surface, name_rect)
+        render_queue.submit(render_queue.TEXT, name_surface, name_rect.topleft)
         
         # Draw enemy HP text
         enemy_hp_text = f"{self.current_enemy.health}/{self.current_enemy.max_health}"
@@ -641,7 +523,9 @@ class Game:
         hp_rect = hp_surface.get_rect()
         hp_rect.right = padding + hp_bar_width - 5
         hp_rect.centery = padding + hp_bar_height + 5 + hp_bar_height // 2
-        self.world.screen.blit(hp_surface, hp_rect)
+        render_queue.submit(render_queue.TEXT, hp_surface, hp_rect.topleft)
+        dirty_rects.track('combat_bars', (padding, padding, hp_bar_width, hp_bar_height * 2 + 5),
+                          (player_hp_text, enemy_hp_text, enemy_name))
         
         # Draw combat options
         options = ["[1] Attack", "[2] Strong Attack", "[3] Heal", "[4] Flee"]
@@ -651,42 +535,10 @@ class Game:
         
         for option in options:
             text_surface = pygame.font.Font(None, 24).render(option, True, (255, 255, 255))
-            self.world.screen.blit(text_surface, (x, y))
+            render_queue.submit(render_queue.UI, text_surface, (x, y))  # Same layer as the console, which is drawn over it
             x += spacing
         
         # Draw message console at the bottom
         console_height = 150
         console_y = WINDOW_SIZE - console_height - 10
-        self.message_console.draw(self.world.screen, 10, console_y, WINDOW_SIZE - 20, console_height)
-
-    def handle_events(self):
-        """Handle all game events"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return False
-                elif event.key == pygame.K_d:
-                    # Toggle terrain debug view
-                    self.show_debug = not self.show_debug
-                    self.show_sprite_debug = False
-                    self.world.show_debug = self.show_debug
-                elif event.key == pygame.K_s:
-                    # Toggle sprite debug view
-                    self.show_sprite_debug = not self.show_sprite_debug
-                    self.show_debug = False
-                    self.world.show_debug = False
-                elif event.key == pygame.K_g:
-                    # Return to game view
-                    self.show_debug = False
-                    self.show_sprite_debug = False
-                    self.world.show_debug = False
-                else:
-                    self.handle_movement(event)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # Handle mouse clicks in sprite debug view
-                if event.button == 1 and self.show_sprite_debug:  # Left click
-                    if self.world.handle_sprite_debug_click(event.pos):
-                        continue
-        return True 
\ No newline at end of file
+        return self.message_console.draw(self.world.screen, 10, console_y, WINDOW_SIZE - 20, console_height)
@@ -0,0 +1,213 @@
+import heapq
+import itertools
+import math
+from game.pathfinding import CostGrid, astar, dijkstra, SQRT2
+from utils.constants import (HPA_DIRECT_RANGE, HPA_REFINE_SEGMENTS, HPA_SPLIT_RUN, HPA_CHUNK_MARGIN,
+                             HPA_HEURISTIC_WEIGHT)
+
+class HierarchicalPathFinder:
+    """HPA*: plan long paths on an abstract graph of chunk entrances.
+
+    Wherever two neighbouring chunks both have passable cells facing each
+    other along their shared border, each run of such cells becomes an
+    entrance: one transition (a cell on either side) in the middle of the
+    run, or one at each end of runs of HPA_SPLIT_RUN cells or more. Within
+    a chunk, every pair of its entrance cells is joined by an edge costing
+    the cheapest path between them inside the chunk, found with one Dijkstra
+    search per entrance the first time a search leaves through it.
+
+    A search connects start and goal to the entrances of their chunks, runs
+    A* over that graph (touching only the chunks it reaches), and then
+    refines just the first few abstract edges into cells with a flat A*
+    inside one chunk each. The caller walks those and asks again from where
+    it ended up. Short trips (within direct_range) skip the hierarchy and go
+    straight to the flat PathFinder.
+
+    Border entrances are cached against the versions of the two chunks they
+    join, and a chunk's edges against its own version and entrance cells,
+    so editing a chunk only rebuilds that chunk's edges (and its neighbours'
+    only if an entrance on their shared border moved).
+    """
+    def __init__(self, chunks, pathfinder, direct_range=HPA_DIRECT_RANGE, refine=HPA_REFINE_SEGMENTS,
+                 split_run=HPA_SPLIT_RUN, chunk_margin=HPA_CHUNK_MARGIN, weight=HPA_HEURISTIC_WEIGHT):
+        self.chunks = chunks
+        self.pathfinder = pathfinder
+        self.direct_range = direct_range
+        self.refine = refine
+        self.split_run = split_run
+        self.chunk_margin = chunk_margin
+        self.weight = weight
+        self._borders = {}  # ((cx, cy), 'east' or 'south') -> (chunk versions, [(cell, other cell, cost into other, cost into cell)])
+        self._edges = {}  # (cx, cy) -> (version, entrance cells, CostGrid, {entrance cell: [(cell, cost)]})
+        self.searches = 0
+        self.expanded = 0
+        self.border_builds = 0
+        self.chunk_builds = 0
+        self.edge_searches = 0
+
+    def chunk_grid(self, key):
+        """CostGrid over one chunk"""
+        chunk = self.chunks.get_chunk(*key)
+        size = self.chunks.size
+        return CostGrid(key[0] * size, key[1] * size, chunk.passable, chunk.cost)
+
+    def _border(self, key, side):
+        """Transitions across the east or south border of a chunk"""
+        other_key = (key[0] + 1, key[1]) if side == 'east' else (key[0], key[1] + 1)
+        chunk = self.chunks.get_chunk(*key)
+        other = self.chunks.get_chunk(*other_key)
+        versions = (chunk.version, other.version)
+        entry = self._borders.get((key, side))
+        if entry is not None and entry[0] == versions:
+            return entry[1]
+
+        size = self.chunks.size
+        if side == 'east':
+            inside, outside = chunk.passable[:, -1], other.passable[:, 0]
+            inside_cost, outside_cost = chunk.cost[:, -1], other.cost[:, 0]
+            def cells(i):
+                x = key[0] * size + size - 1
+                return (x, key[1] * size + i), (x + 1, key[1] * size + i)
+        else:
+            inside, outside = chunk.passable[-1, :], other.passable[0, :]
+            inside_cost, outside_cost = chunk.cost[-1, :], other.cost[0, :]
+            def cells(i):
+                y = key[1] * size + size - 1
+                return (key[0] * size + i, y), (key[0] * size + i, y + 1)
+
+        open_cells = (inside & outside).tolist()
+        transitions = []
+        i = 0
+        while i < size:
+            if not open_cells[i]:
+                i += 1
+                continue
+            end = i
+            while end + 1 < size and open_cells[end + 1]:
+                end += 1
+            picks = (i, end) if end - i + 1 >= self.split_run else ((i + end) // 2,)
+            for pick in picks:
+                cell, other_cell = cells(pick)
+                transitions.append((cell, other_cell, int(outside_cost[pick]), int(inside_cost[pick])))
+            i = end + 1
+        self._borders[(key, side)] = (versions, transitions)
+        self.border_builds += 1
+        return transitions
+
+    def _chunk_graph(self, key):
+        """[entrance cells, {cell: links out of the chunk}, grid, {cell: edges inside the chunk}] for a chunk"""
+        cx, cy = key
+        links = {}  # entrance cell -> [(cell in the neighbouring chunk, cost)]
+        for cell, other, cost_out, _ in self._border(key, 'east') + self._border(key, 'south'):
+            links.setdefault(cell, []).append((other, cost_out))
+        for other, cell, _, cost_in in self._border((cx - 1, cy), 'east') + self._border((cx, cy - 1), 'south'):
+            links.setdefault(cell, []).append((other, cost_in))
+        entrances = tuple(sorted(links))
+
+        version = self.chunks.get_chunk(cx, cy).version
+        entry = self._edges.get(key)
+        if entry is None or entry[0] != version or entry[1] != entrances:
+            # Edges inside the chunk are filled in per entrance the first time a search leaves it
+            entry = self._edges[key] = (version, entrances, self.chunk_grid(key), {})
+            self.chunk_builds += 1
+        return entrances, links, entry[2], entry[3]
+
+    def _edges_from(self, graph, cell):
+        """[(cell, cost)] out of an entrance cell: to the chunk's other entrances and across its border"""
+        entrances, links, grid, inner = graph
+        edges = inner.get(cell)
+        if edges is None:
+            reached = dijkstra(grid, cell, entrances)
+            edges = inner[cell] = [(other, cost) for other, cost in reached.items() if other != cell]
+            self.edge_searches += 1
+        return edges + links[cell]
+
+    def find_path(self, start, goal):
+        """Get the first stretch of cells from start towards goal, or [] if it can't be reached"""
+        if max(abs(goal[0] - start[0]), abs(goal[1] - start[1])) <= self.direct_range:
+            return self.pathfinder.find_path(start, goal)
+        if not self.chunks.is_passable(*goal):
+            return []
+        self.searches += 1
+
+        start_key = self.chunks.chunk_coords(*start)
+        goal_key = self.chunks.chunk_coords(*goal)
+        min_cx = min(start_key[0], goal_key[0]) - self.chunk_margin
+        max_cx = max(start_key[0], goal_key[0]) + self.chunk_margin
+        min_cy = min(start_key[1], goal_key[1]) - self.chunk_margin
+        max_cy = max(start_key[1], goal_key[1]) + self.chunk_margin
+
+        # Temporary edges from start (straight to goal too if they share a chunk) and into goal
+        start_graph = self._chunk_graph(start_key)
+        goal_graph = self._chunk_graph(goal_key)
+        start_edges = dijkstra(start_graph[2], start, start_graph[0] + (goal,))
+        goal_costs = dijkstra(goal_graph[2], goal, goal_graph[0], reverse=True)
+
+        graphs = {}
+        best = {start: 0}
+        came_from = {start: None}
+        heap = [(0, 0, start)]
+        while heap:
+            _, cost_so_far, cell = heapq.heappop(heap)
+            if cell == goal:
+                break
+            if cost_so_far > best[cell]:
+                continue
+            self.expanded += 1
+            key = self.chunks.chunk_coords(*cell)
+            if key not in graphs:
+                graphs[key] = self._chunk_graph(key)
+            edges = self._edges_from(graphs[key], cell) if cell in graphs[key][1] else []
+            if cell == start:
+                edges = edges + list(start_edges.items())
+            if cell in goal_costs:
+                edges.append((goal, goal_costs[cell]))
+            for neighbour, edge_cost in edges:
+                ncx, ncy = self.chunks.chunk_coords(*neighbour)
+                if not (min_cx <= ncx <= max_cx and min_cy <= ncy <= max_cy):
+                    continue
+                new_cost = cost_so_far + edge_cost
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    came_from[neighbour] = cell
+                    dx = abs(neighbour[0] - goal[0])
+                    dy = abs(neighbour[1] - goal[1])
+                    heapq.heappush(heap, (new_cost + self.weight * (dx + dy + (SQRT2 - 2) * min(dx, dy)), new_cost, neighbour))
+        else:
+            return []
+
+        waypoints = [goal]
+        while waypoints[-1] != start:
+            waypoints.append(came_from[waypoints[-1]])
+        waypoints.reverse()
+        return self.refine_path(waypoints, self.refine)
+
+    def refine_path(self, waypoints, segments):
+        """Turn the first segments abstract edges into cells"""
+        path = []
+        for a, b in itertools.islice(itertools.pairwise(waypoints), segments):
+            key = self.chunks.chunk_coords(*a)
+            if key != self.chunks.chunk_coords(*b):
+                path.append(b)  # A border crossing
+                continue
+            cells, _ = astar(self.chunk_grid(key), a, b)
+            if not cells:
+                break
+            path.extend(cells)
+        return path
+
+    def invalidate(self):
+        """Drop every cached border and chunk edge"""
+        self._borders.clear()
+        self._edges.clear()
+
+    def get_stats(self):
+        """Get search counters"""
+        return {
+            'searches': self.searches,
+            'expanded': self.expanded,
+            'border_builds': self.border_builds,
+            'chunk_builds': self.chunk_builds,
+            'edge_searches': self.edge_searches,
+            'chunks': len(self._edges),
+        }
@@ -0,0 +1,96 @@
+from utils.constants import MOVE_SPEED
+
+class MovementController:
+    """Walks the player along a clicked path a little every frame.
+
+    The player's cell (world.player_x/y) changes as soon as a step starts,
+    so encounters, monsters and replanning all see where the player is
+    going. The drawing catches up over the step: world.step_from and
+    world.step_progress say how far between the two cells the player is, and
+    interpolate() sets world.step_drawn, where display_viewport draws them
+    and the camera this frame. An encounter is only reported once the
+    step that found it has finished drawing.
+
+    A new click replaces the path from the cell the player is stepping
+    into, so the walk changes direction without snapping back. Clicking the
+    player stops them there.
+    """
+    def __init__(self, world, speed=MOVE_SPEED):
+        self.world = world
+        self.speed = speed  # Cells per second
+        self.target = None
+        self.path = []  # Cells still to step onto in the current stretch
+        self.encounter = False  # Found by the step being drawn
+        self.steps = 0
+
+    def set_target(self, target_x, target_y):
+        """Walk to a cell instead of wherever the player was going; False if it can't be reached"""
+        if (target_x, target_y) == (self.world.player_x, self.world.player_y):
+            self.stop()
+            return True
+        path = self.world.get_path_to(target_x, target_y)
+        if not path:
+            return False
+        self.target = (target_x, target_y)
+        self.path = path
+        self.world.prefetch_path(path)
+        return True
+
+    def stop(self):
+        """Stop once the current step is drawn"""
+        self.target = None
+        self.path = []
+
+    def is_moving(self):
+        """Whether the player has somewhere to go or is still being drawn between cells"""
+        return bool(self.path) or self.world.step_progress < 1
+
+    def _next_step(self):
+        """Start the next step of the path, replanning the next stretch of a long trip"""
+        world = self.world
+        if not self.path and self.target is not None and self.target != (world.player_x, world.player_y):
+            self.path = world.get_path_to(*self.target)
+            world.prefetch_path(self.path)
+        if not self.path:
+            self.target = None
+            return
+        next_x, next_y = self.path.pop(0)
+        world.step_from = (world.player_x, world.player_y)
+        world.step_progress = 0.0
+        self.encounter = world.move_player(next_x, next_y)
+        self.steps += 1
+        if self.encounter:
+            self.stop()
+
+    def interpolate(self, seconds):
+        """Draw the current step seconds further along than the last update left it"""
+        world = self.world
+        if world.step_progress < 1:
+            world.step_drawn = min(1.0, world.step_progress + seconds * self.speed)
+        else:
+            world.step_drawn = 1.0
+
+    def update(self, elapsed):
+        """Advance by elapsed seconds and return True when an encounter should start.
+
+        A long update moves the player one step at most, so nothing is
+        skipped over without being drawn.
+        """
+        world = self.world
+        leftover = 0.0
+        if world.step_progress < 1:
+            progress = world.step_progress + min(elapsed, 1 / self.speed) * self.speed
+            if progress < 1:
+                world.step_progress = progress
+                return False
+            world.step_progress = 1.0
+            leftover = progress - 1
+        if self.encounter:
+            self.encounter = False
+            return True
+        if self.path or self.target is not None:
+            self._next_step()
+            if world.step_progress < 1:
+                # Carry the rest of the frame into the new step so the pace stays even
+                world.step_progress = min(leftover, 0.99)
+        return False
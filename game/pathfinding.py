@@ -0,0 +1,225 @@
+import heapq
+import math
+from collections import OrderedDict
+import numpy as np
+from utils.constants import PATH_SEARCH_MARGIN, PATH_CACHE_SIZE
+
+SQRT2 = math.sqrt(2)
+
+class CostGrid:
+    """Movement costs over a rectangle of world cells, flattened for searching.
+
+    costs has one entry per cell, the cost of stepping onto it or 0 when it
+    is blocked, in row-major order with a blocked one-cell border around the
+    rectangle so neighbour lookups never need a bounds check. Cells are
+    addressed by their flat index; index() and cell() convert from and to
+    world coordinates.
+    """
+    def __init__(self, x0, y0, passable, cost):
+        height, width = passable.shape
+        padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = np.where(passable != 0, cost, 0)
+        self.x0 = x0
+        self.y0 = y0
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.costs = padded.ravel().tolist()
+
+    @classmethod
+    def from_chunks(cls, chunks, x0, y0, width, height):
+        """Build a grid from a ChunkManager's passable and cost layers"""
+        return cls(x0, y0, chunks.get_region('passable', x0, y0, width, height),
+                   chunks.get_region('cost', x0, y0, width, height))
+
+    def contains(self, x, y):
+        """Whether a world cell is inside the grid"""
+        return self.x0 <= x < self.x0 + self.width and self.y0 <= y < self.y0 + self.height
+
+    def index(self, x, y):
+        """Flat index of a world cell"""
+        return (y - self.y0 + 1) * self.stride + (x - self.x0 + 1)
+
+    def cell(self, index):
+        """World cell of a flat index"""
+        row, col = divmod(index, self.stride)
+        return col - 1 + self.x0, row - 1 + self.y0
+
+def astar(grid, start, goal):
+    """Find the cheapest path between two world cells of a CostGrid.
+
+    Straight steps cost the cost of the cell stepped onto, diagonal ones
+    SQRT2 times that, and a diagonal step may not cut the corner of a blocked
+    cell. The heuristic is the octile distance, which never overestimates
+    since every passable cell costs at least 1. Returns (path, expanded):
+    the cells after start up to and including goal (empty when goal can't be
+    reached), and how many nodes were expanded.
+    """
+    if not grid.contains(*start) or not grid.contains(*goal):
+        return [], 0
+    costs = grid.costs
+    stride = grid.stride
+    source = grid.index(*start)
+    target = grid.index(*goal)
+    if source == target or not costs[target]:
+        return [], 0
+
+    goal_row, goal_col = divmod(target, stride)
+    straight = (1, -1, stride, -stride)
+    # (step, the two orthogonal cells it passes between)
+    diagonal = ((stride + 1, 1, stride), (stride - 1, -1, stride),
+                (1 - stride, 1, -stride), (-1 - stride, -1, -stride))
+    best = {source: 0}
+    came_from = {source: None}
+    heap = [(0, 0, source)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    expanded = 0
+
+    while heap:
+        _, cost_so_far, node = heappop(heap)
+        if node == target:
+            break
+        if cost_so_far > best[node]:
+            continue  # A cheaper entry for this node was already expanded
+        expanded += 1
+        for step in straight:
+            neighbour = node + step
+            cell_cost = costs[neighbour]
+            if cell_cost:
+                new_cost = cost_so_far + cell_cost
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    came_from[neighbour] = node
+                    row, col = divmod(neighbour, stride)
+                    dx = abs(col - goal_col)
+                    dy = abs(row - goal_row)
+                    heappush(heap, (new_cost + dx + dy + (SQRT2 - 2) * min(dx, dy), new_cost, neighbour))
+        for step, side_a, side_b in diagonal:
+            neighbour = node + step
+            cell_cost = costs[neighbour]
+            if cell_cost and costs[node + side_a] and costs[node + side_b]:
+                new_cost = cost_so_far + cell_cost * SQRT2
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    came_from[neighbour] = node
+                    row, col = divmod(neighbour, stride)
+                    dx = abs(col - goal_col)
+                    dy = abs(row - goal_row)
+                    heappush(heap, (new_cost + dx + dy + (SQRT2 - 2) * min(dx, dy), new_cost, neighbour))
+    else:
+        return [], expanded
+
+    path = []
+    node = target
+    while node != source:
+        path.append(grid.cell(node))
+        node = came_from[node]
+    path.reverse()
+    return path, expanded
+
+def dijkstra(grid, source, targets, reverse=False):
+    """Get the cheapest cost from source to each reachable cell of targets, as {cell: cost}.
+
+    Uses the same step rules as astar() and stops once every target is
+    settled. With reverse the costs are from each target to source instead.
+    """
+    costs = grid.costs
+    stride = grid.stride
+    if not grid.contains(*source):
+        return {}
+    origin = grid.index(*source)
+    remaining = {grid.index(*cell): cell for cell in targets if grid.contains(*cell)}
+    found = {}
+    straight = (1, -1, stride, -stride)
+    diagonal = ((stride + 1, 1, stride), (stride - 1, -1, stride),
+                (1 - stride, 1, -stride), (-1 - stride, -1, -stride))
+    best = {origin: 0}
+    heap = [(0, origin)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    while heap and remaining:
+        cost_so_far, node = heappop(heap)
+        if cost_so_far > best[node]:
+            continue
+        cell = remaining.pop(node, None)
+        if cell is not None:
+            found[cell] = cost_so_far
+        # Stepping from node to a neighbour costs the neighbour's cost, or node's own going backwards
+        for step in straight:
+            neighbour = node + step
+            if costs[neighbour]:
+                new_cost = cost_so_far + (costs[node] if reverse else costs[neighbour])
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    heappush(heap, (new_cost, neighbour))
+        for step, side_a, side_b in diagonal:
+            neighbour = node + step
+            if costs[neighbour] and costs[node + side_a] and costs[node + side_b]:
+                new_cost = cost_so_far + (costs[node] if reverse else costs[neighbour]) * SQRT2
+                if new_cost < best.get(neighbour, math.inf):
+                    best[neighbour] = new_cost
+                    heappush(heap, (new_cost, neighbour))
+    return found
+
+class PathFinder:
+    """A* between world cells of a ChunkManager, with a cache of recent paths.
+
+    Each search runs on a CostGrid over the rectangle spanning start and
+    goal plus margin cells on every side, so a path may detour up to margin
+    cells around obstacles. Found (and unreachable) results are cached per
+    (start, goal) together with the versions of the chunks the grid was
+    built from; a cached path is only reused while none of those chunks has
+    changed, so editing a tile invalidates exactly the paths that crossed
+    its chunk.
+    """
+    def __init__(self, chunks, margin=PATH_SEARCH_MARGIN, cache_size=PATH_CACHE_SIZE):
+        self.chunks = chunks
+        self.margin = margin
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (start, goal) -> (path, region, chunk versions)
+        self.searches = 0
+        self.hits = 0
+        self.expanded = 0
+
+    def search_region(self, start, goal):
+        """(x0, y0, width, height) of the cells a search between start and goal may use"""
+        x0 = min(start[0], goal[0]) - self.margin
+        y0 = min(start[1], goal[1]) - self.margin
+        return (x0, y0, max(start[0], goal[0]) + self.margin + 1 - x0,
+                max(start[1], goal[1]) + self.margin + 1 - y0)
+
+    def find_path(self, start, goal):
+        """Get the cells after start up to and including goal, or [] if it can't be reached"""
+        key = (start, goal)
+        entry = self._cache.get(key)
+        if entry is not None and self.chunks.versions_in(*entry[1]) == entry[2]:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return list(entry[0])
+
+        region = self.search_region(start, goal)
+        grid = CostGrid.from_chunks(self.chunks, *region)
+        path, expanded = astar(grid, start, goal)
+        self.searches += 1
+        self.expanded += expanded
+
+        self._cache[key] = (path, region, self.chunks.versions_in(*region))
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return list(path)
+
+    def invalidate(self):
+        """Drop every cached path"""
+        self._cache.clear()
+
+    def get_stats(self):
+        """Get search counters"""
+        return {
+            'searches': self.searches,
+            'hits': self.hits,
+            'expanded': self.expanded,
+            'cached': len(self._cache),
+        }
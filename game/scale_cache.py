@@ -0,0 +1,54 @@
+import weakref
+from collections import OrderedDict
+import pygame
+
+class ScaleCache:
+    """Cache scaled copies of surfaces, keyed by source surface and target size.
+
+    Entries hold only a weak reference to their source, and drop out of the
+    cache when the source is garbage collected. Call invalidate() whenever the
+    cell size or window size changes so stale sizes don't pile up.
+    """
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (id, size, smooth) -> (weakref to source, scaled surface)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, surface, size, smooth=False):
+        """Get surface scaled to size, using smoothscale or nearest-neighbour"""
+        size = (int(size[0]), int(size[1]))
+        if surface.get_size() == size:
+            return surface
+
+        key = (id(surface), size, smooth)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is surface:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        # smoothscale only handles 24 and 32 bit surfaces
+        if smooth and surface.get_bitsize() in (24, 32):
+            scaled = pygame.transform.smoothscale(surface, size)
+        else:
+            scaled = pygame.transform.scale(surface, size)
+
+        entries = self._entries
+        source_ref = weakref.ref(surface, lambda _, key=key: entries.pop(key, None))
+        self._entries[key] = (source_ref, scaled)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return scaled
+
+    def invalidate(self):
+        """Drop every cached scaled surface"""
+        self._entries.clear()
+
+    def get_stats(self):
+        """Get cache counters"""
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+# Shared cache for the sprite debug thumbnails
+scale_cache = ScaleCache()
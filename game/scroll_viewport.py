@@ -0,0 +1,118 @@
+import pygame
+from utils.constants import WHITE
+
+class ScrollViewport:
+    """Offscreen world layer that is scrolled instead of redrawn.
+
+    The buffer holds the last frame's terrain and overlays. When the camera
+    moves by one cell the buffer is shifted with Surface.scroll and only the
+    newly exposed row and/or column of cells is painted, so a step costs
+    O(viewport edge) cells rather than O(viewport area). Jumps, resizes, cell
+    size changes and edits to a visible chunk repaint the whole buffer.
+    Dynamic sprites (the player) are drawn by the caller on top.
+    """
+    def __init__(self, tiles):
+        self.tiles = tiles
+        self.buffer = None
+        self.origin = None  # World cell at the buffer's top-left
+        self.cell_size = None
+        self._versions = {}  # (cx, cy) -> chunk version the buffer was painted from
+        self.full_redraws = 0
+        self.scrolls = 0
+        self.patched_cells = 0
+
+    def draw(self, screen, chunks, start_x, start_y, cell_size):
+        """Bring the buffer up to date for camera cell (start_x, start_y) and blit it"""
+        screen.blit(self.update(chunks, start_x, start_y, screen.get_size(), cell_size), (0, 0))
+
+    def update(self, chunks, start_x, start_y, size, cell_size):
+        """Bring the buffer up to date for a window of size pixels and return it"""
+        width, height = size
+        full = (self.buffer is None or self.buffer.get_size() != (width, height)
+                or cell_size != self.cell_size or self._chunks_changed(chunks, start_x, start_y, width, height))
+
+        if not full:
+            step_x = start_x - self.origin[0]
+            step_y = start_y - self.origin[1]
+            full = abs(step_x) > 1 or abs(step_y) > 1
+
+        if full:
+            self._repaint(chunks, start_x, start_y, cell_size, width, height)
+        elif step_x or step_y:
+            self.scrolls += 1
+            self.origin = (start_x, start_y)
+            self.buffer.scroll(-step_x * cell_size, -step_y * cell_size)
+            # Paint only the strips the scroll uncovered
+            if step_x:
+                left = width - cell_size if step_x > 0 else 0
+                self._paint(chunks, pygame.Rect(left, 0, cell_size, height))
+            if step_y:
+                top = height - cell_size if step_y > 0 else 0
+                self._paint(chunks, pygame.Rect(0, top, width, cell_size))
+            self._remember_versions(chunks, start_x, start_y, width, height)
+        return self.buffer
+
+    def invalidate(self):
+        """Force a full repaint next frame"""
+        self.buffer = None
+
+    def _repaint(self, chunks, start_x, start_y, cell_size, width, height):
+        """Paint the whole buffer from scratch"""
+        self.full_redraws += 1
+        if self.buffer is None or self.buffer.get_size() != (width, height):
+            self.buffer = pygame.Surface((width, height))
+            if pygame.display.get_surface() is not None:
+                self.buffer = self.buffer.convert()
+        self.cell_size = cell_size
+        self.origin = (start_x, start_y)
+        self._paint(chunks, self.buffer.get_rect())
+        self._remember_versions(chunks, start_x, start_y, width, height)
+
+    def _paint(self, chunks, rect):
+        """Paint the cells covering a pixel rect of the buffer, clipped to it"""
+        cell_size = self.cell_size
+        scaled = self.tiles.scaled_images(cell_size)
+        first_col = rect.left // cell_size
+        first_row = rect.top // cell_size
+        cols = (rect.right - 1) // cell_size - first_col + 1
+        rows = (rect.bottom - 1) // cell_size - first_row + 1
+        x0 = self.origin[0] + first_col
+        y0 = self.origin[1] + first_row
+
+        self.buffer.set_clip(rect)
+        self.buffer.fill(WHITE, rect)
+        for layer in ('terrain', 'overlay'):
+            ids = chunks.get_region(layer, x0, y0, cols, rows).tolist()
+            blits = []
+            for row, row_ids in enumerate(ids):
+                y = (first_row + row) * cell_size
+                for col, tile_id in enumerate(row_ids):
+                    image = scaled[tile_id] if tile_id < len(scaled) else None
+                    if image is not None:
+                        blits.append((image, ((first_col + col) * cell_size, y)))
+            self.buffer.blits(blits, doreturn=False)
+        self.buffer.set_clip(None)
+        self.patched_cells += cols * rows
+
+    def _visible_chunks(self, chunks, start_x, start_y, width, height):
+        cols = -(-width // self.cell_size) if self.cell_size else 0
+        rows = -(-height // self.cell_size) if self.cell_size else 0
+        first_cx, first_cy = chunks.chunk_coords(start_x, start_y)
+        last_cx, last_cy = chunks.chunk_coords(start_x + cols, start_y + rows)
+        return [(cx, cy) for cy in range(first_cy, last_cy + 1) for cx in range(first_cx, last_cx + 1)]
+
+    def _chunks_changed(self, chunks, start_x, start_y, width, height):
+        """Whether any visible chunk changed since it was painted"""
+        for key in self._visible_chunks(chunks, start_x, start_y, width, height):
+            painted = self._versions.get(key)
+            if painted is not None and painted != chunks.get_chunk(*key).version:
+                return True
+        return False
+
+    def _remember_versions(self, chunks, start_x, start_y, width, height):
+        self._versions = {key: chunks.get_chunk(*key).version
+                          for key in self._visible_chunks(chunks, start_x, start_y, width, height)}
+
+    def get_stats(self):
+        """Get renderer counters"""
+        return {'full_redraws': self.full_redraws, 'scrolls': self.scrolls, 'patched_cells': self.patched_cells}
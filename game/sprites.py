@@ -1,37 +1,76 @@
 import pygame
 import os
 import time
-import zipfile
-import shutil
 import glob
 import random
 import math
+from collections import OrderedDict
+from game.assets import AssetImporter
+from game.atlas import TextureAtlas
+from utils.constants import SPRITE_CACHE_BUDGET
 
 class SpriteSheet:
-    def __init__(self, image_path, sprite_width=32, sprite_height=32, grid_width=16, grid_height=20):
-        """Load and manage a sprite sheet"""
+    def __init__(self, image_path, sprite_width=32, sprite_height=32, grid_width=16, grid_height=20, mode='copy'):
+        """Load and manage a sprite sheet.
+
+        mode controls how cells are sliced out of the sheet:
+        'copy' - every cell is copied into its own surface up front
+        'subsurface' - cells are zero-copy views of the sheet, made on first access
+        'lazy' - cells are copied into their own surface on first access
+        Fully transparent cells are never stored; they all share one blank surface.
+        """
         self.sheet = pygame.image.load(image_path).convert_alpha()
         self.sprite_width = sprite_width
         self.sprite_height = sprite_height
         self.grid_width = grid_width
         self.grid_height = grid_height
+        self.mode = mode
         self.sprites = {}
-        self._load_sprites()
+        self._empty = set()  # Indices of fully transparent cells
+        self._blank = pygame.Surface((sprite_width, sprite_height), pygame.SRCALPHA)
+        if mode == 'copy':
+            self._load_sprites()
     
     def _load_sprites(self):
         """Load all sprites from the sheet into a dictionary"""
-        for row in range(self.grid_height):
-            for col in range(self.grid_width):
-                sprite_index = row * self.grid_width + col
-                x = col * self.sprite_width
-                y = row * self.sprite_height
-                sprite = pygame.Surface((self.sprite_width, self.sprite_height), pygame.SRCALPHA)
-                sprite.blit(self.sheet, (0, 0), (x, y, self.sprite_width, self.sprite_height))
-                self.sprites[sprite_index] = sprite
+        for sprite_index in range(self.grid_width * self.grid_height):
+            self._materialise(sprite_index)
+    
+    def _cell_rect(self, sprite_index):
+        """Get the sheet rect for a cell, or None if it falls outside the grid or image"""
+        if not isinstance(sprite_index, int) or not 0 <= sprite_index < self.grid_width * self.grid_height:
+            return None
+        row, col = divmod(sprite_index, self.grid_width)
+        rect = pygame.Rect(col * self.sprite_width, row * self.sprite_height,
+                           self.sprite_width, self.sprite_height)
+        if not self.sheet.get_rect().contains(rect):
+            return None
+        return rect
+    
+    def _materialise(self, sprite_index):
+        """Slice one cell out of the sheet and store it, unless it is empty"""
+        rect = self._cell_rect(sprite_index)
+        if rect is None:
+            return None
+        cell = self.sheet.subsurface(rect)
+        if cell.get_bounding_rect().width == 0:
+            self._empty.add(sprite_index)
+            return self._blank
+        if self.mode != 'subsurface':
+            cell = cell.copy()
+        self.sprites[sprite_index] = cell
+        return cell
     
     def get_sprite(self, index):
         """Get a sprite by its index in the sheet"""
-        return self.sprites.get(index)
+        sprite = self.sprites.get(index)
+        if sprite is not None:
+            return sprite
+        if index in self._empty:
+            return self._blank
+        if self.mode == 'copy':
+            return None  # Everything that exists was sliced up front
+        return self._materialise(index)
     
     def get_sprite_at(self, row, col):
         """Get a sprite by its grid position"""
@@ -102,40 +141,117 @@ class GameSprite(pygame.sprite.Sprite):
         return new_sprite
 
 class SingleSprite:
-    """Class to handle individual PNG files from a directory"""
-    def __init__(self, directory):
+    """Class to handle individual PNG files from a directory.
+
+    By default only an index of paths is built up front; each PNG is decoded
+    on its first get_sprite call and kept in an LRU cache capped at
+    budget_bytes of pixel data. With use_atlas the whole directory is instead
+    decoded eagerly and packed into a TextureAtlas.
+    """
+    def __init__(self, directory, use_atlas=False, lazy=True, budget_bytes=None):
         self.directory = directory
-        self.sprites = {}
+        self.use_atlas = use_atlas
+        self.lazy = lazy and not use_atlas
+        self.budget_bytes = budget_bytes
+        self.atlas = None
+        self.index = {}  # name (relative path) -> file path
+        self.sprites = OrderedDict()  # Decoded surfaces, least recently used first
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
         self.load_sprites()
     
     def load_sprites(self):
-        """Load all PNG files from the directory"""
+        """Index all PNG files in the directory, decoding them unless lazy"""
         try:
             for root, _, files in os.walk(self.directory):
                 for file in files:
                     if file.endswith('.png'):
                         rel_path = os.path.relpath(os.path.join(root, file), self.directory)
                         rel_path = rel_path.replace('\\', '/')  # Normalize path separators
-                        sprite_path = os.path.join(root, file)
-                        try:
-                            sprite = pygame.image.load(sprite_path).convert_alpha()
-                            self.sprites[rel_path] = sprite
-                        except pygame.error as e:
-                            print(f"Error loading sprite {rel_path}: {str(e)}")
+                        self.index[rel_path] = os.path.join(root, file)
         except Exception as e:
             print(f"Error walking directory {self.directory}: {str(e)}")
+        
+        if self.lazy:
+            return
+        
+        for rel_path, sprite_path in self.index.items():
+            try:
+                sprite = pygame.image.load(sprite_path)
+                if not self.use_atlas:
+                    sprite = sprite.convert_alpha()
+                self.sprites[rel_path] = sprite
+            except pygame.error as e:
+                print(f"Error loading sprite {rel_path}: {e}")
+        
+        if self.use_atlas and self.sprites:
+            # Pack everything into a few large pages; format conversion happens once per page
+            self.atlas = TextureAtlas()
+            self.sprites = self.atlas.pack(self.sprites)
     
     def get_sprite(self, name):
         """Get a sprite by its name (relative path)"""
         # Normalize the path separator
         name = name.replace('\\', '/')
-        return self.sprites.get(name)  # Simply return None if not found
+        if not self.lazy:
+            return self.sprites.get(name)  # Simply return None if not found
+        
+        sprite = self.sprites.get(name)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(name)
+            return sprite
+        
+        sprite_path = self.index.get(name)
+        if sprite_path is None:
+            return None
+        
+        # First use (or evicted since) - decode it now
+        self.misses += 1
+        try:
+            sprite = pygame.image.load(sprite_path).convert_alpha()
+        except pygame.error as e:
+            print(f"Error loading sprite {name}: {e}")
+            return None
+        self.sprites[name] = sprite
+        self.cache_bytes += self._surface_bytes(sprite)
+        self._evict()
+        return sprite
+    
+    def _surface_bytes(self, surface):
+        """Pixel bytes held by a decoded surface"""
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+    
+    def _evict(self):
+        """Drop least recently used sprites until the cache fits the budget"""
+        if self.budget_bytes is None:
+            return
+        # Always keep the sprite that was just decoded, even if it alone is over budget
+        while self.cache_bytes > self.budget_bytes and len(self.sprites) > 1:
+            _, sprite = self.sprites.popitem(last=False)
+            self.cache_bytes -= self._surface_bytes(sprite)
+            self.evictions += 1
+    
+    def get_stats(self):
+        """Get cache counters, for sizing the budget"""
+        return {
+            'indexed': len(self.index),
+            'cached': len(self.sprites),
+            'cache_bytes': self.cache_bytes,
+            'budget_bytes': self.budget_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
 
 class SpriteManager:
     def __init__(self):
         """Initialize the sprite manager"""
         self.initialized = False
-        self.sprite_sheets = {}
+        self.sprite_sheets = {}  # Loaded sheets
+        self._sheet_specs = {}  # sheet name -> (path, grid settings), loaded on demand
         self.single_sprites = {}
         self.sprite_mappings = {}
         self.overlay_categories = ["Trees", "Rocks", "Bushes"]
@@ -153,58 +269,9 @@ class SpriteManager:
         """Load all sprite sheets from the assets directory"""
         assets_dir = os.path.join(os.path.dirname(__file__), '..', 'assets')
         
-        # Look for sprite sheets and individual sprites in zip files
-        for root, _, files in os.walk(assets_dir):
-            for file in files:
-                if file.endswith('.zip'):
-                    zip_path = os.path.join(root, file)
-                    try:
-                        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                            # Create a temporary directory for extraction
-                            temp_dir = os.path.join(assets_dir, 'temp_extract')
-                            os.makedirs(temp_dir, exist_ok=True)
-                            
-                            # Extract all PNG files
-                            png_files = [f for f in zip_ref.namelist() if f.lower().endswith('.png')]
-                            for png_file in png_files:
-                                zip_ref.extract(png_file, temp_dir)
-                                
-                                # Determine if this is a sprite sheet or individual sprite
-                                img_path = os.path.join(temp_dir, png_file)
-                                try:
-                                    img = pygame.image.load(img_path).convert_alpha()
-                                    width, height = img.get_size()
-                                    
-                                    # If the image is large and seems to be a grid, treat as sprite sheet
-                                    if width >= 256 and height >= 256 and ('sheet' in png_file.lower() or 'icon' in png_file.lower()):
-                                        if 'character' in png_file.lower() or 'icon' in png_file.lower():
-                                            shutil.copy(img_path, os.path.join(assets_dir, 'character_icons.png'))
-                                        elif 'item' in png_file.lower():
-                                            shutil.copy(img_path, os.path.join(assets_dir, 'items.png'))
-                                    else:
-                                        # Individual sprite - move to appropriate category directory
-                                        target_dir = None
-                                        if 'character' in png_file.lower():
-                                            target_dir = os.path.join(assets_dir, 'characters_png')
-                                        elif 'item' in png_file.lower():
-                                            target_dir = os.path.join(assets_dir, 'items_png')
-                                        elif any(terrain in png_file.lower() for terrain in ['tree', 'rock', 'grass', 'water', 'terrain']):
-                                            target_dir = os.path.join(assets_dir, 'terrain_png')
-                                        
-                                        if target_dir:
-                                            os.makedirs(target_dir, exist_ok=True)
-                                            # Preserve subdirectory structure from zip
-                                            rel_path = os.path.dirname(png_file)
-                                            if rel_path:
-                                                os.makedirs(os.path.join(target_dir, rel_path), exist_ok=True)
-                                            shutil.copy(img_path, os.path.join(target_dir, png_file))
-                                except Exception as e:
-                                    print(f"Error loading {png_file}: {str(e)}")
-                            
-                            # Clean up temporary directory
-                            shutil.rmtree(temp_dir, ignore_errors=True)
-                    except Exception as e:
-                        print(f"Error with zip file {zip_path}: {str(e)}")
+        # Import sprite sheets and individual sprites from zip files
+        # (packs that haven't changed since the last launch are skipped)
+        AssetImporter(assets_dir).import_all()
         
         # Create placeholder sprite sheets if needed
         self._create_placeholder_sheets(assets_dir)
@@ -216,21 +283,35 @@ class SpriteManager:
             'terrain': os.path.join(assets_dir, 'Background 2a.png')  # Using this for terrain tiles
         }
         
-        # Load all sprite sheets with appropriate grid sizes
+        # Register sprite sheets with appropriate grid sizes; each one is
+        # decoded the first time something asks for it
         for sheet_name, path in sprite_paths.items():
             if os.path.exists(path):
                 if sheet_name == 'characters':
-                    self.sprite_sheets[sheet_name] = SpriteSheet(path, sprite_width=32, sprite_height=32,
-                                                               grid_width=16, grid_height=20)
+                    self._sheet_specs[sheet_name] = (path, {'sprite_width': 32, 'sprite_height': 32,
+                                                                'grid_width': 16, 'grid_height': 20})
                 elif sheet_name == 'items':
-                    self.sprite_sheets[sheet_name] = SpriteSheet(path, sprite_width=32, sprite_height=32,
-                                                               grid_width=16, grid_height=20)
+                    self._sheet_specs[sheet_name] = (path, {'sprite_width': 32, 'sprite_height': 32,
+                                                                'grid_width': 16, 'grid_height': 20})
                 else:  # terrain
-                    self.sprite_sheets[sheet_name] = SpriteSheet(path, sprite_width=64, sprite_height=64,
-                                                               grid_width=8, grid_height=8)
+                    self._sheet_specs[sheet_name] = (path, {'sprite_width': 64, 'sprite_height': 64,
+                                                                'grid_width': 8, 'grid_height': 8})
             else:
                 print(f"Missing sprite sheet: {path}")
     
+    def _get_sheet(self, sheet_name):
+        """Get a sprite sheet, loading it on first use"""
+        sheet = self.sprite_sheets.get(sheet_name)
+        if sheet is None and sheet_name in self._sheet_specs:
+            path, grid = self._sheet_specs[sheet_name]
+            try:
+                # Hand out zero-copy views; only the cells actually used get sliced
+                sheet = SpriteSheet(path, mode='subsurface', **grid)
+                self.sprite_sheets[sheet_name] = sheet
+            except pygame.error as e:
+                print(f"Error loading sprite sheet {path}: {e}")
+        return sheet
+    
     def _create_placeholder_sheets(self, assets_dir):
         """Create placeholder sprite sheets if they don't exist"""
         # Create character sprite sheet
@@ -377,7 +458,8 @@ class SpriteManager:
             category_dir = os.path.join(assets_dir, category)
             if os.path.exists(category_dir) and os.path.isdir(category_dir):
                 try:
-                    self.single_sprites[category] = SingleSprite(category_dir)
+                    # Only index the files here; PNGs are decoded on first use
+                    self.single_sprites[category] = SingleSprite(category_dir, budget_bytes=SPRITE_CACHE_BUDGET)
                 except Exception as e:
                     print(f"Error loading category {category}: {str(e)}")
     
@@ -385,8 +467,8 @@ class SpriteManager:
         """Create a game sprite from a specific sheet and index"""
         if not self.initialized:
             self.initialize()
-        if sheet_name in self.sprite_sheets:
-            sheet = self.sprite_sheets[sheet_name]
+        sheet = self._get_sheet(sheet_name)
+        if sheet:
             sprite = sheet.get_sprite(sprite_index)
             if sprite:
                 game_sprite = GameSprite(sheet, sprite_index, x, y)
@@ -401,12 +483,14 @@ class SpriteManager:
         """Create an animated sprite for a character"""
         if not self.initialized:
             self.initialize()
-        if (sheet_name in self.sprite_sheets and 
+        if (sheet_name in self._sheet_specs and 
             character_type in self.sprite_mappings[sheet_name] and 
             animation_type in self.sprite_mappings[sheet_name][character_type]):
             
             frames = self.sprite_mappings[sheet_name][character_type][animation_type]
-            return AnimatedSprite(self.sprite_sheets[sheet_name], frames, x=x, y=y)
+            sheet = self._get_sheet(sheet_name)
+            if sheet:
+                return AnimatedSprite(sheet, frames, x=x, y=y)
         return None
     
     def get_item_sprite(self, item_type, item_name, x=0, y=0):
@@ -705,6 +789,13 @@ class SpriteManager:
         
         return None
     
+    def get_overlay(self, category, sprite_name):
+        """Get the shared cached overlay sprite, loading it on first use (don't move or modify it)"""
+        cache_key = f"{category}/{sprite_name}"
+        if cache_key not in self._cached_overlays:
+            self.get_overlay_sprite(category, sprite_name)
+        return self._cached_overlays.get(cache_key)
+    
     def get_available_tiles(self):
         """Get a list of all available base terrain tiles"""
         if not self.initialized:
@@ -720,16 +811,28 @@ class SpriteManager:
                 tiles.append(sprite)
         
         # Then add any map tiles
-        if 'terrain_png' in self.single_sprites:
-            for sprite_name in self.single_sprites['terrain_png'].sprites:
-                if sprite_name.startswith('Tiles/Map_tile_'):
-                    # Remove .png extension if present
-                    tile_name = sprite_name[:-4] if sprite_name.endswith('.png') else sprite_name
-                    sprite = self.get_base_tile(tile_name)
-                    if sprite:
-                        tiles.append(sprite)
+        for tile_name in self.get_map_tile_names():
+            sprite = self.get_base_tile(tile_name)
+            if sprite:
+                tiles.append(sprite)
         
         return tiles
+    
+    def get_map_tile_names(self):
+        """Get the names of all map tiles without decoding them"""
+        if not self.initialized:
+            self.initialize()
+        
+        if 'terrain_png' not in self.single_sprites:
+            return []
+        # Remove .png extension if present
+        return [sprite_name[:-4] if sprite_name.endswith('.png') else sprite_name
+                for sprite_name in self.single_sprites['terrain_png'].index
+                if sprite_name.startswith('Tiles/Map_tile_')]
+    
+    def get_cache_stats(self):
+        """Get sprite cache counters per single-sprite category"""
+        return {category: sprites.get_stats() for category, sprites in self.single_sprites.items()}
 
     def get_available_overlays(self):
         """Get a dictionary of available overlay sprites by category"""
@@ -803,7 +906,7 @@ class SpriteManager:
                 return game_sprite
             else:
                 print(f"Sprite not found: {sprite_name}")  # Debug print
-                print(f"Available sprites: {sorted(sprite_sheet.sprites.keys())}")  # Debug print
+                print(f"Available sprites: {sorted(sprite_sheet.index.keys())}")  # Debug print
         else:
             print(f"Category not found: {category_key}")  # Debug print
             print(f"Available categories: {sorted(self.single_sprites.keys())}")  # Debug print
@@ -0,0 +1,477 @@
+import random
+import time
+import pygame
+from utils.constants import WINDOW_SIZE, WHITE, BLACK, MINIMAP_SIZE, SOUND_FLEE, SOUND_PLAYER_DEFEAT
+from utils.helpers import play_sound, save_game
+from ui.dirty_rects import dirty_rects
+from ui.systemmenu import SystemMenu
+
+class GameState:
+    """One screen of the game: exploration, a battle, the inventory, a debug view.
+
+    States live on a StateStack. Only the top one gets input and fixed-step
+    updates. Drawing starts at the highest state that isn't an overlay, so
+    overlays (the inventory, a battle) are drawn over the screen under them.
+    """
+    name = "state"
+    overlay = False  # Drawn over the state below instead of replacing it
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        """Pushed onto the stack"""
+
+    def exit(self):
+        """Popped off the stack"""
+
+    def pause(self):
+        """Another state was pushed on top"""
+
+    def resume(self):
+        """The state on top was popped"""
+
+    def handle_events(self, events):
+        """React to this frame's input"""
+
+    def update(self, dt):
+        """Advance dt seconds of game time"""
+
+    def render(self, alpha, covered):
+        """Queue this state's drawing.
+
+        alpha is how far (0-1) the frame is between the last update and the
+        next; covered is whether an overlay will be drawn on top.
+        """
+
+    def signature(self):
+        """What the screen shows besides input; a frame is drawn when it changes"""
+        return self.game.scene_signature()
+
+    def is_busy(self):
+        """Whether the state changes on its own and needs frames without input"""
+        return False
+
+class StateStack:
+    """The pushed game states, with frame-time counters kept per state name"""
+    def __init__(self):
+        self.states = []
+        self.stats = {}  # state name -> counters
+
+    def __bool__(self):
+        return bool(self.states)
+
+    @property
+    def top(self):
+        return self.states[-1] if self.states else None
+
+    def push(self, state):
+        if self.states:
+            self.states[-1].pause()
+        self.states.append(state)
+        state.enter()
+
+    def pop(self):
+        state = self.states.pop()
+        state.exit()
+        if self.states:
+            self.states[-1].resume()
+        return state
+
+    def replace(self, state):
+        """Swap the top state for another one"""
+        self.states.pop().exit()
+        self.states.append(state)
+        state.enter()
+
+    def clear(self):
+        """Pop every state (the game is quitting)"""
+        while self.states:
+            self.states.pop().exit()
+
+    def render(self, alpha):
+        """Draw from the highest state that isn't an overlay up to the top"""
+        start = len(self.states) - 1
+        while start > 0 and self.states[start].overlay:
+            start -= 1
+        for index in range(start, len(self.states)):
+            self.states[index].render(alpha, index < len(self.states) - 1)
+
+    def counters(self, state):
+        """Frame counters for a state's name"""
+        return self.stats.setdefault(state.name, {
+            'frames': 0, 'updates': 0, 'skipped': 0, 'idle_waits': 0, 'total_ms': 0.0, 'worst_ms': 0.0,
+        })
+
+    def record_frame(self, state, seconds):
+        """Count a drawn frame that took seconds of work (input, updates, drawing)"""
+        counters = self.counters(state)
+        counters['frames'] += 1
+        counters['total_ms'] += seconds * 1000
+        counters['worst_ms'] = max(counters['worst_ms'], seconds * 1000)
+
+    def get_stats(self):
+        """Get frame counters per state, with the mean frame time"""
+        return {name: dict(counters, total_ms=round(counters['total_ms'], 1),
+                           worst_ms=round(counters['worst_ms'], 2),
+                           mean_ms=round(counters['total_ms'] / counters['frames'], 2) if counters['frames'] else 0.0)
+                for name, counters in self.stats.items()}
+
+class ExplorationState(GameState):
+    """The world map: click to move, roaming monsters, random encounters"""
+    name = "exploration"
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.console_rect = None  # Where the console was last drawn, for clicks on its button
+
+    def pause(self):
+        self.game.world.update_preview(None)
+
+    def resume(self):
+        self.game.world.update_preview(None)
+
+    def handle_events(self, events):
+        game = self.game
+        world = game.world
+        hover = None
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1:  # Left click
+                    mouse_pos = world.to_canvas(event.pos)
+                    if self.console_rect and game.message_console.toggle_collapse(mouse_pos, self.console_rect):
+                        continue  # Skip movement handling if console was clicked
+
+                    minimap = world.minimap
+                    if game.show_minimap and minimap.rect and minimap.rect.collidepoint(mouse_pos):
+                        # Travel to the spot clicked on the minimap
+                        target_x, target_y = minimap.cell_at(mouse_pos)
+                    else:
+                        target_x, target_y = world.screen_to_cell(mouse_pos)
+                    # Walking starts with the next update; a click while walking changes course
+                    if not game.movement.set_target(target_x, target_y):
+                        game.show_message("Cannot move there!")
+            elif event.type == pygame.MOUSEMOTION:
+                # Only the last position this frame is planned for
+                hover = world.to_canvas(event.pos)
+            elif event.type == pygame.MOUSEWHEEL:
+                world.zoom(1 if event.y > 0 else -1)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    game.quit()
+                    return
+                elif event.key == pygame.K_ESCAPE:
+                    game.states.push(MenuState(game))
+                    return
+                elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                    if save_game(game.player, world):
+                        game.show_message("Game saved successfully!")
+                    else:
+                        game.show_message("Failed to save game!")
+                elif event.key == pygame.K_s:
+                    game.states.push(SpriteDebugState(game))
+                    return
+                elif event.key == pygame.K_d:
+                    game.states.push(DebugState(game))
+                    return
+                elif event.key == pygame.K_i:
+                    game.states.push(InventoryState(game))
+                    return
+                elif event.key == pygame.K_k:  # Toggle kill statistics
+                    game.show_kills = not game.show_kills
+                elif event.key == pygame.K_m:  # Toggle minimap
+                    game.show_minimap = not game.show_minimap
+                elif event.key == pygame.K_h:
+                    heal_amount = game.player.heal()
+                    game.message = f"{game.player.name} heals for {heal_amount} HP"
+                    game.message_console.add_message(f"You heal for {heal_amount} HP")
+                    game.message_time = time.time()
+
+        # Preview the path a click would take from here
+        if hover is not None:
+            minimap = world.minimap
+            if game.show_minimap and minimap.rect and minimap.rect.collidepoint(hover):
+                world.update_preview(None)
+            else:
+                world.update_preview(world.screen_to_cell(hover))
+
+    def update(self, dt):
+        game = self.game
+        # Walk on along the clicked path; a step that finds an encounter starts a battle
+        encounter = game.movement.update(dt)
+        # The monsters chase on their own clock, even while the player stands still
+        if game.world.advance_monsters(dt) or encounter:
+            game.states.push(CombatState(game, game.create_enemy()))
+
+    def render(self, alpha, covered):
+        game = self.game
+        world = game.world
+        game.movement.interpolate(alpha * game.step_time)
+        world.interpolate_monsters(alpha * game.step_time)
+        world.display_viewport()
+        if covered:
+            return  # The overlay brings its own console and messages
+
+        self.console_rect = game.message_console.draw(world.screen, *game.console_rect())
+        if game.show_minimap:
+            world.minimap.draw(world.screen, world.window_width - MINIMAP_SIZE - 10, 10,
+                               MINIMAP_SIZE, world.player_x, world.player_y)
+        else:
+            dirty_rects.forget('minimap')
+
+        # Draw kill statistics if enabled
+        if game.show_kills:
+            kills_y = world.window_height - 60
+            kills_text = "Kills: "
+            for enemy in ["Goblin", "Orc", "Troll", "Dragon"]:
+                kills = game.player.kills.get(enemy, 0)
+                kills_text += f"{enemy}: {kills} | "
+            kills_text = kills_text[:-3]  # Remove last separator
+            kills_rect = world.draw_text(kills_text, (20, kills_y), BLACK)
+            dirty_rects.track('kills', kills_rect, kills_text)
+        else:
+            dirty_rects.forget('kills')
+        game.draw_message(BLACK)
+
+    def signature(self):
+        return (self.game.scene_signature(), self.game.show_kills, self.game.show_minimap)
+
+    def is_busy(self):
+        world = self.game.world
+        return self.game.movement.is_moving() or world.monsters_active() or world.has_pending_work()
+
+class InventoryState(GameState):
+    """The inventory, drawn darkened over the world"""
+    name = "inventory"
+    overlay = True
+
+    def handle_events(self, events):
+        game = self.game
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    game.quit()
+                    return
+                elif event.key == pygame.K_i:  # Close the inventory
+                    game.states.pop()
+                    return
+                game.handle_inventory_input(event)
+
+    def render(self, alpha, covered):
+        self.game.draw_inventory_screen()
+        # The overlay darkens whatever is underneath
+        dirty_rects.add_all()
+        self.game.draw_message(WHITE, track=False)
+
+class DebugState(GameState):
+    """The world view without the console and minimap"""
+    name = "debug"
+
+    def handle_events(self, events):
+        game = self.game
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    game.quit()
+                    return
+                elif event.key in (pygame.K_d, pygame.K_g):  # Back to the game view
+                    game.states.pop()
+                    return
+                elif event.key == pygame.K_s:
+                    game.states.replace(SpriteDebugState(game))
+                    return
+                elif event.key == pygame.K_i:
+                    game.states.push(InventoryState(game))
+                    return
+
+    def render(self, alpha, covered):
+        self.game.world.display_viewport()
+        if not covered:
+            self.game.draw_message(BLACK)
+
+class SpriteDebugState(GameState):
+    """Every loaded tile and overlay sprite, for checking the sprite mappings"""
+    name = "sprite_debug"
+
+    def handle_events(self, events):
+        game = self.game
+        world = game.world
+        for event in events:
+            # The sprite browser gets every event first (scrolling, picking sprites)
+            if world.handle_sprite_debug_click(world.to_canvas(pygame.mouse.get_pos()), event):
+                continue
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
+                    game.quit()
+                    return
+                elif event.key in (pygame.K_s, pygame.K_g):  # Back to the game view
+                    game.states.pop()
+                    return
+                elif event.key == pygame.K_d:
+                    game.states.replace(DebugState(game))
+                    return
+                elif event.key == pygame.K_i:
+                    game.states.push(InventoryState(game))
+                    return
+
+    def render(self, alpha, covered):
+        self.game.world.draw_sprite_debug()
+        if not covered:
+            self.game.draw_message(BLACK)
+
+class CombatState(GameState):
+    """A turn-based battle, drawn over the world"""
+    name = "combat"
+    overlay = True
+
+    def __init__(self, game, enemy):
+        super().__init__(game)
+        self.enemy = enemy
+        self.console_rect = None  # Where the console was last drawn, for clicks on its button
+
+    def enter(self):
+        game = self.game
+        game.current_enemy = self.enemy
+        game.in_combat = True
+        game.show_message(f"A {self.enemy.name} appears!")
+
+    def exit(self):
+        self.game.in_combat = False
+
+    def handle_events(self, events):
+        game = self.game
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.console_rect:  # Left click
+                # Check if console button was clicked
+                game.message_console.toggle_collapse(game.world.to_canvas(event.pos), self.console_rect)
+            elif event.type == pygame.KEYDOWN and event.key in [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]:
+                self.take_turn(event.key - pygame.K_1 + 1)
+                return  # The battle may be over
+
+    def take_turn(self, choice):
+        """Play the player's choice, then the enemy's attack"""
+        game = self.game
+        player = game.player
+        enemy = self.enemy
+        if choice == 1:  # Regular attack
+            damage = player.attack_target(enemy)
+            game.last_player_damage = damage
+            game.message = f"You deal {damage} damage to {enemy.name}"
+            game.message_console.add_message(f"You deal {damage} damage to {enemy.name}")
+            game.combat_animation_frame = 1
+        elif choice == 2:  # Strong attack
+            damage = player.strong_attack(enemy)
+            game.last_player_damage = damage
+            game.message = f"Strong attack! {damage} damage to {enemy.name}"
+            game.message_console.add_message(f"Strong attack! {damage} damage to {enemy.name}")
+            game.combat_animation_frame = 1
+        elif choice == 3:  # Heal
+            heal_amount = player.heal()
+            game.message = f"You heal for {heal_amount} HP"
+            game.message_console.add_message(f"You heal for {heal_amount} HP")
+        else:  # Flee
+            play_sound(SOUND_FLEE)
+            if random.random() < 0.5:
+                game.show_message("You successfully fled!")
+                game.states.pop()
+                return
+            else:
+                game.message = "Failed to flee!"
+                game.message_console.add_message("Failed to flee!")
+
+        game.message_time = time.time()
+
+        if not enemy.is_alive():
+            game.handle_enemy_defeat(enemy)
+            game.states.pop()
+            return
+
+        # Enemy's turn
+        damage = enemy.attack_target(player)
+        game.last_enemy_damage = damage
+        game.message = f"{enemy.name} deals {damage} damage to you"
+        game.message_console.add_message(f"{enemy.name} deals {damage} damage to you")
+        game.combat_animation_frame = 11
+
+        if not player.is_alive():
+            game.show_message("You have been defeated!")
+            play_sound(SOUND_PLAYER_DEFEAT)
+            game.quit()
+
+    def render(self, alpha, covered):
+        self.console_rect = self.game.draw_combat_screen()
+        self.game.draw_message(WHITE)
+
+class MenuState(GameState):
+    """The system menu (Esc), drawn over the world"""
+    name = "menu"
+    overlay = True
+
+    def enter(self):
+        world = self.game.world
+        self.menu = SystemMenu(world.window_width, world.window_height)
+        self.menu.show()
+
+    def handle_events(self, events):
+        game = self.game
+        world = game.world
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                # The menu's option rects are on the canvas
+                event = pygame.event.Event(event.type, button=event.button, pos=world.to_canvas(event.pos))
+            choice = self.menu.handle_event(event)
+            if choice == "Continue":
+                game.states.pop()
+                return
+            elif choice == "Save Game":
+                if save_game(game.player, world):
+                    game.show_message("Game saved successfully!")
+                else:
+                    game.show_message("Failed to save game!")
+                game.states.pop()
+                return
+            elif choice == "New Game":
+                game.states.pop()
+                game.new_game()
+                return
+            elif choice == "Tools":
+                game.states.replace(SpriteDebugState(game))
+                return
+            elif choice == "Quit Game":
+                game.quit()
+                return
+
+    def render(self, alpha, covered):
+        world = self.game.world
+        if (self.menu.screen_width, self.menu.screen_height) != (world.window_width, world.window_height):
+            self.menu.resize(world.window_width, world.window_height)
+        self.menu.draw(world.screen)
+
+    def signature(self):
+        return (self.game.scene_signature(), self.menu.selected_option)
+
+class GameOverState(GameState):
+    """The final screen, shown for a few seconds before the game closes"""
+    name = "game_over"
+    duration = 3  # Seconds
+
+    def enter(self):
+        self.remaining = self.duration
+
+    def update(self, dt):
+        self.remaining -= dt
+        if self.remaining <= 0:
+            self.game.states.clear()
+
+    def render(self, alpha, covered):
+        game = self.game
+        game.world.screen.fill(BLACK)
+        game.world.draw_text("Game Over!", (WINDOW_SIZE//2 - 50, WINDOW_SIZE//2 - 50), WHITE)
+        game.world.draw_text(f"Final level: {game.player.level}",
+                             (WINDOW_SIZE//2 - 50, WINDOW_SIZE//2), WHITE)
+        game.world.draw_text(f"Final location: ({game.world.player_x}, {game.world.player_y})",
+                             (WINDOW_SIZE//2 - 100, WINDOW_SIZE//2 + 50), WHITE)
+        dirty_rects.add_all()
+
+    def is_busy(self):
+        return True  # Counting down
@@ -0,0 +1,92 @@
+import pygame
+from utils.constants import WHITE
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:  # pygame built without the SDL2 video module
+    Window = Renderer = Texture = None
+
+class TextureRenderer:
+    """Draw the world viewport with SDL2 texture copies instead of Surface blits.
+
+    The pages of the TileRegistry's atlas for the current cell size are
+    uploaded once as textures and kept per zoom level (re-uploaded only if
+    the tile set changes), so a frame is one unscaled texture copy per
+    visible cell and layer. Everything else
+    (the player, console, text, menus) is still drawn with Surfaces onto a
+    transparent UI layer, which is uploaded and drawn over the world when it
+    changes. The renderer's logical size is fixed, so SDL scales the frame
+    to whatever size the window is resized to. With no GPU, SDL falls back
+    to its software renderer.
+    """
+    def __init__(self, size, title):
+        if Renderer is None:
+            raise RuntimeError("pygame._sdl2.video is not available")
+        self.size = size
+        self.window = Window(title, size=size, resizable=True)
+        self.renderer = Renderer(self.window)
+        self.renderer.logical_size = size
+        self._zooms = {}  # cell size -> (tile registry version, page textures, [tile ID -> (page draw, source rect)])
+        self._ui_texture = None
+        self.view = None  # (tiles, chunks, start_x, start_y, cell_size) of the last viewport
+        self.frames = 0
+        self.copies = 0
+        self.uploads = 0
+
+    def upload_tiles(self, tiles, cell_size):
+        """Upload the tile atlas for a cell size and return [tile ID -> (page draw, source rect)]"""
+        entry = self._zooms.get(cell_size)
+        if entry is not None and entry[0] == tiles.version:
+            return entry[2]
+        atlas = tiles.zoom_atlas(cell_size)
+        pages = [Texture.from_surface(self.renderer, page) for page in atlas.pages]
+        regions = [None] * len(tiles.images)
+        for tile_id, (page_index, rect) in atlas.regions.items():
+            regions[tile_id] = (pages[page_index].draw, rect)
+        self._zooms[cell_size] = (tiles.version, pages, regions)
+        self.uploads += len(pages)
+        return regions
+
+    def set_view(self, tiles, chunks, start_x, start_y, cell_size, offset=(0, 0)):
+        """Remember what the world layer shows, offset pixels into cell (start_x, start_y); drawn on the next present()"""
+        self.view = (tiles, chunks, start_x, start_y, cell_size, offset)
+
+    def present(self, ui_surface):
+        """Draw the world, then the UI layer on top, and show the frame"""
+        renderer = self.renderer
+        renderer.draw_color = (*WHITE, 255)
+        renderer.clear()
+        if self.view is not None:
+            self._draw_world(*self.view)
+
+        if self._ui_texture is None or self._ui_texture.get_rect().size != ui_surface.get_size():
+            self._ui_texture = Texture(renderer, ui_surface.get_size(), streaming=True)
+            self._ui_texture.blend_mode = pygame.BLENDMODE_BLEND
+        self._ui_texture.update(ui_surface)
+        self._ui_texture.draw()
+        renderer.present()
+        self.frames += 1
+
+    def _draw_world(self, tiles, chunks, start_x, start_y, cell_size, offset):
+        regions = self.upload_tiles(tiles, cell_size)
+        width, height = self.size
+        offset_x, offset_y = offset
+        cols = -(-(width + offset_x) // cell_size)
+        rows = -(-(height + offset_y) // cell_size)
+        for layer in ('terrain', 'overlay'):
+            ids = chunks.get_region(layer, start_x, start_y, cols, rows).tolist()
+            for row, row_ids in enumerate(ids):
+                y = row * cell_size - offset_y
+                for col, tile_id in enumerate(row_ids):
+                    region = regions[tile_id] if tile_id < len(regions) else None
+                    if region is not None:
+                        region[0](region[1], (col * cell_size - offset_x, y, cell_size, cell_size))
+                        self.copies += 1
+
+    def close(self):
+        """Close the renderer's window"""
+        self.window.destroy()
+
+    def get_stats(self):
+        """Get renderer counters"""
+        return {'frames': self.frames, 'copies': self.copies, 'uploads': self.uploads}
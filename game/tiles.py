@@ -0,0 +1,94 @@
+import numpy as np
+import pygame
+from game.atlas import TextureAtlas
+
+class TileRegistry:
+    """Flyweight registry mapping small integer tile IDs to shared tile surfaces.
+
+    The world stores only IDs per cell; every cell showing the same tile
+    resolves to the same Surface at draw time. ID 0 is reserved for "no tile".
+
+    Each tile also has a passability flag and a movement cost, kept in
+    256-entry lookup tables so whole ID arrays can be mapped at once.
+
+    For drawing, every tile is pre-scaled once per cell size (zoom level)
+    and packed into a TextureAtlas for that size; see zoom_atlas().
+    """
+    EMPTY = 0
+    BLOCKED_COST = 255  # Cost recorded for impassable cells
+
+    def __init__(self):
+        self.names = [None]  # tile ID -> name
+        self.images = [None]  # tile ID -> shared surface
+        self._ids = {}  # name -> tile ID
+        self.passable_lut = np.ones(256, dtype=np.uint8)  # tile ID -> 1 if it can be walked on
+        self.cost_lut = np.zeros(256, dtype=np.uint8)  # tile ID -> movement cost (0 for EMPTY)
+        self.version = 0  # Bumped by register() so zoom atlases know when to rebuild
+        self._zoom_atlases = {}  # cell size -> (version, TextureAtlas, [tile ID -> scaled surface])
+
+    def register(self, name, image, passable=True, cost=1):
+        """Register a tile and return its ID (re-registering a name keeps its ID)"""
+        tile_id = self._ids.get(name)
+        if tile_id is None:
+            if len(self.names) > 255:
+                raise ValueError("Tile registry is full (IDs must fit in a byte)")
+            tile_id = len(self.names)
+            self.names.append(name)
+            self.images.append(image)
+            self._ids[name] = tile_id
+        else:
+            self.images[tile_id] = image
+        self.passable_lut[tile_id] = 1 if passable else 0
+        self.cost_lut[tile_id] = cost if passable else self.BLOCKED_COST
+        self.version += 1
+        return tile_id
+
+    def zoom_atlas(self, cell_size):
+        """Get the atlas of every tile scaled to cell_size, building it the first time"""
+        entry = self._zoom_atlases.get(cell_size)
+        if entry is None or entry[0] != self.version:
+            size = (cell_size, cell_size)
+            surfaces = {tile_id: image if image.get_size() == size else pygame.transform.scale(image, size)
+                        for tile_id, image in enumerate(self.images) if image is not None}
+            atlas = TextureAtlas(page_size=max(512, cell_size * 8))
+            sprites = atlas.pack(surfaces)
+            images = [sprites.get(tile_id) for tile_id in range(len(self.images))]
+            entry = self._zoom_atlases[cell_size] = (self.version, atlas, images)
+        return entry[1]
+
+    def scaled_images(self, cell_size):
+        """Get the tiles scaled to cell_size as a list indexed by tile ID (None for no image)"""
+        self.zoom_atlas(cell_size)
+        return self._zoom_atlases[cell_size][2]
+
+    def zoom_levels(self):
+        """Cell sizes that already have an atlas"""
+        return sorted(self._zoom_atlases)
+
+    def cell_layers(self, terrain, overlay):
+        """Map terrain and overlay ID arrays to (passable, cost) uint8 arrays.
+
+        A cell is passable only if both its terrain and overlay are, and costs
+        the higher of the two (at least 1).
+        """
+        passable = self.passable_lut[terrain] & self.passable_lut[overlay]
+        cost = np.maximum(self.cost_lut[terrain], self.cost_lut[overlay])
+        np.maximum(cost, 1, out=cost)
+        return passable, cost
+
+    def get_id(self, name):
+        """Get the ID of a registered tile, or None"""
+        return self._ids.get(name)
+
+    def get_name(self, tile_id):
+        """Get the name of a tile ID"""
+        return self.names[tile_id]
+
+    def get_image(self, tile_id):
+        """Get the shared surface for a tile ID (None for EMPTY or unknown IDs)"""
+        if tile_id is None or tile_id >= len(self.images):
+            return None
+        return self.images[tile_id]
+
+    def __len__(self):
+        return len(self.names) - 1
@@ -1,28 +1,52 @@
+import math
 import pygame
 import random
 import time
-from utils.constants import WINDOW_SIZE, WHITE, BLACK, WINDOW_TITLE
+from utils.constants import (WINDOW_SIZE, BLACK, WINDOW_TITLE, CHUNK_PREFETCH_AHEAD, TILE_PROPERTIES,
+                             VIEWPORT_RENDER_MODE, DISPLAY_SCALING, CANVAS_SIZE, RENDER_BACKEND, ZOOM_LEVELS,
+                             DEFAULT_ZOOM, PATH_SEARCH_MARGIN, YELLOW, RED, MONSTER_COUNT,
+                             MONSTER_SPAWN_RANGE, MONSTER_SPEED)
 from game.sprites import sprite_manager, GameSprite
+from game.scale_cache import scale_cache
+from game.tiles import TileRegistry
+from game.chunks import Chunk, ChunkManager
+from game.worldgen import BiomeGenerator, TERRAIN_TYPES
+from game.chunk_pipeline import ChunkPipeline
+from game.chunk_surfaces import ChunkSurfaceCache
+from game.scroll_viewport import ScrollViewport
+from game.texture_renderer import TextureRenderer
+from game.pathfinding import PathFinder
+from game.hpa import HierarchicalPathFinder
+from game.dstar import IncrementalPlanner
+from game.flowfield import FlowField
+from ui.dirty_rects import dirty_rects
+from ui.minimap import Minimap
+from ui.render_queue import render_queue
 from utils.helpers import load_sprite_mappings
 
 class World:
-    def __init__(self, player):
+    def __init__(self, player, backend=RENDER_BACKEND, seed=None):
         """Initialize the world"""
         # Initialize Pygame display
         pygame.init()
-        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE), pygame.RESIZABLE)
+        self.window_width = WINDOW_SIZE
+        self.window_height = WINDOW_SIZE
+        self.texture_renderer = None
+        if backend == "sdl2":
+            self.open_texture_display()
+        else:
+            self.open_display(DISPLAY_SCALING)
         pygame.display.set_caption(WINDOW_TITLE)
         
         # Initialize sprite debug variables
         self.show_sprite_debug = False
         self.selected_sprite = None
         self.sprite_debug_scroll = 0
+        self.sprite_debug_sprites = None  # (base tiles, overlays by category), built on first draw
         self.max_scroll = 0  # Will be calculated based on content
         self._sprite_cache_initialized = False
         self._cached_tiles = []
         self._cached_overlays = {}
-        self.window_width = WINDOW_SIZE
-        self.window_height = WINDOW_SIZE
         
         # Initialize sprite manager
         sprite_manager.initialize()
@@ -36,8 +60,27 @@ class World:
         # Initialize world state
         self.player_x = 0
         self.player_y = 0
-        self.world_map = {}
-        self.CELL_SIZE = 32
+        self.step_from = None  # Cell the player is being drawn walking away from
+        self.step_progress = 1.0  # How far the player has got from step_from to their cell
+        self.step_drawn = 1.0  # How far between the two to draw them this frame
+        self.tiles = TileRegistry()  # Shared tile surfaces; the chunks hold only tile IDs
+        self.seed = random.randrange(2**32) if seed is None else seed  # Saved, so a loaded game gets its world back
+        self.chunks = ChunkManager(self.generate_chunk, self.tiles)
+        self.chunk_surfaces = ChunkSurfaceCache(self.tiles)
+        self.scroll_viewport = ScrollViewport(self.tiles)
+        self.minimap = Minimap(self.chunks, self.tiles)
+        self.pathfinder = PathFinder(self.chunks)
+        self.hpa = HierarchicalPathFinder(self.chunks, self.pathfinder)
+        self.planner = IncrementalPlanner(self.chunks)
+        self.preview_path = []  # Cells of the path to the cell under the mouse
+        self.flow_field = FlowField(self.chunks)
+        self.monsters = []  # Cells of the roaming monsters chasing the player
+        self.monster_from = {}  # Monster cell -> the cell it stepped from on the last monster step
+        self.monster_speed = MONSTER_SPEED  # Cells per second
+        self.monster_progress = 1.0  # How far the monsters have got through their current step
+        self.monster_drawn = 1.0  # How far through it to draw them this frame
+        self.render_mode = VIEWPORT_RENDER_MODE
+        self.CELL_SIZE = DEFAULT_ZOOM
         self.VIEWPORT_SIZE = self.window_width // self.CELL_SIZE
         
         # Initialize debug flags
@@ -51,21 +94,155 @@ class World:
         
         print("World initialized")  # Debug print
 
+    def open_display(self, scaling):
+        """Create the window for a DISPLAY_SCALING mode.
+
+        self.screen is what everything draws on and self.window_width/height
+        its size. In "window" mode that is the display itself. In "canvas"
+        mode it is a fixed CANVAS_SIZE surface that present() scales to the
+        window, and in "scaled" mode SDL scales the CANVAS_SIZE display.
+        """
+        if scaling not in ("window", "canvas", "scaled"):
+            raise ValueError(f"Unknown display scaling: {scaling}")
+        if scaling == "scaled":
+            try:
+                self.display = pygame.display.set_mode(CANVAS_SIZE, pygame.SCALED | pygame.RESIZABLE)
+            except pygame.error as e:
+                print(f"Error opening a scaled display, scaling the canvas ourselves: {e}")
+                scaling = "canvas"
+        if scaling != "scaled":
+            self.display = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
+        self.display_scaling = scaling
+        
+        if scaling == "canvas":
+            self.screen = pygame.Surface(CANVAS_SIZE).convert()
+        else:
+            self.screen = self.display
+        self.window_width, self.window_height = self.screen.get_size()
+        dirty_rects.reset()
+
+    def open_texture_display(self):
+        """Draw the world with SDL2 textures (RENDER_BACKEND "sdl2"), or fall back to surfaces.
+
+        The renderer gets its own window with a fixed logical size, so it
+        scales like the "scaled" mode. self.screen becomes the transparent UI
+        layer drawn over the textures. A hidden display mode is still set
+        because Surface.convert() needs one.
+        """
+        try:
+            self.texture_renderer = TextureRenderer((self.window_width, self.window_height), WINDOW_TITLE)
+        except RuntimeError as e:  # pygame._sdl2 missing, or a pygame.error creating the renderer
+            print(f"Error starting the SDL2 renderer, drawing with surfaces: {e}")
+            self.open_display(DISPLAY_SCALING)
+            return
+        self.display = pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.display_scaling = "scaled"
+        self.screen = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
+        dirty_rects.reset()
+
     def handle_resize(self, size):
         """Handle window resize events"""
+        if self.display_scaling != "window":
+            # The canvas keeps its size; only the final scale changes
+            if self.display_scaling == "canvas":
+                self.display = pygame.display.set_mode(size, pygame.RESIZABLE)
+            dirty_rects.reset()
+            return
         self.window_width, self.window_height = size
-        self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
+        self.screen = self.display = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
         self.VIEWPORT_SIZE = self.window_width // self.CELL_SIZE
+        scale_cache.invalidate()
         self._calculate_max_scroll()
 
+    def to_canvas(self, pos):
+        """Map a window position (mouse events) to the surface everything is drawn on"""
+        if self.display_scaling != "canvas":
+            return pos
+        display_width, display_height = self.display.get_size()
+        return (pos[0] * self.window_width // max(1, display_width),
+                pos[1] * self.window_height // max(1, display_height))
+
+    def present(self):
+        """Draw the queued frame and push what changed to the window"""
+        render_queue.flush(self.screen)
+        if self.texture_renderer:
+            if dirty_rects.is_dirty():
+                self.texture_renderer.present(self.screen)
+            dirty_rects.flush()
+        elif self.display_scaling != "canvas":
+            dirty_rects.flush()
+        elif dirty_rects.is_dirty():
+            # One scale of the whole canvas instead of one per tile
+            display_size = self.display.get_size()
+            pygame.transform.scale(self.screen, display_size, self.display)
+            dirty_rects.flush((display_size[0] / self.window_width, display_size[1] / self.window_height))
+        else:
+            dirty_rects.flush()
+
+    def set_cell_size(self, cell_size):
+        """Change the on-screen size of a world cell"""
+        self.CELL_SIZE = cell_size
+        self.VIEWPORT_SIZE = self.window_width // self.CELL_SIZE
+        # The tiles at every cell size stay in the registry's zoom atlases;
+        # only the baked chunks and the scroll buffer are drawn at one size
+        self.chunk_surfaces.invalidate()
+        self.scroll_viewport.invalidate()
+
+    def zoom(self, step):
+        """Move step levels through ZOOM_LEVELS (positive zooms in); returns whether the cell size changed"""
+        levels = sorted(ZOOM_LEVELS)
+        if self.CELL_SIZE in levels:
+            index = levels.index(self.CELL_SIZE)
+        else:
+            index = min(range(len(levels)), key=lambda i: abs(levels[i] - self.CELL_SIZE))
+        index = max(0, min(len(levels) - 1, index + step))
+        if levels[index] == self.CELL_SIZE:
+            return False
+        self.set_cell_size(levels[index])
+        dirty_rects.add_all()
+        return True
+
+    def between(self, cell, previous, drawn=None):
+        """Where to draw something stepping from previous to cell this frame, in (fractional) cells.
+
+        drawn is how far along the step to draw it; the player's step_drawn by default.
+        """
+        if drawn is None:
+            drawn = self.step_drawn
+        if previous is None or drawn >= 1:
+            return cell
+        return (previous[0] + (cell[0] - previous[0]) * drawn,
+                previous[1] + (cell[1] - previous[1]) * drawn)
+
+    def camera(self):
+        """World pixel at the window's top-left, following the player as they are drawn"""
+        x, y = self.between((self.player_x, self.player_y), self.step_from)
+        return (round((x - self.VIEWPORT_SIZE // 2) * self.CELL_SIZE),
+                round((y - self.VIEWPORT_SIZE // 2) * self.CELL_SIZE))
+
+    def screen_to_cell(self, pos):
+        """World cell under a screen position, at the current zoom"""
+        camera_x, camera_y = self.camera()
+        return (camera_x + pos[0]) // self.CELL_SIZE, (camera_y + pos[1]) // self.CELL_SIZE
+
+    def set_render_mode(self, mode):
+        """Switch the viewport between "baked" chunk surfaces and "scroll" and patch"""
+        if mode not in ("baked", "scroll"):
+            raise ValueError(f"Unknown render mode: {mode}")
+        self.render_mode = mode
+        self.chunk_surfaces.invalidate()
+        self.scroll_viewport.invalidate()
+
     def draw_sprite_debug(self):
         """Draw the sprite debug view"""
-        # Clear the screen
-        self.screen.fill((255, 255, 255))
+        # The sprite lists don't change while the game runs; build them once
+        if self.sprite_debug_sprites is None:
+            self.sprite_debug_sprites = (sprite_manager.get_available_tiles(),
+                                         sprite_manager.get_available_overlays())
+        base_tiles, overlays = self.sprite_debug_sprites
         
-        # Get available sprites
-        base_tiles = sprite_manager.get_available_tiles()
-        overlays = sprite_manager.get_available_overlays()
+        # Clear the screen
+        render_queue.fill(render_queue.UI, (255, 255, 255), self.screen.get_rect())
         
         # Set up font
         font = pygame.font.Font(None, 24)
@@ -73,13 +250,14 @@ class World:
         # Draw header (fixed position)
         header = font.render("Sprite Debug View", True, (0, 0, 0))
         subheader = font.render("Click a sprite to select it", True, (0, 0, 0))
-        self.screen.blit(header, (10, 10))
-        self.screen.blit(subheader, (10, 35))
+        render_queue.submit(render_queue.TEXT, header, (10, 10))
+        render_queue.submit(render_queue.TEXT, subheader, (10, 35))
         
         # Start position for drawing sprites (adjusted for scroll)
         x = 10
         y = 70 - self.sprite_debug_scroll
         row_height = 40
+        thumb_size = (32, 32)  # Thumbnails fit the 40px grid whatever the sheet's tile size
         
         # Calculate sprites per row based on window width
         sprites_per_row = max(1, (self.window_width - 40) // 40)
@@ -87,7 +265,7 @@ class World:
         # Draw base terrain tiles section
         terrain_label = font.render("Base Terrain:", True, (0, 0, 0))
         if y + 30 > 60 and y < self.window_height:  # Only draw if visible
-            self.screen.blit(terrain_label, (x, y))
+            render_queue.submit(render_queue.TEXT, terrain_label, (x, y))
         y += 30
         
         # Draw terrain tiles
@@ -95,7 +273,8 @@ class World:
         for sprite in base_tiles:
             if y > -40 and y < self.window_height:  # Only draw if in view
                 if sprite.image:
-                    self.screen.blit(sprite.image, (row_x, y))
+                    render_queue.submit(render_queue.UI, scale_cache.get(sprite.image, thumb_size, smooth=True),
+                                        (row_x, y))
             row_x += 40
             if row_x > self.window_width - 40:
                 row_x = x
@@ -109,7 +288,7 @@ class World:
             # Draw category label
             category_label = font.render(f"{category}:", True, (0, 0, 0))
             if y + 30 > 60 and y < self.window_height:  # Only draw if visible
-                self.screen.blit(category_label, (x, y))
+                render_queue.submit(render_queue.TEXT, category_label, (x, y))
             y += 30
             
             # Draw sprites in this category
@@ -117,7 +296,8 @@ class World:
             for sprite in sprites:
                 if y > -40 and y < self.window_height:  # Only draw if in view
                     if sprite.image:
-                        self.screen.blit(sprite.image, (row_x, y))
+                        render_queue.submit(render_queue.UI, scale_cache.get(sprite.image, thumb_size, smooth=True),
+                                            (row_x, y))
                 row_x += 40
                 if row_x > self.window_width - 40:
                     row_x = x
@@ -132,16 +312,16 @@ class World:
         if total_height > self.window_height:
             bar_height = max(40, self.window_height * self.window_height / total_height)
             bar_pos = (self.sprite_debug_scroll / (total_height - self.window_height)) * (self.window_height - bar_height)
-            pygame.draw.rect(self.screen, (200, 200, 200), 
-                           (self.window_width - 20, 60, 20, self.window_height - 80))
-            pygame.draw.rect(self.screen, (100, 100, 100), 
-                           (self.window_width - 18, 60 + bar_pos, 16, bar_height))
+            render_queue.fill(render_queue.UI, (200, 200, 200),
+                              (self.window_width - 20, 60, 20, self.window_height - 80))
+            render_queue.fill(render_queue.UI, (100, 100, 100),
+                              (self.window_width - 18, 60 + bar_pos, 16, bar_height))
         
         # Update the max scroll value
         self.max_scroll = max(0, total_height - self.window_height + 60)
         
-        # Update the display
-        pygame.display.flip()
+        # The whole view only changes when it scrolls
+        dirty_rects.track('sprite_debug', self.screen.get_rect(), self.sprite_debug_scroll)
 
     def handle_sprite_debug_click(self, pos, event):
         """Handle clicks and keyboard events in sprite debug view"""
@@ -208,12 +388,13 @@ class World:
         """Helper method to draw text on the screen with custom font size"""
         font = pygame.font.Font(None, font_size)
         text_surface = font.render(text, True, color)
-        self.screen.blit(text_surface, position)
+        render_queue.submit(render_queue.TEXT, text_surface, position)
+        return text_surface.get_rect(topleft=position)
 
     def generate_world(self):
-        """Generate the initial world state with varied terrain"""
+        """Register the world's tiles and generate the chunks around the player"""
         # Initialize terrain types
-        terrain_types = ["grass", "dirt", "sand", "water"]
+        terrain_types = TERRAIN_TYPES
         overlay_types = {
             "Trees": ["pine", "oak", "dead"],
             "Rocks": ["boulder", "stone", "crystal"],
@@ -223,256 +404,331 @@ class World:
         print("\nGenerating world...")
         print("Loading terrain sprites...")
         
-        # Pre-load terrain sprites to avoid repeated loading
-        terrain_sprites = {}
+        # Register terrain sprites once; cells only store their tile ID
+        self.terrain_ids = {}
         for terrain in terrain_types:
             sprite = sprite_manager.get_base_tile(terrain)
             if sprite:
                 print(f"Loaded terrain sprite: {terrain}")
-                terrain_sprites[terrain] = sprite
+                passable, cost = TILE_PROPERTIES.get(terrain, (True, 1))
+                self.terrain_ids[terrain] = self.tiles.register(terrain, sprite.image, passable, cost)
             else:
                 print(f"Failed to load terrain sprite: {terrain}")
         
-        # Pre-load overlay sprites
-        overlay_sprites = {}
+        # Register overlay sprites
+        self.overlay_ids = {}
         for category, types in overlay_types.items():
-            overlay_sprites[category] = {}
+            self.overlay_ids[category] = {}
             for overlay_type in types:
                 sprite = sprite_manager.get_overlay_sprite(category, overlay_type)
-                if sprite:
+                if sprite and sprite.image:
                     print(f"Loaded overlay sprite: {category}/{overlay_type}")
-                    overlay_sprites[category][overlay_type] = sprite
+                    name = f"{category}/{overlay_type}"
+                    passable, cost = TILE_PROPERTIES.get(name, (True, 1))
+                    self.overlay_ids[category][overlay_type] = self.tiles.register(
+                        name, sprite.image, passable, cost)
         
         print("\nGenerating terrain...")
-        # Generate base terrain with some patterns
-        for y in range(-50, 50):  # 100x100 world
-            for x in range(-50, 50):
-                # Create some terrain patterns
-                distance = ((x/2)**2 + (y/2)**2)**0.5  # Distance from center
-                noise = random.uniform(-2, 2)  # Add some randomness
-                adjusted_distance = distance + noise
-                
-                # Determine terrain type based on distance from center with noise
-                if adjusted_distance < 5:  # Center area
-                    terrain = "grass"
-                    # High chance of trees and bushes in grass areas
-                    if random.random() < 0.2:
-                        self.add_overlay(x, y, overlay_sprites, "Trees", ["pine", "oak"])
-                    elif random.random() < 0.15:
-                        self.add_overlay(x, y, overlay_sprites, "Bushes", ["small", "berry", "flower"])
-                elif adjusted_distance < 10:  # Ring around center
-                    # Transition zone between grass and dirt
-                    terrain = "dirt" if random.random() < 0.7 else "grass"
-                    # Some rocks and dead trees in dirt areas
-                    if random.random() < 0.15:
-                        self.add_overlay(x, y, overlay_sprites, "Rocks", ["boulder", "stone"])
-                    elif random.random() < 0.1:
-                        self.add_overlay(x, y, overlay_sprites, "Trees", ["dead"])
-                elif adjusted_distance < 15:  # Outer ring
-                    # Transition zone between dirt and sand
-                    terrain = "sand" if random.random() < 0.7 else "dirt"
-                    # Few rocks in sand areas
-                    if random.random() < 0.1:
-                        self.add_overlay(x, y, overlay_sprites, "Rocks", ["stone"])
-                elif adjusted_distance < 20:  # Water border
-                    # Transition zone between sand and water
-                    terrain = "water" if random.random() < 0.7 else "sand"
-                else:  # Random terrain for outer areas
-                    weights = [0.4, 0.3, 0.2, 0.1]  # Weights for [grass, dirt, sand, water]
-                    terrain = random.choices(terrain_types, weights=weights)[0]
-                    # Add random overlays based on terrain
-                    if terrain == "grass" and random.random() < 0.15:
-                        self.add_overlay(x, y, overlay_sprites, "Trees", ["pine", "oak"])
-                    elif terrain == "dirt" and random.random() < 0.1:
-                        self.add_overlay(x, y, overlay_sprites, "Rocks", ["boulder", "stone"])
-                
-                # Get the pre-loaded sprite or create a new one
-                base_sprite = terrain_sprites.get(terrain)
-                if base_sprite:
-                    # Create a new sprite instance using the copy method
-                    sprite = base_sprite.copy()
-                    sprite.rect.x = x * self.CELL_SIZE
-                    sprite.rect.y = y * self.CELL_SIZE
-                    self.world_map[(x, y)] = sprite
-                else:
-                    print(f"Warning: Could not create sprite for {terrain} at ({x}, {y})")
+        # Chunks are generated in worker processes ahead of the player; the
+        # local generator is only used for chunks needed before they arrive
+        self.generator = BiomeGenerator(self.seed, self.terrain_ids, self.overlay_ids)
+        if self.chunks.pipeline:
+            self.chunks.pipeline.close()
+        self.chunks.clear()
+        # Scale the tiles for every zoom level now rather than on the first wheel turn
+        for cell_size in ZOOM_LEVELS:
+            self.tiles.zoom_atlas(cell_size)
+        self.chunk_surfaces.invalidate()
+        self.scroll_viewport.invalidate()
+        self.minimap.reset()
+        self.pathfinder.invalidate()
+        self.hpa.invalidate()
+        self.flow_field.invalidate()
+        self.monsters = []
+        self.monster_from = {}
+        self.chunks.pipeline = ChunkPipeline(self.seed, self.terrain_ids, self.overlay_ids)
+        self.chunks.update(self.player_x, self.player_y)
         
         print("World generation complete!")
     
-    def add_overlay(self, x, y, overlay_sprites, category, types):
-        """Add an overlay sprite to the world"""
-        if category in overlay_sprites:
-            overlay_type = random.choice(types)
-            if overlay_type in overlay_sprites[category]:
-                # Get a fresh overlay sprite from sprite manager instead of using cached one
-                sprite = sprite_manager.get_overlay_sprite(category, overlay_type)
-                if sprite and sprite.image:
-                    sprite.rect.x = x * self.CELL_SIZE
-                    sprite.rect.y = y * self.CELL_SIZE
-                    # Store overlay in a separate layer
-                    if not hasattr(self, 'overlay_map'):
-                        self.overlay_map = {}
-                    self.overlay_map[(x, y)] = sprite
+    def generate_chunk(self, cx, cy, size):
+        """Generate one chunk of terrain and overlays.
+
+        The generator derives every cell from the world seed and the cell's
+        coordinates, so a chunk always comes out the same no matter when or in
+        which order it is generated.
+        """
+        terrain, overlay = self.generator.generate(cx * size, cy * size, size, size)
+        return Chunk(cx, cy, terrain, overlay, self.tiles)
+    
+    def add_overlay(self, x, y, category, overlay_type):
+        """Place an overlay on a world cell"""
+        overlay_id = self.overlay_ids.get(category, {}).get(overlay_type)
+        if overlay_id:
+            self.chunks.set_overlay(x, y, overlay_id)
 
     def display_viewport(self):
         """Display the current viewport of the world"""
-        # Clear screen with white background
-        self.screen.fill(WHITE)
-        
-        # Calculate viewport boundaries
-        viewport_start_x = self.player_x - self.VIEWPORT_SIZE // 2
-        viewport_start_y = self.player_y - self.VIEWPORT_SIZE // 2
-        viewport_end_x = viewport_start_x + self.VIEWPORT_SIZE
-        viewport_end_y = viewport_start_y + self.VIEWPORT_SIZE
-        
-        world_size = 50  # Half of our 100x100 world
-        grass_sprite = None  # Cache grass sprite for edge filling
-        
-        # Calculate actual viewport size in pixels
-        viewport_width_pixels = self.window_width
-        viewport_height_pixels = self.window_height
-        
-        # First draw terrain
-        for y in range(viewport_start_y, viewport_end_y + 1):  # +1 to handle partial tiles
-            for x in range(viewport_start_x, viewport_end_x + 1):  # +1 to handle partial tiles
-                screen_x = (x - viewport_start_x) * self.CELL_SIZE
-                screen_y = (y - viewport_start_y) * self.CELL_SIZE
-                
-                # Check if position is outside world bounds
-                if abs(x) > world_size or abs(y) > world_size:
-                    # Get or create grass sprite for edges
-                    if grass_sprite is None:
-                        grass_sprite = sprite_manager.get_base_tile("grass")
-                    if grass_sprite and grass_sprite.image:
-                        # Scale grass sprite if needed
-                        current_size = grass_sprite.image.get_size()
-                        if current_size != (self.CELL_SIZE, self.CELL_SIZE):
-                            scaled_image = pygame.transform.scale(grass_sprite.image, 
-                                                               (self.CELL_SIZE, self.CELL_SIZE))
-                            # Calculate the portion of the tile that should be visible
-                            visible_width = min(self.CELL_SIZE, viewport_width_pixels - screen_x)
-                            visible_height = min(self.CELL_SIZE, viewport_height_pixels - screen_y)
-                            if visible_width > 0 and visible_height > 0:
-                                # Only draw the visible portion of the tile
-                                visible_rect = pygame.Rect(0, 0, visible_width, visible_height)
-                                self.screen.blit(scaled_image, (screen_x, screen_y), visible_rect)
-                        else:
-                            visible_width = min(self.CELL_SIZE, viewport_width_pixels - screen_x)
-                            visible_height = min(self.CELL_SIZE, viewport_height_pixels - screen_y)
-                            if visible_width > 0 and visible_height > 0:
-                                visible_rect = pygame.Rect(0, 0, visible_width, visible_height)
-                                self.screen.blit(grass_sprite.image, (screen_x, screen_y), visible_rect)
-                    continue
-                
-                # Get terrain at this position
-                terrain_sprite = self.world_map.get((x, y))
-                if terrain_sprite is None:
-                    # If no terrain exists at this position, create grass
-                    if grass_sprite is None:
-                        grass_sprite = sprite_manager.get_base_tile("grass")
-                    if grass_sprite:
-                        # Create a new sprite instance using the copy method
-                        terrain_sprite = grass_sprite.copy()
-                        terrain_sprite.rect.x = x * self.CELL_SIZE
-                        terrain_sprite.rect.y = y * self.CELL_SIZE
-                        self.world_map[(x, y)] = terrain_sprite
-                
-                if terrain_sprite and terrain_sprite.image:
-                    # Scale sprite to match cell size if needed
-                    current_size = terrain_sprite.image.get_size()
-                    if current_size != (self.CELL_SIZE, self.CELL_SIZE):
-                        scaled_image = pygame.transform.scale(terrain_sprite.image, 
-                                                           (self.CELL_SIZE, self.CELL_SIZE))
-                        # Calculate the portion of the tile that should be visible
-                        visible_width = min(self.CELL_SIZE, viewport_width_pixels - screen_x)
-                        visible_height = min(self.CELL_SIZE, viewport_height_pixels - screen_y)
-                        if visible_width > 0 and visible_height > 0:
-                            visible_rect = pygame.Rect(0, 0, visible_width, visible_height)
-                            self.screen.blit(scaled_image, (screen_x, screen_y), visible_rect)
-                    else:
-                        visible_width = min(self.CELL_SIZE, viewport_width_pixels - screen_x)
-                        visible_height = min(self.CELL_SIZE, viewport_height_pixels - screen_y)
-                        if visible_width > 0 and visible_height > 0:
-                            visible_rect = pygame.Rect(0, 0, visible_width, visible_height)
-                            self.screen.blit(terrain_sprite.image, (screen_x, screen_y), visible_rect)
-        
-        # Then draw overlays
-        if hasattr(self, 'overlay_map'):
-            for y in range(viewport_start_y, viewport_end_y + 1):  # +1 to handle partial tiles
-                for x in range(viewport_start_x, viewport_end_x + 1):  # +1 to handle partial tiles
-                    # Skip if outside world bounds
-                    if abs(x) > world_size or abs(y) > world_size:
-                        continue
-                        
-                    screen_x = (x - viewport_start_x) * self.CELL_SIZE
-                    screen_y = (y - viewport_start_y) * self.CELL_SIZE
-                    
-                    # Get overlay at this position
-                    overlay_sprite = self.overlay_map.get((x, y))
-                    if overlay_sprite and overlay_sprite.image:
-                        # Scale overlay to match cell size if needed
-                        current_size = overlay_sprite.image.get_size()
-                        if current_size != (self.CELL_SIZE, self.CELL_SIZE):
-                            scaled_image = pygame.transform.scale(overlay_sprite.image, 
-                                                               (self.CELL_SIZE, self.CELL_SIZE))
-                            # Calculate the portion of the tile that should be visible
-                            visible_width = min(self.CELL_SIZE, viewport_width_pixels - screen_x)
-                            visible_height = min(self.CELL_SIZE, viewport_height_pixels - screen_y)
-                            if visible_width > 0 and visible_height > 0:
-                                visible_rect = pygame.Rect(0, 0, visible_width, visible_height)
-                                self.screen.blit(scaled_image, (screen_x, screen_y), visible_rect)
-                        else:
-                            visible_width = min(self.CELL_SIZE, viewport_width_pixels - screen_x)
-                            visible_height = min(self.CELL_SIZE, viewport_height_pixels - screen_y)
-                            if visible_width > 0 and visible_height > 0:
-                                visible_rect = pygame.Rect(0, 0, visible_width, visible_height)
-                                self.screen.blit(overlay_sprite.image, (screen_x, screen_y), visible_rect)
+        # Pick up any chunks the workers have finished
+        self.chunks.poll()
+        
+        # Calculate viewport boundaries; mid-step the camera sits between two cells
+        camera_x, camera_y = self.camera()
+        viewport_start_x = camera_x // self.CELL_SIZE
+        viewport_start_y = camera_y // self.CELL_SIZE
+        offset_x = camera_x - viewport_start_x * self.CELL_SIZE
+        offset_y = camera_y - viewport_start_y * self.CELL_SIZE
+        
+        window_size = self.screen.get_size()
+        if self.texture_renderer:
+            # The renderer copies the tiles from its atlas textures; the UI layer starts empty
+            self.screen.fill((0, 0, 0, 0))
+            self.texture_renderer.set_view(self.tiles, self.chunks, viewport_start_x, viewport_start_y, self.CELL_SIZE,
+                                           (offset_x, offset_y))
+        elif self.render_mode == "scroll":
+            # Shift last frame's world layer by the player's step and patch the edges; the
+            # buffer is a cell bigger than the window so it can be drawn part way through a step
+            buffer = self.scroll_viewport.update(self.chunks, viewport_start_x, viewport_start_y,
+                                                 (window_size[0] + self.CELL_SIZE, window_size[1] + self.CELL_SIZE),
+                                                 self.CELL_SIZE)
+            render_queue.submit(render_queue.WORLD, buffer, (-offset_x, -offset_y))
+        else:
+            # Blit the baked surfaces of the (usually 1-4) chunks under the window
+            for surface, position in self.chunk_surfaces.layout(self.chunks, camera_x, camera_y,
+                                                                window_size, self.CELL_SIZE):
+                render_queue.submit(render_queue.WORLD, surface, position)
         
         # Draw player at center
         player_screen_x = (self.VIEWPORT_SIZE // 2) * self.CELL_SIZE
         player_screen_y = (self.VIEWPORT_SIZE // 2) * self.CELL_SIZE
-        pygame.draw.rect(self.screen, self.player.color, 
-                        (player_screen_x, player_screen_y, self.CELL_SIZE, self.CELL_SIZE))
-        
-        # Update the display
-        pygame.display.flip()
+        render_queue.fill(render_queue.ENTITIES, self.player.color,
+                          (player_screen_x, player_screen_y, self.CELL_SIZE, self.CELL_SIZE))
+        
+        # Draw the monsters in view, partway through their step
+        inset = self.CELL_SIZE // 4
+        for monster in self.monsters:
+            x, y = self.between(monster, self.monster_from.get(monster), self.monster_drawn)
+            render_queue.fill(render_queue.ENTITIES, RED,
+                              (round(x * self.CELL_SIZE) - camera_x + inset, round(y * self.CELL_SIZE) - camera_y + inset,
+                               self.CELL_SIZE - 2 * inset, self.CELL_SIZE - 2 * inset))
+        
+        # Mark the path a click would take
+        dot = max(2, self.CELL_SIZE // 5)
+        for x, y in self.preview_path:
+            render_queue.fill(render_queue.ENTITIES, YELLOW,
+                              (x * self.CELL_SIZE - camera_x + (self.CELL_SIZE - dot) // 2,
+                               y * self.CELL_SIZE - camera_y + (self.CELL_SIZE - dot) // 2, dot, dot))
+        
+        # Only push the world to the display when what it shows has changed
+        cols = -(-self.window_width // self.CELL_SIZE) + 1
+        rows = -(-self.window_height // self.CELL_SIZE) + 1
+        dirty_rects.track('world', self.screen.get_rect(),
+                          (camera_x, camera_y, self.CELL_SIZE, self.render_mode, self.player.color,
+                           self.chunks.versions_in(viewport_start_x, viewport_start_y, cols, rows),
+                           tuple(self.preview_path), tuple(self.monsters), self.step_drawn, self.monster_drawn))
+
+    def preview_region(self):
+        """Cells the hover preview may route through: the view plus a margin"""
+        cols = -(-self.window_width // self.CELL_SIZE)
+        rows = -(-self.window_height // self.CELL_SIZE)
+        return (self.player_x - self.VIEWPORT_SIZE // 2 - PATH_SEARCH_MARGIN,
+                self.player_y - self.VIEWPORT_SIZE // 2 - PATH_SEARCH_MARGIN,
+                cols + 2 * PATH_SEARCH_MARGIN, rows + 2 * PATH_SEARCH_MARGIN)
+
+    def update_preview(self, target):
+        """Plan the path preview to the cell under the mouse (None hides it)"""
+        if target is None:
+            self.preview_path = []
+        else:
+            self.preview_path = self.planner.plan((self.player_x, self.player_y), target, self.preview_region())
 
     def get_path_to(self, target_x, target_y):
-        """Get a path to the target position"""
-        # For now, just return a direct path
-        path = []
-        current_x = self.player_x
-        current_y = self.player_y
-        
-        while current_x != target_x or current_y != target_y:
-            if current_x < target_x:
-                current_x += 1
-            elif current_x > target_x:
-                current_x -= 1
-            
-            if current_y < target_y:
-                current_y += 1
-            elif current_y > target_y:
-                current_y -= 1
-            
-            path.append((current_x, current_y))
-        
-        return path
+        """Get the path from the player towards the target, or [] if it can't be reached.
+
+        Targets the hover preview can reach are planned by the same search
+        over the same region, so a click walks the path the preview showed.
+        Anything else goes to the HPA* finder: nearby targets get the whole
+        cheapest path, far ones only the first stretch; call again from where
+        it ends until the player arrives.
+        """
+        start = (self.player_x, self.player_y)
+        path = self.planner.plan(start, (target_x, target_y), self.preview_region())
+        if path:
+            return path
+        return self.hpa.find_path(start, (target_x, target_y))
+
+    def spawn_monster(self):
+        """Place a monster on a random cell the player can be reached from, or return None"""
+        near, far = MONSTER_SPAWN_RANGE
+        for _ in range(20):
+            x = self.player_x + random.randint(-far, far)
+            y = self.player_y + random.randint(-far, far)
+            if max(abs(x - self.player_x), abs(y - self.player_y)) < near or (x, y) in self.monsters:
+                continue
+            if self.flow_field.cost_at(x, y) < float('inf'):
+                return (x, y)
+        return None
+
+    def update_monsters(self):
+        """Step every monster towards the player and return True if one catches them.
+
+        All monsters read their step from the one flow field, so each extra
+        monster only costs a look at its neighbours. The field follows the
+        player in move_player(); it only starts here (or after a jump).
+        """
+        if self.flow_field.source != (self.player_x, self.player_y):
+            self.flow_field.update(self.player_x, self.player_y)
+        caught = False
+        occupied = set(self.monsters)
+        monsters = []
+        self.monster_from = {}
+        for monster in self.monsters:
+            step = self.flow_field.next_step(*monster)
+            if step is None:
+                continue  # Left behind outside the field
+            if step == (self.player_x, self.player_y):
+                caught = True
+                occupied.discard(monster)
+                continue
+            if step not in occupied:
+                occupied.discard(monster)
+                occupied.add(step)
+                self.monster_from[step] = monster
+                monster = step
+            monsters.append(monster)
+        self.monsters = monsters
+        
+        # Keep the numbers up
+        while len(self.monsters) < MONSTER_COUNT:
+            monster = self.spawn_monster()
+            if monster is None:
+                break
+            self.monsters.append(monster)
+        return caught
+
+    def advance_monsters(self, elapsed):
+        """Move the monsters on by elapsed seconds and return True if one catches the player.
+
+        They step together every 1 / monster_speed seconds, on their own
+        clock, so they close in whether or not the player is walking. The
+        rest of an update carries into the next step.
+        """
+        progress = self.monster_progress + elapsed * self.monster_speed
+        if progress < 1:
+            self.monster_progress = progress
+            return False
+        caught = self.update_monsters()
+        self.monster_progress = min(progress - 1, 0.99)
+        return caught
+
+    def interpolate_monsters(self, seconds):
+        """Draw the monsters' step seconds further along than the last update left it"""
+        self.monster_drawn = min(1.0, self.monster_progress + seconds * self.monster_speed)
+
+    def monsters_active(self):
+        """Whether the monster clock has to keep running: more monsters are due, or one can reach the player"""
+        if len(self.monsters) < MONSTER_COUNT:
+            return True
+        return any(math.isfinite(self.flow_field.cost_at(*monster)) for monster in self.monsters)
+
+    def is_passable(self, x, y):
+        """Whether the player can stand on a world cell"""
+        return self.chunks.is_passable(x, y)
+
+    def get_neighbours(self, x, y):
+        """Get the passable cells around (x, y) as [((nx, ny), cost)]"""
+        passable = self.chunks.get_region('passable', x - 1, y - 1, 3, 3)
+        cost = self.chunks.get_region('cost', x - 1, y - 1, 3, 3)
+        return [((x + dx, y + dy), int(cost[dy + 1, dx + 1]))
+                for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+                if (dx or dy) and passable[dy + 1, dx + 1]]
+
+    def prefetch_ahead(self, x, y, step_x, step_y):
+        """Queue chunks beyond the resident area in the direction of travel"""
+        step_x = (step_x > 0) - (step_x < 0)
+        step_y = (step_y > 0) - (step_y < 0)
+        reach = (self.chunks.resident_radius + CHUNK_PREFETCH_AHEAD) * self.chunks.size
+        self.chunks.prefetch(x + step_x * reach, y + step_y * reach, 1)
+
+    def prefetch_path(self, path):
+        """Queue the chunks along a path (from get_path_to) and past its end"""
+        if not path:
+            return
+        # Sample the path about twice per chunk
+        stride = max(1, self.chunks.size // 2)
+        for x, y in [*path[::stride], path[-1]]:
+            self.chunks.prefetch(x, y, self.chunks.resident_radius)
+        
+        # Keep looking ahead in the direction the path ends in
+        last_x, last_y = path[-1]
+        prev_x, prev_y = path[-2] if len(path) > 1 else (self.player_x, self.player_y)
+        self.prefetch_ahead(last_x, last_y, last_x - prev_x, last_y - prev_y)
+
+    def has_pending_work(self):
+        """Whether chunks are still being generated in the background"""
+        return bool(self.chunks.pipeline and self.chunks.pipeline.pending)
+
+    def close(self):
+        """Stop the chunk workers and close the texture renderer's window"""
+        if self.chunks.pipeline:
+            self.chunks.pipeline.close()
+        if self.texture_renderer:
+            self.texture_renderer.close()
+            self.texture_renderer = None
 
     def move_player(self, new_x, new_y):
         """Move the player to a new position and return True if there's an encounter"""
+        step_x = new_x - self.player_x
+        step_y = new_y - self.player_y
         self.player_x = new_x
         self.player_y = new_y
+        self.preview_path = []
+        
+        # Keep the chunks around the player loaded and let far ones go
+        self.chunks.update(new_x, new_y)
+        
+        # Queue the chunks the player is heading into
+        if step_x or step_y:
+            self.prefetch_ahead(new_x, new_y, step_x, step_y)
         
-        # Random encounter chance (20%)
+        # The monsters' map follows the player one step at a time
+        self.flow_field.update(new_x, new_y)
+        
+        # Walking into a monster, or a random encounter (20%)
+        if (new_x, new_y) in self.monsters:
+            self.monsters.remove((new_x, new_y))
+            return True
         return random.random() < 0.2 
 
+    def nearest_passable(self, x, y):
+        """The passable cell nearest to (x, y), searching out a chunk's width at most"""
+        for radius in range(self.chunks.size + 1):
+            ring = [(x + dx, y + dy) for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)
+                    if max(abs(dx), abs(dy)) == radius]
+            ring.sort(key=lambda cell: (cell[0] - x) ** 2 + (cell[1] - y) ** 2)
+            for cell in ring:
+                if self.is_passable(*cell):
+                    return cell
+        return (x, y)
+
+    def place_player(self, x, y):
+        """Put the player at (x, y), or the nearest cell they can stand on, without a step or an encounter"""
+        x, y = self.nearest_passable(x, y)
+        self.player_x = x
+        self.player_y = y
+        self.step_from = None
+        self.preview_path = []
+        self.chunks.update(x, y)
+        self.flow_field.update(x, y)
+        dirty_rects.add_all()
+
     def _calculate_max_scroll(self):
         """Calculate the maximum scroll distance based on content height"""
         # Initialize sprite cache if not already done
         if not self._sprite_cache_initialized:
             self._sprite_cache_initialized = True
-            self._cached_tiles = sprite_manager.get_available_tiles()
+            # Names are enough for layout - don't decode every tile just to count them
+            self._cached_tiles = ['grass', 'dirt', 'sand', 'water', *sprite_manager.get_map_tile_names()]
             self._cached_overlays = {}
         
         # Calculate dimensions
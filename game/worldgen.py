@@ -0,0 +1,212 @@
+import numpy as np
+
+TERRAIN_TYPES = ["grass", "dirt", "sand", "water"]
+OUTER_WEIGHTS = [0.4, 0.3, 0.2, 0.1]  # Weights for [grass, dirt, sand, water] past the rings
+RING_EDGES = [5, 10, 15, 20]  # Grass centre, dirt ring, sand ring, water border, then random
+
+BAND_CELLS = 1 << 16  # Cells generated per vectorised pass
+
+# Streams of per-cell random numbers, one per decision made for a cell
+NOISE, TERRAIN, FIRST_OVERLAY, SECOND_OVERLAY, PICK, ELEVATION, MOISTURE, FOREST = range(8)
+
+def _mix(h):
+    """SplitMix64 finaliser over a uint64 array"""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+class TerrainGenerator:
+    """Vectorised terrain and overlay generation for rectangular regions.
+
+    Every random decision for a cell comes from a hash of the seed, the cell's
+    world coordinates and a stream number rather than from a sequential RNG,
+    so a cell always gets the same terrain whether it is generated alone, as
+    part of a chunk or as part of a 4000x4000 block.
+    """
+    def __init__(self, seed, terrain_ids, overlay_ids):
+        self.seed = seed
+        # Terrain index (into TERRAIN_TYPES) -> tile ID, 0 where the sprite is missing
+        self.terrain_lut = np.array([terrain_ids.get(name, 0) for name in TERRAIN_TYPES], dtype=np.uint8)
+        self.overlay_ids = overlay_ids  # category -> type -> tile ID
+        self._seed_hash = int(_mix(np.array([seed], dtype=np.uint64))[0])
+
+    def hash(self, xs, ys, stream):
+        """uint64 hash grid of shape (len(ys), len(xs)) for one stream"""
+        key = np.uint64((self._seed_hash + stream * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+        hx = _mix(xs.astype(np.uint64) ^ key)
+        hy = _mix(ys.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F))
+        return _mix(hx[np.newaxis, :] ^ hy[:, np.newaxis])
+
+    def random(self, xs, ys, stream):
+        """Uniform [0, 1) float32 grid of shape (len(ys), len(xs)) for one stream"""
+        # Top 24 bits are exactly representable in a float32
+        h = self.hash(xs, ys, stream)
+        return (h >> np.uint64(40)).astype(np.float32) * np.float32(1.0 / (1 << 24))
+
+    def generate(self, x0, y0, width, height):
+        """Generate a region and return (terrain IDs, overlay IDs) as uint8 arrays of shape (height, width)"""
+        xs = np.arange(x0, x0 + width, dtype=np.int64)
+        terrain = np.empty((height, width), dtype=np.uint8)
+        overlay = np.empty((height, width), dtype=np.uint8)
+        # Work in bands of rows so the temporaries stay small for huge regions
+        band = max(1, BAND_CELLS // max(width, 1))
+        for row in range(0, height, band):
+            rows = min(band, height - row)
+            ys = np.arange(y0 + row, y0 + row + rows, dtype=np.int64)
+            terrain[row:row + rows], overlay[row:row + rows] = self._generate_band(xs, ys)
+        return terrain, overlay
+
+    def _generate_band(self, xs, ys):
+        """Generate the cells at xs x ys"""
+        # Distance from the centre plus some noise decides which ring a cell is in
+        half_x = (xs / 2).astype(np.float32)
+        half_y = (ys / 2).astype(np.float32)
+        distance = np.sqrt(half_x[np.newaxis, :] ** 2 + half_y[:, np.newaxis] ** 2)
+        distance += self.random(xs, ys, NOISE) * 4 - 2
+        zone = np.digitize(distance, RING_EDGES).astype(np.int8)
+        del distance
+
+        # Rings 1-3 are 70/30 transitions between their terrain and the previous one;
+        # the centre is always grass and the outer area is a weighted pick
+        roll = self.random(xs, ys, TERRAIN)
+        terrain = np.where(roll < 0.7, zone, zone - 1)
+        np.maximum(terrain, 0, out=terrain)
+        outer = zone == len(RING_EDGES)
+        weighted = np.digitize(roll[outer], np.cumsum(OUTER_WEIGHTS)[:-1]).astype(np.int8)
+        terrain[outer] = weighted
+        del roll
+
+        first = self.random(xs, ys, FIRST_OVERLAY)
+        second = self.random(xs, ys, SECOND_OVERLAY)
+        pick = self.random(xs, ys, PICK)
+        overlay = np.zeros((len(ys), len(xs)), dtype=np.uint8)
+
+        centre = zone == 0
+        self._place(overlay, centre & (first < 0.2), pick, "Trees", ["pine", "oak"])
+        self._place(overlay, centre & (first >= 0.2) & (second < 0.15), pick, "Bushes", ["small", "berry", "flower"])
+
+        dirt_ring = zone == 1
+        self._place(overlay, dirt_ring & (first < 0.15), pick, "Rocks", ["boulder", "stone"])
+        self._place(overlay, dirt_ring & (first >= 0.15) & (second < 0.1), pick, "Trees", ["dead"])
+
+        self._place(overlay, (zone == 2) & (first < 0.1), pick, "Rocks", ["stone"])
+
+        self._place(overlay, outer & (terrain == 0) & (first < 0.15), pick, "Trees", ["pine", "oak"])
+        self._place(overlay, outer & (terrain == 1) & (first < 0.1), pick, "Rocks", ["boulder", "stone"])
+
+        return self.terrain_lut[terrain], overlay
+
+    def _place(self, overlay, mask, pick, category, types):
+        """Put a random overlay of one category on every cell in mask"""
+        ids = np.array([self.overlay_ids.get(category, {}).get(name, 0) for name in types], dtype=np.uint8)
+        index = (pick[mask] * len(ids)).astype(np.intp)
+        overlay[mask] = ids[np.minimum(index, len(ids) - 1)]
+
+
+class BiomeGenerator(TerrainGenerator):
+    """Coherent biomes from seeded gradient noise.
+
+    Elevation and moisture are fractal gradient (Perlin-style) noise whose
+    lattice gradients come from the same coordinate hash as everything else,
+    so any region can be generated on its own and still line up with its
+    neighbours. Low ground is water with sandy shores, higher ground is grass
+    or dirt depending on moisture, and a third noise field makes forests
+    denser in some places than others. The area around the origin is raised
+    so the player always starts on land.
+    """
+    ELEVATION_SCALE = 48  # Cells per noise lattice step for the first octave
+    MOISTURE_SCALE = 64
+    FOREST_SCALE = 20
+    WATER_LEVEL = -0.12
+    SHORE_LEVEL = -0.05
+    HIGHLAND_LEVEL = 0.3
+    DRY_LEVEL = -0.05
+    SPAWN_RADIUS = 16  # Cells around the origin lifted above water
+
+    def gradient_noise(self, xs, ys, scale, stream):
+        """One octave of 2D gradient noise in roughly [-0.7, 0.7]"""
+        fx = xs / scale
+        fy = ys / scale
+        ix = np.floor(fx).astype(np.int64)
+        iy = np.floor(fy).astype(np.int64)
+        tx = (fx - ix).astype(np.float32)
+        ty = (fy - iy).astype(np.float32)
+
+        # Random unit gradients on just the lattice points this region touches
+        lattice_x = np.arange(ix[0], ix[-1] + 2, dtype=np.int64)
+        lattice_y = np.arange(iy[0], iy[-1] + 2, dtype=np.int64)
+        angle = self.random(lattice_x, lattice_y, stream) * np.float32(2 * np.pi)
+        grad_x = np.cos(angle)
+        grad_y = np.sin(angle)
+
+        col = (ix - ix[0])[np.newaxis, :]
+        row = (iy - iy[0])[:, np.newaxis]
+        tx = tx[np.newaxis, :]
+        ty = ty[:, np.newaxis]
+
+        def corner(dx, dy):
+            return grad_x[row + dy, col + dx] * (tx - dx) + grad_y[row + dy, col + dx] * (ty - dy)
+
+        # Quintic fade between the four corners
+        u = tx * tx * tx * (tx * (tx * 6 - 15) + 10)
+        v = ty * ty * ty * (ty * (ty * 6 - 15) + 10)
+        top = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+        bottom = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+        return top + v * (bottom - top)
+
+    def fractal_noise(self, xs, ys, scale, octaves, stream):
+        """Sum octaves of gradient noise, halving scale and amplitude each time"""
+        total = np.zeros((len(ys), len(xs)), dtype=np.float32)
+        amplitude = 1.0
+        norm = 0.0
+        for octave in range(octaves):
+            total += self.gradient_noise(xs, ys, scale, stream * 16 + octave) * amplitude
+            norm += amplitude
+            scale /= 2
+            amplitude /= 2
+        return total / norm
+
+    def _generate_band(self, xs, ys):
+        """Generate the cells at xs x ys"""
+        elevation = self.fractal_noise(xs, ys, self.ELEVATION_SCALE, 4, ELEVATION)
+        cell_x = xs.astype(np.float32)
+        cell_y = ys.astype(np.float32)
+        spawn = np.sqrt(cell_x[np.newaxis, :] ** 2 + cell_y[:, np.newaxis] ** 2)
+        elevation += np.clip(1 - spawn / self.SPAWN_RADIUS, 0, 1) * 0.5
+        del spawn
+
+        moisture = self.fractal_noise(xs, ys, self.MOISTURE_SCALE, 3, MOISTURE)
+
+        # Terrain indices into TERRAIN_TYPES: 0 grass, 1 dirt, 2 sand, 3 water
+        terrain = np.where(moisture < self.DRY_LEVEL, 1, 0).astype(np.int8)
+        terrain[elevation < self.SHORE_LEVEL] = 2
+        terrain[elevation < self.WATER_LEVEL] = 3
+        del moisture
+
+        first = self.random(xs, ys, FIRST_OVERLAY)
+        second = self.random(xs, ys, SECOND_OVERLAY)
+        pick = self.random(xs, ys, PICK)
+        overlay = np.zeros((len(ys), len(xs)), dtype=np.uint8)
+
+        # Forest density varies smoothly, from clearings to thick woods
+        forest = self.fractal_noise(xs, ys, self.FOREST_SCALE, 2, FOREST)
+        tree_chance = np.clip(0.08 + forest * 0.8, 0.0, 0.5)
+        del forest
+
+        grass = terrain == 0
+        dirt = terrain == 1
+        highland = elevation > self.HIGHLAND_LEVEL
+        trees = grass & (first < tree_chance)
+        self._place(overlay, trees, pick, "Trees", ["pine", "oak"])
+        self._place(overlay, grass & ~trees & (second < 0.06), pick, "Bushes", ["small", "berry", "flower"])
+
+        rocks = dirt & (first < np.where(highland, 0.3, 0.1))
+        self._place(overlay, rocks & ~highland, pick, "Rocks", ["boulder", "stone"])
+        self._place(overlay, rocks & highland, pick, "Rocks", ["boulder", "crystal"])
+        self._place(overlay, dirt & ~rocks & (second < 0.04), pick, "Trees", ["dead"])
+
+        self._place(overlay, (terrain == 2) & (first < 0.04), pick, "Rocks", ["stone"])
+
+        return self.terrain_lut[terrain], overlay
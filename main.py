@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Main entry point for the Simple RPG game."""
 
+import argparse
 import os
 import sys
 
@@ -11,7 +12,11 @@ from game.game import Game
 
 def main():
     """Run the game."""
-    game = Game()
+    parser = argparse.ArgumentParser(description="Simple RPG")
+    parser.add_argument("--backend", choices=["surface", "sdl2"], default=None,
+                        help="draw with Surface blits or SDL2 textures (default: RENDER_BACKEND)")
+    args = parser.parse_args()
+    game = Game(args.backend) if args.backend else Game()
     game.run()
 
 if __name__ == "__main__":
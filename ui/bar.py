@@ -1,5 +1,7 @@
 import pygame
 from utils.constants import WHITE, BLACK, RED, GREEN, BLUE, YELLOW, PURPLE
+from ui.dirty_rects import dirty_rects
+from ui.render_queue import render_queue
 
 class Bar:
     """A UI component for drawing various types of bars (health, mana, xp, etc.)"""
@@ -18,7 +20,7 @@ class Bar:
     def draw_health_bar(self, screen, character, x, y):
         """Draw a health bar for a character"""
         # Draw border
-        pygame.draw.rect(screen, self.border_color, (x, y, self.bar_width, self.bar_height), self.border_width)
+        render_queue.frame(render_queue.UI, self.border_color, (x, y, self.bar_width, self.bar_height), self.border_width)
         
         # Calculate health percentage
         health_percent = character.health / character.max_health
@@ -26,16 +28,17 @@ class Bar:
         # Draw health bar with color based on health percentage
         health_width = int(self.bar_width * health_percent)
         health_color = GREEN if health_percent > 0.5 else YELLOW if health_percent > 0.2 else RED
-        pygame.draw.rect(screen, health_color, 
-                        (x + self.border_width, y + self.border_width, 
-                         health_width - self.border_width * 2, 
-                         self.bar_height - self.border_width * 2))
+        render_queue.fill(render_queue.UI, health_color,
+                          (x + self.border_width, y + self.border_width, 
+                           health_width - self.border_width * 2, 
+                           self.bar_height - self.border_width * 2))
         
         # Draw health text with character name
         health_text = f"{character.name} - HP: {character.health}/{character.max_health}"
         text = self.font.render(health_text, True, self.text_color)
         text_rect = text.get_rect(center=(x + self.bar_width/2, y + self.bar_height/2))
-        screen.blit(text, text_rect)
+        render_queue.submit(render_queue.TEXT, text, text_rect.topleft)
+        dirty_rects.track(('health_bar', x, y), text_rect.union((x, y, self.bar_width, self.bar_height)), health_text)
     
     def draw_xp_bar(self, surface, character, x, y):
         """Draw an XP bar with level label"""
@@ -49,14 +52,14 @@ class Bar:
         
         # Draw background
         xp_color = PURPLE
-        pygame.draw.rect(surface, xp_color, (x, y, width, height))
+        render_queue.fill(render_queue.UI, xp_color, (x, y, width, height))
         
         # Draw filled portion
         if fill_width > 0:
-            pygame.draw.rect(surface, (0, 0, 255), (x, y, fill_width, height))
+            render_queue.fill(render_queue.UI, (0, 0, 255), (x, y, fill_width, height))
         
         # Draw border
-        pygame.draw.rect(surface, (255, 255, 255), (x, y, width, height), 1)
+        render_queue.frame(render_queue.UI, (255, 255, 255), (x, y, width, height))
         
         # Draw level label inside bar
         font = pygame.font.Font(None, 24)
@@ -64,32 +67,34 @@ class Bar:
         text_surface = font.render(level_text, True, (255, 255, 255))
         text_rect = text_surface.get_rect()
         text_rect.midleft = (x + 5, y + height // 2)  # Position text 5 pixels from left edge
-        surface.blit(text_surface, text_rect)
+        render_queue.submit(render_queue.TEXT, text_surface, text_rect.topleft)
         
         # Draw XP text
         xp_text = f"{character.exp}/{character.exp_to_next_level} XP"
         text_surface = font.render(xp_text, True, (255, 255, 255))
         text_rect = text_surface.get_rect()
         text_rect.midright = (x + width - 5, y + height // 2)  # Position text 5 pixels from right edge
-        surface.blit(text_surface, text_rect)
+        render_queue.submit(render_queue.TEXT, text_surface, text_rect.topleft)
+        dirty_rects.track(('xp_bar', x, y), (x, y, width, height), (level_text, xp_text))
     
     def draw_mp_bar(self, screen, character, x, y):
         """Draw a mana points bar for a character"""
         # Draw border
-        pygame.draw.rect(screen, self.border_color, (x, y, self.bar_width, self.bar_height), self.border_width)
+        render_queue.frame(render_queue.UI, self.border_color, (x, y, self.bar_width, self.bar_height), self.border_width)
         
         # Calculate MP percentage
         mp_percent = character.mp / character.max_mp if character.max_mp > 0 else 0
         
         # Draw MP bar
         mp_width = int(self.bar_width * mp_percent)
-        pygame.draw.rect(screen, self.mp_color, 
-                        (x + self.border_width, y + self.border_width, 
-                         mp_width - self.border_width * 2, 
-                         self.bar_height - self.border_width * 2))
+        render_queue.fill(render_queue.UI, self.mp_color,
+                          (x + self.border_width, y + self.border_width, 
+                           mp_width - self.border_width * 2, 
+                           self.bar_height - self.border_width * 2))
         
         # Draw MP text
         mp_text = f"MP: {character.mp}/{character.max_mp}"
         text = self.font.render(mp_text, True, self.text_color)
         text_rect = text.get_rect(center=(x + self.bar_width/2, y + self.bar_height/2))
-        screen.blit(text, text_rect) 
\ No newline at end of file
+        render_queue.submit(render_queue.TEXT, text, text_rect.topleft)
+        dirty_rects.track(('mp_bar', x, y), text_rect.union((x, y, self.bar_width, self.bar_height)), mp_text) 
\ No newline at end of file
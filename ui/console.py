@@ -1,5 +1,7 @@
 import pygame
 from utils.constants import FONT_SIZE, BLACK, WHITE
+from ui.dirty_rects import dirty_rects
+from ui.render_queue import render_queue
 
 class MessageConsole:
     def __init__(self, max_messages=6):
@@ -41,15 +43,13 @@ class MessageConsole:
         return lines
     
     def toggle_collapse(self, mouse_pos, console_rect):
-        """Check if the collapse button was clicked and toggle if it was"""
+        """Check if the collapse button was clicked and toggle if it was.
+
+        console_rect is the rect the last draw() returned.
+        """
         if self.is_collapsed:
-            # When collapsed, only check the button area
-            button_rect = pygame.Rect(
-                console_rect.right - self.button_size - 5,
-                console_rect.top + 5,
-                self.button_size,
-                self.button_size
-            )
+            # When collapsed, only the button was drawn
+            button_rect = console_rect
         else:
             # When expanded, check the entire console area
             button_rect = pygame.Rect(
@@ -65,6 +65,7 @@ class MessageConsole:
         return False
     
     def draw(self, screen, x, y, width, height):
+        """Queue the console for drawing and return the rect it covers"""
         if self.is_collapsed:
             # When collapsed, only draw the button
             button_rect = pygame.Rect(
@@ -73,19 +74,20 @@ class MessageConsole:
                 self.button_size,
                 self.button_size
             )
-            pygame.draw.rect(screen, (0, 0, 0), button_rect)
-            pygame.draw.rect(screen, WHITE, button_rect, 1)
+            render_queue.fill(render_queue.UI, (0, 0, 0), button_rect)
+            render_queue.frame(render_queue.UI, WHITE, button_rect)
             
             # Draw button text
             button_text = "+"
             text_surface = self.font.render(button_text, True, WHITE)
             text_rect = text_surface.get_rect(center=button_rect.center)
-            screen.blit(text_surface, text_rect)
+            render_queue.submit(render_queue.TEXT, text_surface, text_rect.topleft)
+            drawn_rect = button_rect
         else:
             # Create console background
             console_rect = pygame.Rect(x, y, width, height)
-            pygame.draw.rect(screen, (0, 0, 0), console_rect)
-            pygame.draw.rect(screen, WHITE, console_rect, 1)
+            render_queue.fill(render_queue.UI, (0, 0, 0), console_rect)
+            render_queue.frame(render_queue.UI, WHITE, console_rect)
             
             # Draw collapse button
             button_rect = pygame.Rect(
@@ -94,14 +96,14 @@ class MessageConsole:
                 self.button_size,
                 self.button_size
             )
-            pygame.draw.rect(screen, WHITE, button_rect)
-            pygame.draw.rect(screen, BLACK, button_rect, 1)
+            render_queue.fill(render_queue.UI, WHITE, button_rect)
+            render_queue.frame(render_queue.UI, BLACK, button_rect)
             
             # Draw button text
             button_text = "−"
             text_surface = self.font.render(button_text, True, BLACK)
             text_rect = text_surface.get_rect(center=button_rect.center)
-            screen.blit(text_surface, text_rect)
+            render_queue.submit(render_queue.TEXT, text_surface, text_rect.topleft)
             
             # Draw messages with word wrapping
             padding = 10
@@ -117,8 +119,13 @@ class MessageConsole:
                     if y_offset + self.line_spacing > height - padding:  # Stop if we've reached the bottom
                         break
                     text_surface = self.font.render(line, True, WHITE)
-                    screen.blit(text_surface, (x + padding, y + y_offset))
+                    render_queue.submit(render_queue.TEXT, text_surface, (x + padding, y + y_offset))
                     y_offset += self.line_spacing
                 
                 # Add a small gap between messages
-                y_offset += 2 
\ No newline at end of file
+                y_offset += 2
+            drawn_rect = console_rect
+        
+        # Report the console region when its contents or placement changed
+        dirty_rects.track(self, drawn_rect, (tuple(self.messages), self.is_collapsed))
+        return drawn_rect 
\ No newline at end of file
@@ -0,0 +1,101 @@
+import pygame
+
+class DirtyRectTracker:
+    """Collect the screen regions that changed this frame and push them in one update.
+
+    Anything that draws to the screen reports what it changed: add() for a
+    region that is known to be new, add_all() for a full-screen change, or
+    track() to let the tracker compare a widget's rect and content signature
+    with the previous frame's and only mark it when either differs (the old
+    rect is marked too, so whatever the widget covered gets uncovered).
+    flush() then calls pygame.display.update() once with the collected rects,
+    or once for the whole window when most of it changed anyway.
+    """
+    FULL_THRESHOLD = 0.5  # Fraction of the window above which one full update is cheaper
+
+    def __init__(self):
+        self.rects = []
+        self.full = True  # Nothing has been presented yet
+        self._tracked = {}  # key -> (rect, signature) from the last time it was drawn
+        self.frames = 0
+        self.full_frames = 0
+        self.pushed_pixels = 0
+
+    def add(self, rect):
+        """Mark a region as changed"""
+        rect = pygame.Rect(rect)
+        if rect.width > 0 and rect.height > 0:
+            self.rects.append(rect)
+
+    def add_all(self):
+        """Mark the whole window as changed"""
+        self.full = True
+
+    def track(self, key, rect, signature=None):
+        """Mark a widget's region if its rect or signature differs from last frame's"""
+        rect = pygame.Rect(rect)
+        previous = self._tracked.get(key)
+        if previous is not None and previous[0] == rect and previous[1] == signature:
+            return False
+        if previous is not None:
+            self.add(previous[0])
+        self.add(rect)
+        self._tracked[key] = (rect, signature)
+        return True
+
+    def forget(self, key):
+        """A tracked widget stopped being drawn: mark the region it used to cover"""
+        previous = self._tracked.pop(key, None)
+        if previous is not None:
+            self.add(previous[0])
+
+    def is_dirty(self):
+        """Whether anything was marked since the last flush"""
+        return self.full or bool(self.rects)
+
+    def flush(self, scale=None):
+        """Push the changed regions to the display and start a new frame.
+
+        scale is (x, y) when the regions were drawn on a canvas that was
+        scaled to the window, so they are mapped to window pixels first.
+        """
+        screen = pygame.display.get_surface()
+        if screen is None:
+            return
+        screen_rect = screen.get_rect()
+        self.frames += 1
+
+        rects = self.rects
+        if scale is not None:
+            scale_x, scale_y = scale
+            rects = [pygame.Rect(int(rect.left * scale_x), int(rect.top * scale_y),
+                                 int(rect.width * scale_x) + 2, int(rect.height * scale_y) + 2) for rect in rects]
+        rects = [rect.clip(screen_rect) for rect in rects]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        area = sum(rect.width * rect.height for rect in rects)
+        if self.full or area > screen_rect.width * screen_rect.height * self.FULL_THRESHOLD:
+            pygame.display.update()
+            self.full_frames += 1
+            self.pushed_pixels += screen_rect.width * screen_rect.height
+        elif rects:
+            pygame.display.update(rects)
+            self.pushed_pixels += area
+
+        self.rects = []
+        self.full = False
+
+    def reset(self):
+        """Forget every tracked widget and repaint everything next frame (scene switches)"""
+        self._tracked.clear()
+        self.add_all()
+
+    def get_stats(self):
+        """Get update counters"""
+        return {
+            'frames': self.frames,
+            'full_frames': self.full_frames,
+            'pushed_pixels': self.pushed_pixels,
+        }
+
+# Shared tracker for everything that draws to the window
+dirty_rects = DirtyRectTracker()
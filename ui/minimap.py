@@ -0,0 +1,180 @@
+import numpy as np
+import pygame
+from utils.constants import MINIMAP_CHUNKS, BLACK, RED
+from ui.dirty_rects import dirty_rects
+from ui.render_queue import render_queue
+
+class Minimap:
+    """A one-pixel-per-cell map of the chunks around the player.
+
+    The map image covers span x span chunks centred on the player's chunk.
+    Pixel colours come from a 256-entry lookup table (tile ID -> average
+    colour of the tile's image), so a whole region is coloured with one
+    NumPy index and written with pygame.surfarray instead of a draw call
+    per cell. Each cell shows its overlay if it has one, else its terrain.
+
+    update() only repaints what changed: it checks the version of every
+    resident chunk in the window, compares the new IDs with the ones on the
+    map and writes just the pixels that differ. Chunks that are not loaded
+    are never generated for the map; they stay UNKNOWN until they arrive.
+    When the player moves into another chunk the image is scrolled and only
+    the exposed strips are cleared.
+    """
+    UNKNOWN = (24, 24, 24)
+
+    def __init__(self, chunks, tiles, span=MINIMAP_CHUNKS):
+        self.chunks = chunks
+        self.tiles = tiles
+        self.span = span
+        size = chunks.size * span
+        self.image = pygame.Surface((size, size), 0, 32)
+        self.ids = np.zeros((size, size), dtype=np.uint8)  # [y, x] tile ID each pixel shows (0 unknown)
+        self.origin = None  # Chunk coordinates of the top-left chunk
+        self._painted = {}  # (cx, cy) -> chunk version the map was painted from
+        self._lut = None  # tile ID -> RGB
+        self._lut_version = None
+        self._scaled = None
+        self._scaled_key = None  # (revision, size) the scaled copy was made for
+        self.revision = 0  # Bumped whenever the image changes
+        self.rect = None  # Where the map was last drawn
+        self.rebuilds = 0
+        self.patched_chunks = 0
+        self.patched_pixels = 0
+
+    def _colour_lut(self):
+        """Tile ID -> average colour of its image, rebuilt when tiles are registered"""
+        if self._lut_version != self.tiles.version:
+            lut = np.zeros((256, 3), dtype=np.uint8)
+            lut[0] = self.UNKNOWN
+            for tile_id, image in enumerate(self.tiles.images):
+                if image is not None:
+                    lut[tile_id] = pygame.transform.average_color(image, consider_alpha=True)[:3]
+            self._lut = lut
+            self._lut_version = self.tiles.version
+            self.origin = None  # Every colour may have changed
+        return self._lut
+
+    def _window(self):
+        """Chunk keys covered by the map"""
+        ox, oy = self.origin
+        return [(cx, cy) for cy in range(oy, oy + self.span) for cx in range(ox, ox + self.span)]
+
+    @staticmethod
+    def _cell_ids(chunk):
+        """The tile ID each cell of a chunk shows: its overlay, or its terrain"""
+        return np.where(chunk.overlay != 0, chunk.overlay, chunk.terrain)
+
+    def rebuild(self, player_x, player_y):
+        """Paint the whole map from the resident chunks in one surfarray write"""
+        lut = self._colour_lut()
+        pcx, pcy = self.chunks.chunk_coords(player_x, player_y)
+        self.origin = (pcx - self.span // 2, pcy - self.span // 2)
+        self.ids.fill(0)
+        self._painted.clear()
+        size = self.chunks.size
+        for key in self._window():
+            chunk = self.chunks.resident.get(key)
+            if chunk is not None:
+                x0 = (key[0] - self.origin[0]) * size
+                y0 = (key[1] - self.origin[1]) * size
+                self.ids[y0:y0 + size, x0:x0 + size] = self._cell_ids(chunk)
+                self._painted[key] = chunk.version
+        pygame.surfarray.blit_array(self.image, lut[self.ids.T])
+        self.rebuilds += 1
+        self.revision += 1
+
+    def _recenter(self, origin):
+        """Scroll the map so origin is its top-left chunk, clearing the exposed strips"""
+        size = self.chunks.size
+        width = self.span * size
+        dx = (self.origin[0] - origin[0]) * size
+        dy = (self.origin[1] - origin[1]) * size
+        self.origin = origin
+        if abs(dx) >= width or abs(dy) >= width:
+            self.ids.fill(0)
+            self.image.fill(self.UNKNOWN)
+            self._painted.clear()
+        else:
+            self.ids = np.roll(self.ids, (dy, dx), axis=(0, 1))
+            self.image.scroll(dx, dy)
+            # What rolled in from the other side is stale
+            columns = slice(0, dx) if dx > 0 else slice(width + dx, width)
+            rows = slice(0, dy) if dy > 0 else slice(width + dy, width)
+            self.ids[:, columns] = 0
+            self.ids[rows, :] = 0
+            self.image.fill(self.UNKNOWN, (columns.start, 0, columns.stop - columns.start, width))
+            self.image.fill(self.UNKNOWN, (0, rows.start, width, rows.stop - rows.start))
+            window = set(self._window())
+            self._painted = {key: version for key, version in self._painted.items() if key in window}
+        self.revision += 1
+
+    def _patch(self, key, chunk):
+        """Write the pixels of a chunk that differ from what the map shows"""
+        size = self.chunks.size
+        x0 = (key[0] - self.origin[0]) * size
+        y0 = (key[1] - self.origin[1]) * size
+        new = self._cell_ids(chunk)
+        shown = self.ids[y0:y0 + size, x0:x0 + size]
+        changed = new != shown
+        count = int(np.count_nonzero(changed))
+        if count:
+            pixels = pygame.surfarray.pixels3d(self.image)
+            pixels[x0:x0 + size, y0:y0 + size][changed.T] = self._lut[new.T[changed.T]]
+            del pixels  # Unlock the surface
+            shown[changed] = new[changed]
+            self.patched_pixels += count
+            self.revision += 1
+        self._painted[key] = chunk.version
+        self.patched_chunks += 1
+
+    def update(self, player_x, player_y):
+        """Bring the map up to date with the chunks around the player"""
+        self._colour_lut()
+        if self.origin is None:
+            self.rebuild(player_x, player_y)
+            return
+        pcx, pcy = self.chunks.chunk_coords(player_x, player_y)
+        origin = (pcx - self.span // 2, pcy - self.span // 2)
+        if origin != self.origin:
+            self._recenter(origin)
+        for key in self._window():
+            chunk = self.chunks.resident.get(key)
+            if chunk is not None and self._painted.get(key) != chunk.version:
+                self._patch(key, chunk)
+
+    def draw(self, screen, x, y, size, player_x, player_y):
+        """Draw the map size pixels square at (x, y) with the player marked, and return its rect"""
+        self.update(player_x, player_y)
+        if self._scaled_key != (self.revision, size):
+            self._scaled = pygame.transform.scale(self.image, (size, size))
+            self._scaled_key = (self.revision, size)
+        rect = pygame.Rect(x, y, size, size)
+        render_queue.submit(render_queue.UI, self._scaled, rect.topleft)
+
+        scale = size / self.image.get_width()
+        marker_x = x + int((player_x - self.origin[0] * self.chunks.size) * scale)
+        marker_y = y + int((player_y - self.origin[1] * self.chunks.size) * scale)
+        render_queue.fill(render_queue.UI, RED, (marker_x - 1, marker_y - 1, 3, 3))
+        render_queue.frame(render_queue.UI, BLACK, rect)
+        dirty_rects.track('minimap', rect, (self.revision, size, player_x, player_y))
+        self.rect = rect
+        return rect
+
+    def cell_at(self, pos):
+        """World cell under a screen position inside the drawn map"""
+        scale = self.image.get_width() / self.rect.width
+        return (self.origin[0] * self.chunks.size + int((pos[0] - self.rect.x) * scale),
+                self.origin[1] * self.chunks.size + int((pos[1] - self.rect.y) * scale))
+
+    def reset(self):
+        """Forget the map (a new world was generated)"""
+        self.origin = None
+        self._painted.clear()
+
+    def get_stats(self):
+        """Get map counters"""
+        return {
+            'rebuilds': self.rebuilds,
+            'patched_chunks': self.patched_chunks,
+            'patched_pixels': self.patched_pixels,
+        }
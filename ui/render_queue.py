@@ -0,0 +1,104 @@
+import pygame
+
+class RenderQueue:
+    """Collect a frame's draw commands and submit them in one Surface.blits() per layer.
+
+    Subsystems submit (layer, surface, dest, area) commands instead of
+    blitting to the screen themselves. Solid rectangles and outlines go
+    through fill() and frame(), which crop a cached solid surface per colour,
+    so they batch like any other blit. Commands are bucketed by layer as
+    they arrive, which sorts them (keeping submission order within a layer)
+    without a separate pass. flush() drops the ones that fall entirely
+    outside the target and issues one blits() call per layer.
+    """
+    WORLD = 0     # Terrain and overlays
+    ENTITIES = 1  # The player and other things standing on the world
+    UI = 2        # Panels, bars and buttons
+    TEXT = 3      # Text on top of everything
+
+    def __init__(self):
+        self.layers = [[] for _ in range(self.TEXT + 1)]  # layer -> [(surface, dest, area)]
+        self._solids = {}  # colour -> solid surface, grown to the largest rect asked for
+        self.frames = 0
+        self.submitted = 0
+        self.draw_calls = 0
+        self.culled = 0
+        self.last_frame = {'commands': 0, 'draw_calls': 0, 'culled': 0}
+
+    def submit(self, layer, surface, dest, area=None):
+        """Queue a blit of surface (or the area of it) at dest on a layer"""
+        self.layers[layer].append((surface, dest, area))
+
+    def fill(self, layer, color, rect):
+        """Queue a solid rectangle"""
+        rect = pygame.Rect(rect)
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        self.submit(layer, self._solid(color, rect.size), rect.topleft, pygame.Rect(0, 0, rect.width, rect.height))
+
+    def frame(self, layer, color, rect, width=1):
+        """Queue a rectangle outline width pixels thick"""
+        rect = pygame.Rect(rect)
+        self.fill(layer, color, (rect.left, rect.top, rect.width, width))
+        self.fill(layer, color, (rect.left, rect.bottom - width, rect.width, width))
+        self.fill(layer, color, (rect.left, rect.top + width, width, rect.height - width * 2))
+        self.fill(layer, color, (rect.right - width, rect.top + width, width, rect.height - width * 2))
+
+    def _solid(self, color, size):
+        """A surface of one colour at least size big"""
+        surface = self._solids.get(color)
+        if surface is None or surface.get_width() < size[0] or surface.get_height() < size[1]:
+            width, height = size
+            if surface is not None:
+                width = max(width, surface.get_width())
+                height = max(height, surface.get_height())
+            surface = pygame.Surface((width, height))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.fill(color)
+            self._solids[color] = surface
+        return surface
+
+    def flush(self, target):
+        """Draw everything queued onto target, lowest layer first, and start a new frame"""
+        target_width, target_height = target.get_size()
+        commands = culled = draw_calls = 0
+        for batch in self.layers:
+            if not batch:
+                continue
+            visible = []
+            for command in batch:
+                x, y = command[1]
+                width, height = command[2].size if command[2] is not None else command[0].get_size()
+                if x < target_width and y < target_height and x + width > 0 and y + height > 0:
+                    visible.append(command)
+            commands += len(batch)
+            culled += len(batch) - len(visible)
+            batch.clear()
+            if visible:
+                target.blits(visible, doreturn=False)
+                draw_calls += 1
+
+        self.frames += 1
+        self.submitted += commands
+        self.draw_calls += draw_calls
+        self.culled += culled
+        self.last_frame = {'commands': commands, 'draw_calls': draw_calls, 'culled': culled}
+
+    def clear(self):
+        """Drop everything queued without drawing it"""
+        for batch in self.layers:
+            batch.clear()
+
+    def get_stats(self):
+        """Get draw counters"""
+        return {
+            'frames': self.frames,
+            'commands': self.submitted,
+            'draw_calls': self.draw_calls,
+            'culled': self.culled,
+            'last_frame': dict(self.last_frame),
+        }
+
+# Shared queue for everything drawn to the window
+render_queue = RenderQueue()
@@ -1,5 +1,7 @@
 import pygame
 from game.sprites import sprite_manager
+from game.scale_cache import scale_cache
+from ui.dirty_rects import dirty_rects
 
 class SpriteDebugWindow:
     def __init__(self):
@@ -121,11 +123,7 @@ class SpriteDebugWindow:
                 screen.blit(text, text_rect)
                 
                 # Draw sprite at 64x64
-                sprite_copy = sprite.copy()
-                if sprite_copy.image.get_size() != (64, 64):
-                    scaled_image = pygame.transform.scale(sprite_copy.image, (64, 64))
-                else:
-                    scaled_image = sprite_copy.image
+                scaled_image = scale_cache.get(sprite.image, (64, 64))
                 screen.blit(scaled_image, (x, y + 20))
             
             x += 64 + 30
@@ -152,7 +150,8 @@ class SpriteDebugWindow:
             row_start_y = y
             
             for sprite_type in sprite_types:
-                sprite = sprite_manager.get_overlay_sprite(category, sprite_type)
+                # Use the manager's cached sprite so the scaled thumbnail can be reused
+                sprite = sprite_manager.get_overlay(category, sprite_type)
                 if sprite and sprite.image and y + 64 + 20 > 0 and y < self.window_height:
                     # Clean up sprite name - remove directory path and extension
                     clean_name = sprite_type.split('/')[-1].split('.')[0]
@@ -165,11 +164,7 @@ class SpriteDebugWindow:
                     screen.blit(text, text_rect)
                     
                     # Draw sprite at 64x64
-                    sprite_copy = sprite.copy()
-                    if sprite_copy.image.get_size() != (64, 64):
-                        scaled_image = pygame.transform.scale(sprite_copy.image, (64, 64))
-                    else:
-                        scaled_image = sprite_copy.image
+                    scaled_image = scale_cache.get(sprite.image, (64, 64))
                     screen.blit(scaled_image, (x, y + 20))
                 
                 x += 64 + 30
@@ -202,15 +197,16 @@ class SpriteDebugWindow:
             pygame.draw.rect(screen, (150, 150, 150), 
                            (self.window_width - 15, scroll_bar_pos, 15, scroll_bar_height))
         
-        # Update the display
-        pygame.display.flip()
+        # The whole view is redrawn; it's pushed with the rest of the frame
+        dirty_rects.add_all()
     
     def _calculate_max_scroll(self):
         """Calculate the maximum scroll distance based on content height"""
         # Initialize sprite cache if needed
         if not self._sprite_cache_initialized:
             self._sprite_cache_initialized = True
-            self._cached_tiles = sprite_manager.get_available_tiles()
+            # Names are enough for layout - don't decode every tile just to count them
+            self._cached_tiles = ['grass', 'dirt', 'sand', 'water', *sprite_manager.get_map_tile_names()]
             self._cached_overlays = {
                 "Trees": ["pine", "oak", "dead"],
                 "Rocks": ["boulder", "stone", "crystal"],
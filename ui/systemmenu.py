@@ -1,5 +1,7 @@
 import pygame
 from utils.constants import WHITE, BLACK, FONT_SIZE
+from ui.dirty_rects import dirty_rects
+from ui.render_queue import render_queue
 
 class SystemMenu:
     def __init__(self, screen_width, screen_height):
@@ -30,7 +32,8 @@ class SystemMenu:
         
         # Create menu background surface
         self.background = pygame.Surface((screen_width, screen_height))
-        self.background.fill(self.background_color)
+        self.background.fill(self.background_color[:3])
+        self.background.set_alpha(self.background_color[3])
         
         # Create menu surface
         self.menu_surface = pygame.Surface((self.menu_width, self.menu_height))
@@ -83,36 +86,39 @@ class SystemMenu:
         return None
     
     def draw(self, screen):
-        """Draw the system menu"""
+        """Queue the system menu for drawing"""
         if not self.is_visible:
             return
             
         # Draw semi-transparent background
-        screen.blit(self.background, (0, 0))
+        render_queue.submit(render_queue.UI, self.background, (0, 0))
+        # It dims the whole screen, so a change to the menu repaints everything
+        dirty_rects.track('system_menu', screen.get_rect(), self.selected_option)
         
         # Draw RPG title above menu box
         rpg_title = self.title_font.render("RPG", True, WHITE)
         rpg_rect = rpg_title.get_rect(centerx=self.menu_x + self.menu_width // 2, bottom=self.menu_y - 20)
-        screen.blit(rpg_title, rpg_rect)
+        render_queue.submit(render_queue.TEXT, rpg_title, rpg_rect.topleft)
         
         # Draw menu background
-        pygame.draw.rect(screen, BLACK, (self.menu_x, self.menu_y, self.menu_width, self.menu_height))
-        pygame.draw.rect(screen, WHITE, (self.menu_x, self.menu_y, self.menu_width, self.menu_height), 2)
+        menu_rect = pygame.Rect(self.menu_x, self.menu_y, self.menu_width, self.menu_height)
+        render_queue.fill(render_queue.UI, BLACK, menu_rect)
+        render_queue.frame(render_queue.UI, WHITE, menu_rect, 2)
         
         # Draw menu title
         title = self.font.render("System Menu", True, WHITE)
         title_rect = title.get_rect(centerx=self.menu_x + self.menu_width // 2, y=self.menu_y + 25)
-        screen.blit(title, title_rect)
+        render_queue.submit(render_queue.TEXT, title, title_rect.topleft)
         
         # Draw options
         for i, option in enumerate(self.options):
             color = self.selected_color if i == self.selected_option else self.text_color
             text = self.font.render(option, True, color)
             text_rect = text.get_rect(centerx=self.menu_x + self.menu_width // 2, y=self.menu_y + 80 + i * 50)
-            screen.blit(text, text_rect)
+            render_queue.submit(render_queue.TEXT, text, text_rect.topleft)
             
             # Draw selection arrow
             if i == self.selected_option:
                 arrow = self.font.render(">", True, self.selected_color)
                 arrow_rect = arrow.get_rect(right=text_rect.left - 10, centery=text_rect.centery)
-                screen.blit(arrow, arrow_rect) 
\ No newline at end of file
+                render_queue.submit(render_queue.TEXT, arrow, arrow_rect.topleft)
\ No newline at end of file
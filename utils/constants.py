@@ -6,6 +6,9 @@ GRID_SIZE = 10
 WINDOW_SIZE = CELL_SIZE * GRID_SIZE
 WINDOW_TITLE = "Simple RPG"
 SAVE_FILE = "player_save.json"  # File to store save data
+DISPLAY_SCALING = "window"  # "window" draws at window size, "canvas" draws CANVAS_SIZE and scales it to the window once per frame, "scaled" lets SDL do that scale (pygame.SCALED)
+CANVAS_SIZE = (WINDOW_SIZE, WINDOW_SIZE)  # Internal resolution for "canvas" and "scaled"
+RENDER_BACKEND = "surface"  # "surface" blits, or "sdl2" to draw the world with pygame._sdl2 textures
 
 # Colors
 BLACK = (0, 0, 0)
@@ -21,6 +24,65 @@ DARK_GREEN = (0, 100, 0)  # Darker green for terrain
 HEALTH_GREEN = (0, 200, 0)  # Brighter green for health bars
 GOLD_COLOR = (255, 215, 0)  # Color for gold items
 
+# Sprite loading
+SPRITE_CACHE_BUDGET = 8 * 1024 * 1024  # Bytes of decoded pixels kept per sprite category
+
+# World chunks
+CHUNK_SIZE = 32  # Cells per chunk side
+CHUNK_RESIDENT_RADIUS = 2  # Chunks around the player that are never evicted
+CHUNK_MAX_RESIDENT = 49  # Resident chunks before far ones are compressed away
+CHUNK_MAX_STORED = 400  # Compressed chunks kept before unedited ones are dropped and regenerated
+CHUNK_MERGE_LIMIT = 4  # Background-generated chunks merged per frame
+CHUNK_PREFETCH_AHEAD = 2  # Chunks to look ahead along the direction of travel
+CHUNK_SURFACE_BUDGET = 48 * 1024 * 1024  # Bytes of baked chunk surfaces kept for the viewport
+CHUNK_BAKE_PIXELS = 512  # Widest baked surface; chunks wider than this at a zoom level are baked in tiles
+CHUNK_PREBAKE_MARGIN = 8  # Cells around the window whose chunks are baked ahead of time
+VIEWPORT_RENDER_MODE = "baked"  # "baked" chunk surfaces, or "scroll" to shift the last frame and patch its edges
+ZOOM_LEVELS = (8, 16, 32, 64)  # World cell sizes in pixels the mouse wheel steps through
+DEFAULT_ZOOM = 32  # Cell size the world starts at
+
+# Frame loop
+FRAME_RATE = 60  # Frames per second while the scene is changing
+IDLE_WAIT_MS = 500  # Longest block on input while nothing on screen changes
+SIMULATION_RATE = 60  # Fixed game updates per second (walking, monsters, timers), whatever the drawing rate
+MAX_FRAME_TIME = 0.25  # Longest stretch of real time one frame catches up on
+MOVE_SPEED = 5  # Cells per second the player walks at after a click
+
+# Minimap
+MINIMAP_CHUNKS = 7  # Chunks per side shown around the player, one pixel per cell
+MINIMAP_SIZE = 140  # On-screen size in pixels
+
+# Pathfinding
+PATH_SEARCH_MARGIN = 16  # Cells around the start-goal rectangle a path may detour through
+PATH_CACHE_SIZE = 64  # Recent (start, goal) paths kept until their chunks change
+HPA_DIRECT_RANGE = 64  # Cells within which paths skip the chunk graph and use flat A*
+HPA_REFINE_SEGMENTS = 4  # Abstract edges turned into cells per long-distance search
+HPA_SPLIT_RUN = 6  # Border runs at least this long get a transition at each end
+HPA_CHUNK_MARGIN = 1  # Chunks around the start-goal rectangle the chunk graph may detour through
+HPA_HEURISTIC_WEIGHT = 1.2  # Weighted A* on the chunk graph: fewer chunks touched, paths a little longer
+
+# Roaming monsters
+MONSTER_COUNT = 6  # Monsters kept chasing the player on the world map
+MONSTER_SPAWN_RANGE = (10, 24)  # Closest and farthest cells from the player new monsters appear at
+MONSTER_SPEED = 3  # Cells per second the monsters chase at, slower than MOVE_SPEED so they can be outrun
+
+# Tile passability and movement cost: name -> (passable, cost)
+TILE_PROPERTIES = {
+    "grass": (True, 1),
+    "dirt": (True, 1),
+    "sand": (True, 2),
+    "water": (False, 0),
+    "Trees/pine": (True, 3),
+    "Trees/oak": (True, 3),
+    "Trees/dead": (True, 2),
+    "Rocks/boulder": (False, 0),
+    "Rocks/stone": (True, 2),
+    "Rocks/crystal": (False, 0),
+    "Bushes/small": (True, 2),
+    "Bushes/berry": (True, 2),
+    "Bushes/flower": (True, 1),
+}
+
 # Font settings
 FONT_SIZE = 24
 FONT = None  # Will be initialized in World class
@@ -1,6 +1,9 @@
 import json
-import winsound
 import os
+try:
+    import winsound
+except ImportError:  # Only available on Windows
+    winsound = None
 from utils.constants import SAVE_FILE
 from game.sprites import sprite_manager
 
@@ -37,6 +40,8 @@ def load_sprite_mappings():
 
 def play_sound(frequency, duration=200):
     """Helper function to play sound with error handling"""
+    if winsound is None:
+        return
     try:
         winsound.Beep(frequency, duration)
     except Exception as e:
@@ -60,7 +65,8 @@ def save_game(player, world):
             },
             "world": {
                 "player_x": world.player_x,
-                "player_y": world.player_y
+                "player_y": world.player_y,
+                "seed": world.seed
             }
         }
         